@@ -1,6 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import students, objectives, sessions, goals, subject_areas, iep_upload, transcript, weekly_summary
+from app.routes import students, objectives, sessions, goals, subject_areas, iep_upload, transcript, weekly_summary, progress, reports, dashboard, changes, events
 from dotenv import load_dotenv
 import os
 
@@ -26,6 +26,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Report-Id"],
 )
 
 # Include routers
@@ -36,4 +37,9 @@ app.include_router(objectives.router, prefix="/objectives")
 app.include_router(sessions.router, prefix="/sessions")
 app.include_router(iep_upload.router, prefix="/iep-upload")
 app.include_router(transcript.router, prefix="/transcript")
-app.include_router(weekly_summary.router, prefix="/weekly-summary")
\ No newline at end of file
+app.include_router(weekly_summary.router, prefix="/weekly-summary")
+app.include_router(progress.router, prefix="/progress")
+app.include_router(reports.router, prefix="/reports")
+app.include_router(dashboard.router, prefix="/dashboard")
+app.include_router(changes.router, prefix="/changes")
+app.include_router(events.router, prefix="/events")
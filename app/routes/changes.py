@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.dependencies.auth import user_supabase_client
+from app.services.change_feed import (
+    cursor_expired,
+    decode_changes_cursor,
+    encode_changes_cursor,
+    fetch_changes,
+)
+
+router = APIRouter()
+
+DEFAULT_CHANGES_LIMIT = 500
+MAX_CHANGES_LIMIT = 2000
+
+# -------- Rows created, updated or deleted since a cursor --------
+@router.get("")
+def get_changes(
+    since: Optional[str] = None,
+    limit: int = Query(DEFAULT_CHANGES_LIMIT, ge=1, le=MAX_CHANGES_LIMIT),
+    context=Depends(user_supabase_client)
+):
+    """
+    Without `since`, pages through everything (the initial sync). Apply
+    `changes` (upsert by id) before `deleted`, store `cursor`, and call again
+    with it: immediately while `has_more`, otherwise on the next refresh.
+    """
+    supabase = context["supabase"]
+    user_id = context["user_id"]
+
+    issued_at = datetime.now(timezone.utc).isoformat()
+
+    positions = {}
+    overlap = False
+    if since:
+        try:
+            state = decode_changes_cursor(since)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if cursor_expired(state):
+            raise HTTPException(status_code=410, detail="Cursor expired; sync again without since")
+        positions = state["p"]
+        overlap = state["o"]
+
+    page = fetch_changes(supabase, user_id, positions, overlap, limit)
+    return {
+        "changes": page["changes"],
+        "deleted": page["deleted"],
+        # The next page continues exactly where this one stopped; the next poll re-reads the overlap
+        "cursor": encode_changes_cursor(page["positions"], not page["has_more"], issued_at),
+        "has_more": page["has_more"],
+    }
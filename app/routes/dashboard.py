@@ -0,0 +1,81 @@
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import APIRouter, Depends, Query, Request
+from app.dependencies.auth import user_supabase_client
+from app.routes.weekly_summary import build_weekly_summary, get_week_range
+from app.services import data_version
+from app.services.caseload import get_caseload, pick
+from app.services.progress_rollups import ROLLUP_TABLE, rollup_progress
+from app.services.summary_worker import annotate_students
+from app.utils.chunked_query import fetch_all
+from app.utils.etag import conditional_json
+
+router = APIRouter()
+
+# The dashboard also shows rollup progress
+DASHBOARD_SCOPES = data_version.ALL + (data_version.PROGRESS,)
+
+# Dashboard queries are independent, so they run side by side
+_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="dashboard")
+
+# -------- Everything the dashboard shows, in one request --------
+@router.get("")
+def get_dashboard(
+    request: Request,
+    week: str = Query("this", pattern="^(this|last)$"),
+    context=Depends(user_supabase_client)
+):
+    supabase = context["supabase"]
+    user_id = context["user_id"]
+
+    start_date, end_date = get_week_range(week)
+
+    def fetch():
+        # Students, their objectives (with subject area and goal) and subject
+        # areas come from the caseload snapshot; the rest is queried side by side
+        caseload = _pool.submit(get_caseload, supabase, user_id)
+        week_sessions = _pool.submit(
+            lambda: fetch_all(
+                lambda: supabase.table("sessions").select("id, objective_id")
+                .eq("teacher_id", user_id).gte("created_at", start_date).lt("created_at", end_date).order("id")
+            )
+        )
+        recent_sessions = _pool.submit(
+            lambda: supabase.table("sessions").select("*")
+            .eq("teacher_id", user_id).order("created_at", desc=True).limit(10).execute().data
+        )
+        rollups = _pool.submit(
+            lambda: fetch_all(
+                lambda: supabase.table(ROLLUP_TABLE).select("*").eq("teacher_id", user_id).order("objective_id")
+            )
+        )
+
+        caseload = caseload.result()
+        students = annotate_students(caseload.students_with_objectives())
+        objectives = [
+            {**objective, "student_name": student["name"]}
+            for student in students
+            for objective in student.get("objectives") or []
+        ]
+        objective_ids = {objective["id"] for objective in objectives}
+        logged_ids = {s["objective_id"] for s in week_sessions.result() if s["objective_id"] in objective_ids}
+
+        weekly_summary = build_weekly_summary(week, start_date, end_date, [
+            {
+                "id": objective["id"],
+                "description": objective["description"],
+                "student_name": objective["student_name"],
+                "subject_area": (objective.get("subject_area") or {}).get("name"),
+            }
+            for objective in objectives
+        ], logged_ids)
+
+        return {
+            "students": students,
+            "subject_areas": [pick(subject_area, ("id", "name")) for subject_area in caseload.subject_areas],
+            "recent_sessions": recent_sessions.result(),
+            "weekly_summary": weekly_summary,
+            "progress": rollup_progress(objectives, rollups.result()),
+        }
+
+    # "this" week resolves to a new range every Monday
+    return conditional_json(request, supabase, user_id, DASHBOARD_SCOPES, fetch, vary=[start_date])
@@ -0,0 +1,52 @@
+from typing import Optional
+import asyncio
+import json
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from app.dependencies.auth import user_supabase_client
+from app.services import event_hub
+
+router = APIRouter()
+
+# Comment lines keep proxies from closing an idle stream
+KEEPALIVE_SECONDS = 15
+
+def _format(event: dict) -> str:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+# -------- Server-sent events for the logged in teacher --------
+# Emits student_summary, progress, summary_job and report events as background
+# work finishes, and resync when the client missed events and should refetch.
+@router.get("")
+async def stream_events(
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    context=Depends(user_supabase_client)
+):
+    user_id = context["user_id"]
+
+    try:
+        subscription = event_hub.subscribe(user_id, last_event_id)
+    except event_hub.TooManySubscribers:
+        raise HTTPException(status_code=429, detail="Too many open event streams")
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _format(event)
+        finally:
+            event_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from app.schemas.goal import CreateGoal
 from app.dependencies.auth import user_supabase_client
+from app.services import data_version
+from app.services.caseload import get_caseload, pick
+from app.utils.etag import conditional_json
 
 router = APIRouter()
 
@@ -10,38 +13,53 @@ def create_goal(goal: CreateGoal, context=Depends(user_supabase_client)):
     user_id = context["user_id"]
     goal_data = goal.model_dump()
     goal_data["teacher_id"] = user_id
-    return supabase.table("goals").insert(goal_data).execute().data
+    response = supabase.table("goals").insert(goal_data).execute()
+    data_version.bump(user_id, data_version.GOALS)
+    return response.data
 
 # Get goals for a single student and single subject area
 @router.get("/student/{student_id}/subject-area/{subject_area_id}")
-def get_goals_for_student_and_subject_area(subject_area_id: str, student_id: str, context=Depends(user_supabase_client)):
+def get_goals_for_student_and_subject_area(subject_area_id: str, student_id: str, request: Request, context=Depends(user_supabase_client)):
     supabase = context["supabase"]
     user_id = context["user_id"]
 
-    response = supabase \
-        .table("goals") \
-        .select("*, subject_area:subject_areas(name), objectives(*)") \
-        .eq("teacher_id", user_id) \
-        .eq("subject_area_id", subject_area_id) \
-        .eq("student_id", student_id) \
-        .order("updated_at", desc=True) \
-        .execute()
-    return response.data
+    def fetch():
+        caseload = get_caseload(supabase, user_id)
+        return [
+            {
+                **goal,
+                "subject_area": pick(caseload.subject_areas_by_id.get(goal["subject_area_id"]), ("name",)),
+                "objectives": [dict(o) for o in caseload.objectives_by_goal.get(goal["id"], [])],
+            }
+            for goal in caseload.goals_by_student.get(student_id, [])
+            if goal["subject_area_id"] == subject_area_id
+        ]
+
+    return conditional_json(request, supabase, user_id, [data_version.GOALS, data_version.SUBJECT_AREAS, data_version.OBJECTIVES], fetch)
 
 
 
 @router.get("/goal/{goal_id}")
-def get_goal(goal_id: str, context=Depends(user_supabase_client)):
+def get_goal(goal_id: str, request: Request, context=Depends(user_supabase_client)):
     supabase = context["supabase"]
-    return supabase.table("goals").select("*").eq("id", goal_id).execute().data
+    user_id = context["user_id"]
+    def fetch():
+        goal = get_caseload(supabase, user_id).goals_by_id.get(goal_id)
+        return [dict(goal)] if goal else []
+
+    return conditional_json(request, supabase, user_id, [data_version.GOALS], fetch)
 
 @router.put("/goal/{goal_id}")
 def update_goal(goal_id: str, goal: CreateGoal, context=Depends(user_supabase_client)):
     supabase = context["supabase"]
-    return supabase.table("goals").update(goal.model_dump()).eq("id", goal_id).execute().data
+    response = supabase.table("goals").update(goal.model_dump()).eq("id", goal_id).execute()
+    data_version.bump(context["user_id"], data_version.GOALS)
+    return response.data
 
 @router.delete("/goal/{goal_id}")
 def delete_goal(goal_id: str, context=Depends(user_supabase_client)):
     supabase = context["supabase"]
     supabase.table("goals").delete().eq("id", goal_id).execute()
+    # Deleting a goal cascades to its objectives and their sessions
+    data_version.bump(context["user_id"], data_version.GOALS, data_version.OBJECTIVES, data_version.SESSIONS)
     return {"message": "Deleted"}
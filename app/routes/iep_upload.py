@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Securit
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.dependencies.auth import user_supabase_client
 from app.services.iep_parser import IEPParser
+from app.services import data_version
 from app.schemas.student import StudentCreate
 from typing import Dict, List, Optional
 from pydantic import BaseModel
@@ -211,6 +212,7 @@ async def save_iep(
                     if not objective_response.data:
                         logger.warning(f"Failed to create objective for goal {goal.goal_description}")
         
+        data_version.bump(user_id, *data_version.CASELOAD)
         logger.info(f"Successfully saved all IEP data for student: {iep_data.student_name}")
         return {
             "message": "IEP saved successfully",
@@ -219,6 +221,8 @@ async def save_iep(
         }
         
     except Exception as e:
+        # Rows may have been written before the failure
+        data_version.bump(context["user_id"], *data_version.CASELOAD)
         logger.error(f"Error in save_iep endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1,6 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
-from app.schemas.objective import CreateObjective
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from app.schemas.objective import CreateObjective, ObjectivesBatchEdit, ObjectivesBatchDelete
 from app.dependencies.auth import user_supabase_client
+from app.services import data_version
+from app.services.caseload import get_caseload
+from app.services.summary_worker import schedule_student_summary
+from app.services.progress_rollups import refresh_in_background as refresh_rollups, rollup_inputs_changed
+from app.utils.etag import conditional_json
+from app.utils.chunked_query import in_chunks
 
 router = APIRouter()
 
@@ -19,32 +25,39 @@ def create_objective(obj: CreateObjective, context=Depends(user_supabase_client)
     obj_dict["subject_area_id"] = str(obj_dict["subject_area_id"])
 
     response = supabase.table("objectives").insert(obj_dict).execute()
+    data_version.bump(user_id, data_version.OBJECTIVES)
     return response.data
 
 @router.get("/student/{student_id}")
-def get_all_objectives(student_id: str, context=Depends(user_supabase_client)):
+def get_all_objectives(student_id: str, request: Request, context=Depends(user_supabase_client)):
     supabase = context["supabase"]
     user_id = context["user_id"]
     
-    response = supabase \
-        .table("objectives") \
-        .select("*") \
-        .eq("teacher_id", user_id) \
-        .eq("student_id", student_id) \
-        .order("updated_at", desc=True) \
-        .execute()
-    return response.data
+    def fetch():
+        return [dict(o) for o in get_caseload(supabase, user_id).objectives_by_student.get(student_id, [])]
+
+    return conditional_json(request, supabase, user_id, [data_version.OBJECTIVES], fetch)
 
 @router.get("/objective/{id}")
-def get_objective(id: str, context=Depends(user_supabase_client)):
+def get_objective(id: str, request: Request, context=Depends(user_supabase_client)):
     supabase = context["supabase"]
-    return supabase.table("objectives").select("*").eq("id", id).execute().data
+    user_id = context["user_id"]
+    def fetch():
+        objective = get_caseload(supabase, user_id).objectives_by_id.get(id)
+        return [dict(objective)] if objective else []
+
+    return conditional_json(request, supabase, user_id, [data_version.OBJECTIVES], fetch)
 
 @router.put("/objective/{id}")
-def update_objective(id: str, obj: CreateObjective, context=Depends(user_supabase_client)):
+def update_objective(id: str, obj: CreateObjective, background_tasks: BackgroundTasks, context=Depends(user_supabase_client)):
     supabase = context["supabase"]
     user_id = context["user_id"]
 
+    # Verify objective belongs to the user
+    existing_objective = supabase.table("objectives").select("*").eq("id", id).eq("teacher_id", user_id).execute()
+    if not existing_objective.data:
+        raise HTTPException(status_code=404, detail="Objective not found")
+
     obj_dict = obj.model_dump()
     obj_dict["teacher_id"] = user_id
 
@@ -52,7 +65,12 @@ def update_objective(id: str, obj: CreateObjective, context=Depends(user_supabas
     obj_dict["goal_id"] = str(obj_dict["goal_id"])
     obj_dict["subject_area_id"] = str(obj_dict["subject_area_id"])
 
-    return supabase.table("objectives").update(obj_dict).eq("id", id).execute().data
+    response = supabase.table("objectives").update(obj_dict).eq("id", id).execute()
+    data_version.bump(user_id, data_version.OBJECTIVES)
+    # Only changed targets invalidate the rollup
+    if rollup_inputs_changed(existing_objective.data[0], obj_dict):
+        background_tasks.add_task(refresh_rollups, supabase, user_id, [id])
+    return response.data
 
 @router.delete("/objective/{id}")
 def delete_objective(id: str, context=Depends(user_supabase_client)):
@@ -65,4 +83,63 @@ def delete_objective(id: str, context=Depends(user_supabase_client)):
         raise HTTPException(status_code=404, detail="Objective not found")    
     
     supabase.table("objectives").delete().eq("id", id).execute()
-    return {"message": "Deleted"}
\ No newline at end of file
+    # Deleting an objective cascades to its sessions
+    data_version.bump(user_id, data_version.OBJECTIVES, data_version.SESSIONS)
+    return {"message": "Deleted"}
+
+# -------- Batch edit objectives --------
+@router.post("/batch/edit")
+def batch_edit_objectives(edits: ObjectivesBatchEdit, background_tasks: BackgroundTasks, context=Depends(user_supabase_client)):
+    supabase = context["supabase"]
+    user_id = context["user_id"]
+
+    edits_by_id = {edit.id: edit for edit in edits.root}
+
+    # One ownership check for the whole batch
+    existing = in_chunks(lambda: supabase.table("objectives").select("*").eq("teacher_id", user_id), "id", edits_by_id)
+    missing = set(edits_by_id) - {row["id"] for row in existing}
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Objectives not found: {', '.join(sorted(missing))}")
+
+    rows = []
+    changed_targets = []
+    for row in existing:
+        row.pop("updated_at", None)
+        # mode="json" converts UUID fields to strings
+        edited = {**row, **edits_by_id[row["id"]].model_dump(exclude={"id"}, exclude_unset=True, mode="json")}
+        if rollup_inputs_changed(row, edited):
+            changed_targets.append(row["id"])
+        rows.append(edited)
+
+    # Full rows are upserted so the whole batch is one statement
+    response = supabase.table("objectives").upsert(rows).execute()
+    data_version.bump(user_id, data_version.OBJECTIVES)
+    # Only changed targets invalidate a rollup
+    if changed_targets:
+        background_tasks.add_task(refresh_rollups, supabase, user_id, changed_targets)
+
+    for student_id in {row["student_id"] for row in rows}:
+        schedule_student_summary(supabase, student_id, user_id)
+
+    return response.data
+
+# -------- Batch delete objectives --------
+@router.post("/batch/delete")
+def batch_delete_objectives(payload: ObjectivesBatchDelete, context=Depends(user_supabase_client)):
+    supabase = context["supabase"]
+    user_id = context["user_id"]
+
+    ids = list(set(payload.ids))
+    existing = in_chunks(lambda: supabase.table("objectives").select("id, student_id").eq("teacher_id", user_id), "id", ids)
+    missing = set(ids) - {row["id"] for row in existing}
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Objectives not found: {', '.join(sorted(missing))}")
+
+    in_chunks(lambda: supabase.table("objectives").delete().eq("teacher_id", user_id), "id", ids)
+    # Sessions and progress rows cascade with their objective
+    data_version.bump(user_id, data_version.OBJECTIVES, data_version.SESSIONS)
+
+    for student_id in {row["student_id"] for row in existing}:
+        schedule_student_summary(supabase, student_id, user_id)
+
+    return {"message": "Deleted", "deleted": len(existing)}
@@ -0,0 +1,117 @@
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from app.dependencies.auth import user_supabase_client
+from app.services import data_version
+from app.services.progress_engine import BUCKETS, accuracy_series, normalize_target
+from app.services.progress_rollups import load_rollup_progress
+from app.services.coverage import MAX_COVERAGE_DAYS, as_utc, compute_coverage, load_coverage_inputs
+from app.utils.chunked_query import fetch_all
+from app.utils.etag import conditional_json
+
+router = APIRouter()
+
+PROGRESS_SCOPES = (data_version.OBJECTIVES, data_version.SESSIONS, data_version.PROGRESS)
+
+# -------- Progress for the teacher's whole caseload --------
+@router.get("/caseload")
+def get_caseload_progress(request: Request, context=Depends(user_supabase_client)):
+    supabase = context["supabase"]
+    user_id = context["user_id"]
+
+    def fetch():
+        return load_rollup_progress(supabase, user_id)
+
+    return conditional_json(request, supabase, user_id, PROGRESS_SCOPES, fetch)
+
+# -------- Progress for one student's objectives --------
+@router.get("/student/{student_id}")
+def get_student_progress(student_id: str, request: Request, context=Depends(user_supabase_client)):
+    supabase = context["supabase"]
+    user_id = context["user_id"]
+
+    def fetch():
+        return load_rollup_progress(supabase, user_id, student_id=student_id)
+
+    return conditional_json(request, supabase, user_id, PROGRESS_SCOPES, fetch)
+
+# -------- Progress for one objective --------
+@router.get("/objective/{objective_id}")
+def get_objective_progress(objective_id: str, request: Request, context=Depends(user_supabase_client)):
+    supabase = context["supabase"]
+    user_id = context["user_id"]
+
+    def fetch():
+        results = load_rollup_progress(supabase, user_id, objective_id=objective_id)
+        if not results:
+            raise HTTPException(status_code=404, detail="Objective not found")
+        return results[0]
+
+    return conditional_json(request, supabase, user_id, PROGRESS_SCOPES, fetch)
+
+# -------- Accuracy time series for charting one objective --------
+@router.get("/objective/{objective_id}/timeseries")
+def get_objective_timeseries(
+    objective_id: str,
+    request: Request,
+    bucket: str = Query("week", pattern=f"^({'|'.join(BUCKETS)})$"),
+    points: Optional[int] = Query(300, ge=3, le=5000),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    context=Depends(user_supabase_client)
+):
+    supabase = context["supabase"]
+    user_id = context["user_id"]
+
+    def fetch():
+        objective = supabase \
+            .table("objectives") \
+            .select("id, target_accuracy") \
+            .eq("id", objective_id) \
+            .eq("teacher_id", user_id) \
+            .execute().data
+        if not objective:
+            raise HTTPException(status_code=404, detail="Objective not found")
+
+        # Only the two numbers per session the chart needs, no nested joins
+        def sessions_query():
+            query = supabase \
+                .table("sessions") \
+                .select("id, created_at, objective_progress:objective_progress(trials_completed, trials_total)") \
+                .eq("teacher_id", user_id) \
+                .eq("objective_id", objective_id)
+            if start:
+                query = query.gte("created_at", start.isoformat())
+            if end:
+                query = query.lt("created_at", end.isoformat())
+            return query.order("id")
+
+        series = accuracy_series(fetch_all(sessions_query), bucket, points)
+        return {
+            "objective_id": objective_id,
+            "target_accuracy": normalize_target(objective[0]["target_accuracy"]),
+            **series,
+        }
+
+    return conditional_json(request, supabase, user_id, PROGRESS_SCOPES, fetch)
+
+# -------- Logging coverage against each objective's reporting frequency --------
+@router.get("/coverage")
+def get_logging_coverage(
+    start: datetime,
+    end: Optional[datetime] = None,
+    context=Depends(user_supabase_client)
+):
+    supabase = context["supabase"]
+    user_id = context["user_id"]
+
+    start = as_utc(start)
+    end = as_utc(end) if end else datetime.now(timezone.utc)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if (end - start).days > MAX_COVERAGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range may span at most {MAX_COVERAGE_DAYS} days")
+
+    # Not ETagged: the result also depends on today's date, not only on the data
+    objectives, sessions = load_coverage_inputs(supabase, user_id, start, end)
+    return compute_coverage(objectives, sessions, start, end)
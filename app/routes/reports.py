@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from app.dependencies.auth import user_supabase_client
+from app.schemas.report import ReportCreate
+from app.services.report_generator import CHECKPOINT_KIND, new_report, stream_report
+from app.utils.checkpoint import acquire_lease, lease_held, load_checkpoint, save_checkpoint
+import uuid
+
+router = APIRouter()
+
+def load_report(report_id: str, user_id: str):
+    try:
+        report = load_checkpoint(CHECKPOINT_KIND, report_id)
+    except ValueError:
+        report = None
+    if not report or report["teacher_id"] != user_id:
+        raise HTTPException(status_code=404, detail="Report not found")
+    return report
+
+# -------- Generate (or resume) a progress report --------
+# Streams NDJSON: a "start" line, one "student" line per section as it
+# completes, then "done" (or "error").
+@router.post("/generate")
+def generate_report(payload: ReportCreate, context=Depends(user_supabase_client)):
+    supabase = context["supabase"]
+    user_id = context["user_id"]
+
+    if payload.report_id:
+        load_report(payload.report_id, user_id)
+        report_id = payload.report_id
+        # Claimed here, not in the stream, so two resumes can't both run it
+        if not acquire_lease(CHECKPOINT_KIND, report_id):
+            raise HTTPException(status_code=409, detail="Report is already running")
+    else:
+        if not payload.start or not payload.end or payload.start >= payload.end:
+            raise HTTPException(status_code=400, detail="A start before end is required for a new report")
+        report_id = str(uuid.uuid4())
+        save_checkpoint(CHECKPOINT_KIND, report_id, new_report(
+            user_id, payload.start.isoformat(), payload.end.isoformat(), payload.student_ids, payload.concurrency
+        ))
+        acquire_lease(CHECKPOINT_KIND, report_id)
+
+    return StreamingResponse(
+        stream_report(supabase, user_id, report_id),
+        media_type="application/x-ndjson",
+        headers={"X-Report-Id": report_id},
+    )
+
+# -------- Get a generated report --------
+@router.get("/{report_id}")
+def get_report(report_id: str, context=Depends(user_supabase_client)):
+    user_id = context["user_id"]
+    report = load_report(report_id, user_id)
+    status = report["status"]
+    if status == "running" and not lease_held(CHECKPOINT_KIND, report_id):
+        # The process generating it stopped; resume with this report_id
+        status = "interrupted"
+
+    return {
+        "report_id": report_id,
+        "status": status,
+        "start": report["start"],
+        "end": report["end"],
+        "sections": list(report["sections"].values()),
+        "failed": report["failed"],
+        "report": report.get("report"),
+    }
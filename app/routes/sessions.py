@@ -1,191 +1,330 @@
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 # from app.services.llm import analyze_session
 from app.dependencies.auth import user_supabase_client
 from datetime import datetime, timezone
-from typing import List, Dict
-from app.schemas.session import SessionsWithProgressCreate, SessionCreate
+from typing import List, Dict, Optional
+from app.schemas.session import SessionsWithProgressCreate, SessionCreate, SessionsBatchEdit, SessionsBatchDelete
 import uuid
-from app.services.student_summarizer import generate_and_store_student_summary
+from postgrest.types import ReturnMethod
+from app.services.summary_worker import schedule_student_summary
+from app.services import data_version
+from app.services.progress_rollups import apply_in_background as update_rollups, session_entry
+from app.services.session_export import iter_session_rows, stream_csv, stream_parquet
+from app.utils.pagination import NEXT_CURSOR_HEADER, apply_keyset, split_page
+from app.utils.etag import conditional_json
+from app.utils.chunked_query import in_chunks
 router = APIRouter()
 
+SESSION_SELECT = """
+    *,
+    student:students(*),
+    objective:objectives(
+        *,
+        subject_area:subject_areas(id, name),
+        goal:goals(id, title)
+    ),
+    objective_progress:objective_progress(*)
+"""
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def list_sessions_page(
+    supabase,
+    user_id: str,
+    request: Request,
+    filters: Dict[str, str],
+    cursor: Optional[str],
+    limit: int,
+    start: Optional[datetime],
+    end: Optional[datetime],
+):
+    """
+    One keyset page of the teacher's sessions, newest first by (created_at, id).
+    The cursor for the following page is returned in the X-Next-Cursor header;
+    the page is served with an ETag and honours If-None-Match.
+    """
+    query = supabase \
+        .table("sessions") \
+        .select(SESSION_SELECT) \
+        .eq("teacher_id", user_id)
+    for column, value in filters.items():
+        query = query.eq(column, value)
+    if start:
+        query = query.gte("created_at", start.isoformat())
+    if end:
+        query = query.lt("created_at", end.isoformat())
+
+    try:
+        query = apply_keyset(query, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {}
+
+    def fetch():
+        page, next_cursor = split_page(query.execute().data, limit)
+        if next_cursor:
+            headers[NEXT_CURSOR_HEADER] = next_cursor
+        return page
+
+    return conditional_json(request, supabase, user_id, data_version.ALL, fetch, headers)
+
 # -------- Get All Sessions from logged in user --------
 @router.get("/sessions")
-async def get_all_sessions(context=Depends(user_supabase_client)):
+def get_all_sessions(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    context=Depends(user_supabase_client)
+):
     supabase = context["supabase"]
     user_id = context["user_id"]
 
-    response = supabase \
-    .from_("sessions") \
-    .select("""
-        *,
-        student:students(*),
-        objective:objectives(
-            *,
-            subject_area:subject_areas(id, name),
-            goal:goals(id, title)
-        ),
-        objective_progress:objective_progress(*)
-    """) \
-    .eq("teacher_id", user_id) \
-    .order("created_at", desc=True) \
-    .execute()
-
-
-    return response.data
+    return list_sessions_page(supabase, user_id, request, {}, cursor, limit, start, end)
 
 @router.get("/recent")
-async def get_recent_sessions(context=Depends(user_supabase_client)):
+def get_recent_sessions(request: Request, context=Depends(user_supabase_client)):
     supabase = context["supabase"]
     user_id = context["user_id"]
 
-    response = supabase.table("sessions").select("*").eq("teacher_id", user_id).order("created_at", desc=True).limit(10).execute()
-    return response.data
+    def fetch():
+        response = supabase.table("sessions").select("*").eq("teacher_id", user_id).order("created_at", desc=True).limit(10).execute()
+        return response.data
+
+    return conditional_json(request, supabase, user_id, [data_version.SESSIONS], fetch)
 
 # -------- Edit session --------
 @router.put("/{session_id}")
 def edit_session_and_progress(
     session_id: str,
+    background_tasks: BackgroundTasks,
     payload: dict = Body(...),
     context=Depends(user_supabase_client)
 ):
     supabase = context["supabase"]
     user_id = context["user_id"]
     
-    # Verify session belongs to the user
-    existing_session = supabase.table("sessions").select("*").eq("id", session_id).eq("teacher_id", user_id).execute()
-    if not existing_session.data:
+    # Ownership check and both updates run in one transaction server-side
+    # (supabase/migrations/*_session_write_rpcs.sql)
+    result = supabase.rpc("edit_session_with_progress", {
+        "p_teacher_id": user_id,
+        "p_session_id": session_id,
+        "p_student_id": payload["student_id"],
+        "p_objective_id": payload["objective_id"],
+        "p_memo": payload["memo"],
+        "p_created_at": payload["created_at"],
+        "p_trials_completed": payload["objective_progress"]["trials_completed"],
+        "p_trials_total": payload["objective_progress"]["trials_total"],
+    }).execute()
+    if not result.data:
         raise HTTPException(status_code=404, detail="Session not found")
-    
-    # Get the objective_progress_id from the existing session
-    objective_progress_id = existing_session.data[0]["objective_progress_id"]
-    
-    # Update the session record
-    updated_session = supabase.table("sessions").update({
-        "student_id": payload["student_id"],
-        "objective_id": payload["objective_id"],
-        "memo": payload["memo"],
-        "created_at": payload["created_at"]
-    }).eq("id", session_id).execute()
-    
-    # Update the associated objective_progress record
-    updated_progress = supabase.table("objective_progress").update({
-        "trials_completed": payload["objective_progress"]["trials_completed"],
-        "trials_total": payload["objective_progress"]["trials_total"]
-    }).eq("id", objective_progress_id).execute()
-
-    summary = generate_and_store_student_summary(supabase, payload["student_id"], user_id)
-    print(f"onEdit: ✅ Successfully generated and stored student summary: {summary}")
+    data_version.bump(user_id, data_version.SESSIONS)
+    background_tasks.add_task(
+        update_rollups, supabase, user_id,
+        [session_entry(result.data["session"], result.data["progress"])],
+        [session_entry(result.data["previous_session"], result.data["previous_progress"])],
+    )
+
+    # Moving a session to another student changes both students' summaries
+    for student_id in {result.data["previous_student_id"], payload["student_id"]}:
+        schedule_student_summary(supabase, student_id, user_id)
     
     return {
-        "session": updated_session.data[0],
-        "progress": updated_progress.data[0]
+        "session": result.data["session"],
+        "progress": result.data["progress"]
     }
 
 # -------- Delete session --------
 @router.delete("/{session_id}")
 def delete_session(
     session_id: str,
+    background_tasks: BackgroundTasks,
     context=Depends(user_supabase_client)
 ):
     supabase = context["supabase"]
     user_id = context["user_id"]
     
-    # Verify session belongs to the user
-    existing_session = supabase.table("sessions").select("*").eq("id", session_id).eq("teacher_id", user_id).execute()
-    if not existing_session.data:
+    # Deletes the session and its objective_progress row atomically, scoped to the user
+    result = supabase.rpc("delete_session_with_progress", {
+        "p_teacher_id": user_id,
+        "p_session_id": session_id,
+    }).execute()
+    if not result.data:
         raise HTTPException(status_code=404, detail="Session not found")
-    
-    # Delete the session
-    supabase.table("sessions").delete().eq("id", session_id).execute()
+    data_version.bump(user_id, data_version.SESSIONS)
+    background_tasks.add_task(update_rollups, supabase, user_id, [], [session_entry(result.data, result.data["objective_progress"])])
 
-    summary = generate_and_store_student_summary(supabase, existing_session.data[0]["student_id"], user_id)
-    print(f"onDelete: ✅ Successfully updated student summary: {summary}")
+    schedule_student_summary(supabase, result.data["student_id"], user_id)
     
     return {"message": "Session deleted successfully"}
 
+# -------- Batch edit sessions --------
+@router.post("/batch/edit")
+def batch_edit_sessions(
+    edits: SessionsBatchEdit,
+    background_tasks: BackgroundTasks,
+    context=Depends(user_supabase_client)
+):
+    supabase = context["supabase"]
+    user_id = context["user_id"]
+
+    # Later edits of the same session win
+    edits_by_id = {edit.id: edit for edit in edits.root}
+
+    # Ownership check and every row's partial update run in one transaction
+    # server-side; only the fields sent are changed
+    # (supabase/migrations/*_session_batch_rpcs.sql)
+    result = supabase.rpc("edit_sessions_with_progress", {
+        "p_teacher_id": user_id,
+        "p_edits": [edit.model_dump(mode="json", exclude_unset=True) for edit in edits_by_id.values()],
+    }).execute()
+    if result.data.get("missing"):
+        raise HTTPException(status_code=404, detail=f"Sessions not found: {', '.join(sorted(result.data['missing']))}")
+    results = result.data["results"]
+    data_version.bump(user_id, data_version.SESSIONS)
+    background_tasks.add_task(
+        update_rollups, supabase, user_id,
+        [session_entry(r["session"], r["progress"]) for r in results],
+        [session_entry(r["previous_session"], r["previous_progress"]) for r in results],
+    )
+
+    # Moving a session to another student changes both students' summaries
+    affected_students = {r["previous_session"]["student_id"] for r in results} | {r["session"]["student_id"] for r in results}
+    for student_id in affected_students:
+        schedule_student_summary(supabase, student_id, user_id)
+
+    return {
+        "sessions": [r["session"] for r in results],
+        "progress": [r["progress"] for r in results if r["progress"]]
+    }
+
+# -------- Batch delete sessions --------
+@router.post("/batch/delete")
+def batch_delete_sessions(
+    payload: SessionsBatchDelete,
+    background_tasks: BackgroundTasks,
+    context=Depends(user_supabase_client)
+):
+    supabase = context["supabase"]
+    user_id = context["user_id"]
+
+    # Deletes every session with its progress row atomically, or none if any
+    # isn't the teacher's
+    result = supabase.rpc("delete_sessions_with_progress", {
+        "p_teacher_id": user_id,
+        "p_session_ids": list(set(payload.ids)),
+    }).execute()
+    if result.data.get("missing"):
+        raise HTTPException(status_code=404, detail=f"Sessions not found: {', '.join(sorted(result.data['missing']))}")
+    deleted = result.data["deleted"]
+    data_version.bump(user_id, data_version.SESSIONS)
+    background_tasks.add_task(
+        update_rollups, supabase, user_id, [],
+        [session_entry(row, row["objective_progress"]) for row in deleted],
+    )
+
+    for student_id in {row["student_id"] for row in deleted}:
+        schedule_student_summary(supabase, student_id, user_id)
+
+    return {"message": "Sessions deleted successfully", "deleted": len(deleted)}
+
 # -------- Get all sessions by student --------
 @router.get("/student/{student_id}")
 def get_sessions_by_student(
     student_id: str,
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
     context=Depends(user_supabase_client)
 ):
     supabase = context["supabase"]
     user_id = context["user_id"]
     
-    response = supabase.table("sessions") \
-    .select("""
-        *,
-        student:students(*),
-        objective:objectives(
-            *,
-            subject_area:subject_areas(id, name),
-            goal:goals(id, title)
-        ),
-        objective_progress:objective_progress(*)
-    """) \
-    .eq("teacher_id", user_id) \
-    .eq("student_id", student_id) \
-    .order("created_at", desc=True) \
-    .execute()
-    
-    return response.data
+    return list_sessions_page(supabase, user_id, request, {"student_id": student_id}, cursor, limit, start, end)
 
 # -------- Get all sessions by objective --------
 @router.get("/objective/{objective_id}")
 def get_sessions_by_objective(
     objective_id: str,
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
     context=Depends(user_supabase_client)
 ):
     supabase = context["supabase"]
     user_id = context["user_id"]
     
-    response = supabase.table("sessions") \
-    .select("""
-        *,
-        student:students(*),
-        objective:objectives(
-            *,
-            subject_area:subject_areas(id, name),
-            goal:goals(id, title)
-        ),
-        objective_progress:objective_progress(*)
-    """) \
-    .eq("teacher_id", user_id) \
-    .eq("objective_id", objective_id) \
-    .order("created_at", desc=True) \
-    .execute()
-    
-    return response.data
+    return list_sessions_page(supabase, user_id, request, {"objective_id": objective_id}, cursor, limit, start, end)
+
+# -------- Export session history as CSV or Parquet --------
+# Streams keyset pages straight into the response, so memory stays flat
+# however much history is exported.
+@router.get("/export")
+def export_sessions(
+    format: str = Query("csv", pattern="^(csv|parquet)$"),
+    student_id: Optional[str] = None,
+    objective_id: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    context=Depends(user_supabase_client)
+):
+    supabase = context["supabase"]
+    user_id = context["user_id"]
+
+    filters = {}
+    if student_id:
+        filters["student_id"] = student_id
+    if objective_id:
+        filters["objective_id"] = objective_id
+
+    pages = iter_session_rows(supabase, user_id, filters, start, end)
+    filename = f"sessions-{datetime.now(timezone.utc).strftime('%Y%m%d')}.{format}"
+    if format == "parquet":
+        body, media_type = stream_parquet(pages), "application/vnd.apache.parquet"
+    else:
+        body, media_type = stream_csv(pages), "text/csv"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 # -------- Log session and progress --------
 @router.post("/session/log")
 def log_session_and_progress(
     sessions: SessionsWithProgressCreate,
+    background_tasks: BackgroundTasks,
     context=Depends(user_supabase_client)
 ):
     supabase = context["supabase"]
     user_id = context["user_id"]
 
-    session_ids = []
+    progress_rows = []
+    session_rows = []
 
     for session in sessions.root:
         session_id = str(uuid.uuid4())
         objective_progress_id = str(uuid.uuid4())
 
-        # Insert into objective_progress
-        progress_payload = {
+        progress_rows.append({
             "id": objective_progress_id,
             "teacher_id": user_id,
             "student_id": session.student_id,
             "objective_id": session.objective_id,
             "trials_completed": session.objective_progress.trials_completed,
             "trials_total": session.objective_progress.trials_total,
-        }
-
-        supabase.table("objective_progress").insert(progress_payload).execute()
+        })
 
-        # Insert into sessions
-        session_payload = {
+        session_rows.append({
             "id": session_id,
             "student_id": session.student_id,
             "teacher_id": user_id,
@@ -193,15 +332,32 @@ def log_session_and_progress(
             "memo": session.memo,
             "created_at": session.created_at,
             "objective_progress_id": objective_progress_id
-        }
+        })
+
+    session_ids = [row["id"] for row in session_rows]
+    if not session_rows:
+        return {"status": "success", "session_ids": session_ids, "objective_progress_ids": []}
 
-        supabase.table("sessions").insert(session_payload).execute()
-        session_ids.append(session_id)
+    # One bulk insert per table; progress rows first since sessions reference them
+    supabase.table("objective_progress").insert(progress_rows, returning=ReturnMethod.minimal).execute()
+    try:
+        supabase.table("sessions").insert(session_rows, returning=ReturnMethod.minimal).execute()
+    except Exception:
+        # Don't leave progress rows without sessions behind
+        in_chunks(lambda: supabase.table("objective_progress").delete(), "id", [row["id"] for row in progress_rows])
+        raise
+    data_version.bump(user_id, data_version.SESSIONS)
+    background_tasks.add_task(
+        update_rollups, supabase, user_id,
+        [session_entry(session, progress) for session, progress in zip(session_rows, progress_rows)], [],
+    )
 
-        summary = generate_and_store_student_summary(supabase, session.student_id, user_id)
-        print(f"onLog: ✅ Successfully generated and stored student summary: {summary}")
+    # One regeneration per student, however many sessions were logged for them
+    for student_id in {session.student_id for session in sessions.root}:
+        schedule_student_summary(supabase, student_id, user_id)
 
     return {
         "status": "success",
-        "session_ids": session_ids
+        "session_ids": session_ids,
+        "objective_progress_ids": [row["id"] for row in progress_rows]
     }
@@ -1,46 +1,95 @@
-from fastapi import APIRouter, HTTPException, Depends
-from app.schemas.student import Student, StudentCreate
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Request
+from typing import Optional
+from app.schemas.student import Student, StudentCreate, SummaryJobCreate
 from app.dependencies.auth import user_supabase_client
+from app.services.caseload import get_caseload
 from app.services.student_summarizer import call_llm_student_summary
+from app.services.summary_worker import annotate_students, get_summary_status
+from app.services.summary_batch import CHECKPOINT_KIND, new_job, run_summary_job
+from app.services import data_version
+from app.utils.checkpoint import acquire_lease, lease_held, load_checkpoint, save_checkpoint
+from app.utils.select_builder import build_select
+from app.utils.etag import conditional_json
+import uuid
 
 router = APIRouter()
 
+# Student reads carry the summary and its regeneration status
+STUDENT_SCOPES = data_version.CASELOAD + (data_version.SUMMARIES,)
+
+# Relations clients can embed via ?expand= on the student list
+STUDENT_RELATIONS = {
+    "objectives": {
+        "select": "objectives",
+        "relations": {
+            "subject_area": {"select": "subject_area:subject_areas", "fields": ["id", "name"]},
+            "goal": {"select": "goal:goals", "fields": ["id", "title"]},
+        },
+    },
+}
+
 # Get all students
 @router.get("/students")
-def get_all_students(context=Depends(user_supabase_client)):
+def get_all_students(
+    request: Request,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+    context=Depends(user_supabase_client)
+):
     supabase = context["supabase"]
     user_id = context["user_id"]
 
-    response = supabase \
-        .table("students") \
-        .select("""
-            *,
-            objectives (
-                *,
-                subject_area:subject_areas (
-                    id,
-                    name
-                ),
-                goal:goals (
-                    id,
-                    title
-                )
-            )
-        """) \
-        .eq("teacher_id", user_id) \
-        .order("updated_at", desc=True) \
-        .execute()
-    return response.data
+    try:
+        select = build_select(
+            STUDENT_RELATIONS, fields, expand,
+            default_expand=["objectives.subject_area", "objectives.goal"],
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def fetch():
+        if fields is None and expand is None:
+            # Default shape is served from the caseload snapshot
+            return annotate_students(get_caseload(supabase, user_id).students_with_objectives())
+
+        response = supabase \
+            .table("students") \
+            .select(select) \
+            .eq("teacher_id", user_id) \
+            .order("updated_at", desc=True) \
+            .execute()
+        return annotate_students(response.data)
+
+    return conditional_json(request, supabase, user_id, STUDENT_SCOPES, fetch)
 
 # Get single student by id
 @router.get("/student/{student_id}")
-def get_student_by_id(student_id: str, context=Depends(user_supabase_client)):
+def get_student_by_id(student_id: str, request: Request, context=Depends(user_supabase_client)):
     supabase = context["supabase"]
-    return supabase \
-        .table("students") \
-        .select("*, objectives(*)") \
-        .eq("id", student_id) \
-        .execute().data
+    user_id = context["user_id"]
+
+    def fetch():
+        caseload = get_caseload(supabase, user_id)
+        student = caseload.students_by_id.get(student_id)
+        if student is None:
+            return []
+        return annotate_students([
+            {**student, "objectives": [dict(o) for o in caseload.objectives_by_student.get(student_id, [])]}
+        ])
+
+    return conditional_json(request, supabase, user_id, STUDENT_SCOPES, fetch)
+
+# Get summary regeneration status for a student
+@router.get("/student/{student_id}/summary-status")
+def get_student_summary_status(student_id: str, context=Depends(user_supabase_client)):
+    supabase = context["supabase"]
+    user_id = context["user_id"]
+
+    # Verify student belongs to the user
+    if student_id not in get_caseload(supabase, user_id).students_by_id:
+        raise HTTPException(status_code=404, detail="Student not found")
+
+    return get_summary_status(student_id)
 
 # Create student
 @router.post("/student")
@@ -53,6 +102,7 @@ def create_student(student: StudentCreate, context=Depends(user_supabase_client)
     student_dict["teacher_id"] = user_id
 
     response = supabase.table("students").insert(student_dict).execute()
+    data_version.bump(user_id, data_version.STUDENTS)
     
     return response.data
 
@@ -68,6 +118,7 @@ def update_student(student_id: str, student: StudentCreate, context=Depends(user
     student_dict["teacher_id"] = user_id
 
     response = supabase.table("students").update(student_dict).eq("id", student_id).execute()
+    data_version.bump(user_id, data_version.STUDENTS)
     return response.data
 
 # Delete student
@@ -82,4 +133,61 @@ def delete_student(student_id: str, context=Depends(user_supabase_client)   ):
         raise HTTPException(status_code=404, detail="Student not found")    
     
     response = supabase.table("students").delete().eq("id", student_id).execute()
-    return response.data
\ No newline at end of file
+    # Deleting a student cascades to their goals, objectives and sessions
+    data_version.bump(user_id, *data_version.ALL, data_version.PROGRESS)
+    return response.data
+
+# -------- Bulk summary regeneration --------
+@router.post("/summaries/regenerate")
+def regenerate_summaries(
+    payload: SummaryJobCreate,
+    background_tasks: BackgroundTasks,
+    context=Depends(user_supabase_client)
+):
+    supabase = context["supabase"]
+    user_id = context["user_id"]
+
+    if payload.job_id:
+        # Resume an interrupted job from its checkpoint
+        try:
+            job = load_checkpoint(CHECKPOINT_KIND, payload.job_id)
+        except ValueError:
+            job = None
+        if not job or job["teacher_id"] != user_id:
+            raise HTTPException(status_code=404, detail="Summary job not found")
+        job_id = payload.job_id
+        # Claimed here, not in the task, so two resumes can't both start it
+        if not acquire_lease(CHECKPOINT_KIND, job_id):
+            raise HTTPException(status_code=409, detail="Summary job is already running")
+    else:
+        job_id = str(uuid.uuid4())
+        save_checkpoint(CHECKPOINT_KIND, job_id, new_job(user_id, payload.student_ids, payload.concurrency, payload.force))
+        acquire_lease(CHECKPOINT_KIND, job_id)
+
+    background_tasks.add_task(run_summary_job, supabase, user_id, job_id)
+    return {"job_id": job_id, "status": "running"}
+
+@router.get("/summaries/jobs/{job_id}")
+def get_summary_job(job_id: str, context=Depends(user_supabase_client)):
+    user_id = context["user_id"]
+
+    try:
+        job = load_checkpoint(CHECKPOINT_KIND, job_id)
+    except ValueError:
+        job = None
+    if not job or job["teacher_id"] != user_id:
+        raise HTTPException(status_code=404, detail="Summary job not found")
+
+    status = job["status"]
+    if status == "running" and not lease_held(CHECKPOINT_KIND, job_id):
+        # The process running it stopped; resume with this job_id
+        status = "interrupted"
+
+    return {
+        "job_id": job_id,
+        "status": status,
+        "students_total": len(job["student_ids"]) if job["student_ids"] is not None else None,
+        "students_completed": len(job["completed"]),
+        "failed": job["failed"],
+        "report": job["report"],
+    }
\ No newline at end of file
@@ -1,9 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import Optional
 from app.schemas.subject_area import SubjectArea, CreateSubjectArea
 from app.dependencies.auth import user_supabase_client
+from app.services import data_version
+from app.services.caseload import get_caseload
+from app.utils.select_builder import build_select
+from app.utils.etag import conditional_json
 
 router = APIRouter()
 
+# Relations clients can embed via ?expand= on the subject area list
+SUBJECT_AREA_RELATIONS = {
+    "objective": {
+        "select": "objective:objectives",
+        "relations": {
+            "student": {"select": "student:students"},
+            "goal": {"select": "goal:goals"},
+        },
+    },
+}
+
+
+def _objective_with_student_and_goal(caseload, objective):
+    return {
+        **objective,
+        "student": caseload.students_by_id.get(objective.get("student_id")),
+        "goal": caseload.goals_by_id.get(objective.get("goal_id")),
+    }
+
 # -------- Subject Areas --------
 @router.post("/subject-area")
 def create_subject_area(subject: CreateSubjectArea, context=Depends(user_supabase_client)):
@@ -15,50 +39,93 @@ def create_subject_area(subject: CreateSubjectArea, context=Depends(user_supabas
     subject_dict["teacher_id"] = user_id
     
     response = supabase.table("subject_areas").insert(subject_dict).execute()
+    data_version.bump(user_id, data_version.SUBJECT_AREAS)
     return response.data
 
 @router.get("/subject-areas")
-def get_all_subject_areas(context=Depends(user_supabase_client)):
+def get_all_subject_areas(
+    request: Request,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+    context=Depends(user_supabase_client)
+):
     supabase = context["supabase"]
     user_id = context["user_id"]
+
+    try:
+        select = build_select(
+            SUBJECT_AREA_RELATIONS, fields, expand,
+            default_expand=["objective.student", "objective.goal"],
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    response = supabase \
-        .table("subject_areas") \
-        .select("*, objective:objectives(*, student:students(*),  goal:goals(*))") \
-        .eq("teacher_id", user_id) \
-        .order("updated_at", desc=True) \
-        .execute()
-    
-    return response.data
+    def fetch():
+        if fields is None and expand is None:
+            # Default shape is served from the caseload snapshot
+            caseload = get_caseload(supabase, user_id)
+            return [
+                {
+                    **subject_area,
+                    "objective": [
+                        _objective_with_student_and_goal(caseload, o)
+                        for o in caseload.objectives_by_subject_area.get(subject_area["id"], [])
+                    ],
+                }
+                for subject_area in caseload.subject_areas
+            ]
+
+        response = supabase \
+            .table("subject_areas") \
+            .select(select) \
+            .eq("teacher_id", user_id) \
+            .order("updated_at", desc=True) \
+            .execute()
+        return response.data
+
+    return conditional_json(request, supabase, user_id, data_version.CASELOAD, fetch)
 
 # Get subject areas for a single student
 @router.get("/student/{student_id}")
-def get_subject_areas_by_student(student_id: str, context=Depends(user_supabase_client)):
+def get_subject_areas_by_student(student_id: str, request: Request, context=Depends(user_supabase_client)):
     supabase = context["supabase"]
     user_id = context["user_id"]
 
-    response = supabase \
-        .table("subject_areas") \
-        .select("*, objective:objectives!inner(*, student:students(*), goal:goals(*))") \
-        .eq("teacher_id", user_id) \
-        .eq("objectives.student_id", student_id) \
-        .order("updated_at", desc=True) \
-        .execute()
+    def fetch():
+        caseload = get_caseload(supabase, user_id)
+        objectives = caseload.objectives_by_student.get(student_id, [])
+        # Only subject areas the student has objectives in, embedding just those objectives
+        return [
+            {
+                **subject_area,
+                "objective": [
+                    _objective_with_student_and_goal(caseload, o)
+                    for o in objectives if o["subject_area_id"] == subject_area["id"]
+                ],
+            }
+            for subject_area in caseload.subject_areas
+            if any(o["subject_area_id"] == subject_area["id"] for o in objectives)
+        ]
 
-    return response.data
+    return conditional_json(request, supabase, user_id, data_version.CASELOAD, fetch)
 
 @router.get("/subject-area/{id}")
-def get_subject_area(id: str, context=Depends(user_supabase_client)):
+def get_subject_area(id: str, request: Request, context=Depends(user_supabase_client)):
     supabase = context["supabase"]
     user_id = context["user_id"]
 
-    response = supabase.table("subject_areas").select("*").eq("id", id).eq("teacher_id", user_id).execute()
-    return response.data
+    def fetch():
+        subject_area = get_caseload(supabase, user_id).subject_areas_by_id.get(id)
+        return [dict(subject_area)] if subject_area else []
+
+    return conditional_json(request, supabase, user_id, [data_version.SUBJECT_AREAS], fetch)
 
 @router.put("/subject-area/{id}")
 def update_subject_area(id: str, subject: SubjectArea, context=Depends(user_supabase_client)):
     supabase = context["supabase"]
-    return supabase.table("subject_areas").update(subject.model_dump()).eq("id", id).execute().data
+    response = supabase.table("subject_areas").update(subject.model_dump()).eq("id", id).execute()
+    data_version.bump(context["user_id"], data_version.SUBJECT_AREAS)
+    return response.data
 
 @router.delete("/subject-area/{id}")
 def delete_subject_area(id: str, context=Depends(user_supabase_client)):
@@ -71,4 +138,6 @@ def delete_subject_area(id: str, context=Depends(user_supabase_client)):
         raise HTTPException(status_code=404, detail="Subject area not found")
     
     supabase.table("subject_areas").delete().eq("id", id).execute()
+    # Deleting a subject area cascades to its goals, objectives and their sessions
+    data_version.bump(user_id, data_version.SUBJECT_AREAS, data_version.GOALS, data_version.OBJECTIVES, data_version.SESSIONS)
     return {"message": "Deleted"}
\ No newline at end of file
@@ -13,12 +13,15 @@ from app.services.transcript_parser import (
     call_llm_extract_sessions,
     infer_trials_completed
 )
+from app.services.caseload import get_caseload
 from app.utils.semantic_matcher import top_k_semantic_matches
 
 router = APIRouter()
 
+# Sync handler so FastAPI runs it in the threadpool: the LLM and embedding calls
+# block, and concurrent identical requests must overlap to be coalesced.
 @router.post("/analyze", response_model=List[SuggestedSession])
-async def analyze_transcript_for_sessions(
+def analyze_transcript_for_sessions(
     payload: TranscriptRequest,
     context=Depends(user_supabase_client)
 ):
@@ -27,12 +30,8 @@ async def analyze_transcript_for_sessions(
     transcript = payload.transcript
 
     try:
-        students_res = (
-            supabase.table("students")
-            .select("id, name, grade_level, disability_type, summary")
-            .eq("teacher_id", teacher_id)
-            .execute()
-        ).data or []
+        caseload = get_caseload(supabase, teacher_id)
+        students_res = caseload.students
         
         # Extract student names for the LLM to use
         student_names = [student["name"] for student in students_res]
@@ -59,18 +58,10 @@ async def analyze_transcript_for_sessions(
             for student in student_matches:
                 student_id = student["id"]
 
-                obj_res = (
-                    supabase.table("objectives")
-                    .select("""
-                        id, description, objective_type, target_accuracy, student_id,
-                        goal:goals(id, title),
-                        subject_area:subject_areas(id, name)
-                    """)
-                    .eq("teacher_id", teacher_id)
-                    .eq("student_id", student_id)
-                    .execute()
-                )
-                objectives = obj_res.data or []
+                objectives = [
+                    caseload.objective_with_relations(o)
+                    for o in caseload.objectives_by_student.get(student_id, [])
+                ]
 
                 objective_matches = top_k_semantic_matches(
                     parsed.objective_description,
@@ -80,7 +71,7 @@ async def analyze_transcript_for_sessions(
                 )
 
                 # Now we have results from semantic matcher, we create final objects
-                full_student = next((s for s in students_res if s["id"] == student["id"]), None)
+                full_student = caseload.students_by_id.get(student["id"])
                 if not full_student:
                     continue  # skip if student metadata missing
 
@@ -2,9 +2,18 @@ from fastapi import APIRouter, Depends, Query
 from datetime import datetime, timedelta, timezone
 from dateutil.relativedelta import relativedelta
 from app.dependencies.auth import user_supabase_client
+from app.services import data_version
+from app.services.caseload import get_caseload
+from app.utils.chunked_query import fetch_all
+from app.utils.versioned_cache import VersionedCache
+import os
 
 router = APIRouter()
 
+# (teacher, week, week start) -> summary, valid while none of the data it is built from has been written
+_cache = VersionedCache(maxsize=int(os.getenv("WEEKLY_SUMMARY_CACHE_SIZE", "1000")))
+WEEKLY_SUMMARY_SCOPES = (data_version.OBJECTIVES, data_version.SESSIONS, data_version.STUDENTS, data_version.SUBJECT_AREAS)
+
 def get_week_range(period: str):
     today = datetime.now(timezone.utc)
     # Monday = 0, Sunday = 6
@@ -31,57 +40,47 @@ def get_weekly_summary(
 
     start_date, end_date = get_week_range(week)
 
-    # 1. Get all objectives for the teacher
-    objectives_res = supabase \
-        .table("objectives") \
-        .select("id, description, student_id, subject_area_id") \
-        .eq("teacher_id", teacher_id) \
-        .execute()
-
-    objectives = objectives_res.data
-    objective_ids = [obj["id"] for obj in objectives]
-
-    # 2. Get sessions logged in the given week
-    sessions_res = supabase \
-        .table("sessions") \
-        .select("objective_id") \
-        .in_("objective_id", objective_ids) \
-        .gte("created_at", start_date) \
-        .lt("created_at", end_date) \
-        .execute()
-
-    logged_ids = set(session["objective_id"] for session in sessions_res.data)
-
-    # 3. Fetch students and subject areas
-    student_ids = list({obj["student_id"] for obj in objectives})
-    subject_ids = list({obj["subject_area_id"] for obj in objectives})
-
-    students = {
-        s["id"]: s for s in supabase.table("students")
-        .select("id, name")
-        .in_("id", student_ids)
-        .execute().data
-    }
-
-    subjects = {
-        s["id"]: s for s in supabase.table("subject_areas")
-        .select("id, name")
-        .in_("id", subject_ids)
-        .execute().data
-    }
-
-    # 4. Build objective summary
+    version = data_version.current(teacher_id, *WEEKLY_SUMMARY_SCOPES)
+    return _cache.get_or_compute(
+        (teacher_id, week, start_date),
+        version,
+        lambda: compute_weekly_summary(supabase, teacher_id, week, start_date, end_date),
+    )
+
+def compute_weekly_summary(supabase, teacher_id: str, week: str, start_date: str, end_date: str):
+    # Objectives, students and subject areas come from the caseload snapshot;
+    # only the week's sessions are queried
+    caseload = get_caseload(supabase, teacher_id)
+    sessions = fetch_all(
+        lambda: supabase.table("sessions").select("id, objective_id")
+        .eq("teacher_id", teacher_id).gte("created_at", start_date).lt("created_at", end_date).order("id")
+    )
+    logged_ids = {s["objective_id"] for s in sessions if s["objective_id"] in caseload.objectives_by_id}
+
+    rows = [
+        {
+            "id": obj["id"],
+            "description": obj["description"],
+            "student_name": (caseload.students_by_id.get(obj["student_id"]) or {}).get("name"),
+            "subject_area": (caseload.subject_areas_by_id.get(obj["subject_area_id"]) or {}).get("name"),
+        }
+        for obj in sorted(caseload.objectives, key=lambda o: o["id"])
+    ]
+    return build_weekly_summary(week, start_date, end_date, rows, logged_ids)
+
+def build_weekly_summary(week: str, start_date: str, end_date: str, objectives: list, logged_ids: set):
+    """Objectives carry id, description, student_name and subject_area."""
     summary = []
     for obj in objectives:
         summary.append({
             "objective_id": obj["id"],
             "description": obj["description"],
-            "student_name": students[obj["student_id"]]["name"],
-            "subject_area": subjects[obj["subject_area_id"]]["name"],
+            "student_name": obj["student_name"],
+            "subject_area": obj["subject_area"],
             "logged_this_week": obj["id"] in logged_ids
         })
 
-    # 5. Final summary stats
+    # Final summary stats
     total = len(objectives)
     logged = len(logged_ids)
     percent = round((logged / total) * 100) if total else 0
@@ -95,4 +94,4 @@ def get_weekly_summary(
         "objectives_total": total,
         "objectives_left": total - logged,
         "objectives": summary
-    }
\ No newline at end of file
+    }
@@ -26,4 +26,19 @@ class CreateObjective(BaseModel):
     target_consistency_trials: int = Field(..., gt=0, description="Minimum number of successful trials")
     target_consistency_successes: int = Field(..., gt=0, description="Successes required for consistency")
 
+# --- Batch edits/deletes ---
+class ObjectiveEdit(BaseModel):
+    id: str
+    goal_id: Optional[UUID] = None
+    subject_area_id: Optional[UUID] = None
+    description: Optional[str] = None
+    objective_type: Optional[str] = None
+    target_accuracy: Optional[float] = Field(None, ge=0.0, le=1.0)
+    target_consistency_trials: Optional[int] = Field(None, gt=0)
+    target_consistency_successes: Optional[int] = Field(None, gt=0)
 
+class ObjectivesBatchEdit(RootModel):
+    root: List[ObjectiveEdit] = Field(..., min_length=1)
+
+class ObjectivesBatchDelete(BaseModel):
+    ids: List[str] = Field(..., min_length=1)
@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+# --- Progress reports ---
+class ReportCreate(BaseModel):
+    start: Optional[datetime] = Field(None, description="Start of the reporting period (inclusive)")
+    end: Optional[datetime] = Field(None, description="End of the reporting period (exclusive)")
+    student_ids: Optional[List[str]] = Field(None, description="Students to report on; all of the teacher's students if omitted")
+    report_id: Optional[str] = Field(None, description="Resume an existing report from its checkpoint")
+    concurrency: int = Field(4, ge=1, le=16, description="Objective narratives generated in parallel")
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, RootModel
+from pydantic import BaseModel, Field, RootModel, model_validator
 from typing import Optional, List
 from datetime import datetime
 
@@ -23,4 +23,31 @@ class SessionWithProgressCreate(BaseModel):
     objective_progress: ObjectiveProgressCreate
 
 class SessionsWithProgressCreate(RootModel):
-    root: List[SessionWithProgressCreate]
\ No newline at end of file
+    root: List[SessionWithProgressCreate]
+
+# --- Batch edits/deletes ---
+# Fields left out of an edit are unchanged; these columns can't be cleared
+NON_NULLABLE_EDIT_FIELDS = ("student_id", "objective_id", "created_at", "objective_progress")
+
+class SessionEdit(BaseModel):
+    id: str
+    student_id: Optional[str] = None
+    objective_id: Optional[str] = None
+    memo: Optional[str] = None
+    created_at: Optional[datetime] = None
+    objective_progress: Optional[ObjectiveProgressCreate] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def reject_explicit_nulls(cls, data):
+        if isinstance(data, dict):
+            nulls = [field for field in NON_NULLABLE_EDIT_FIELDS if field in data and data[field] is None]
+            if nulls:
+                raise ValueError(f"{', '.join(nulls)} cannot be null")
+        return data
+
+class SessionsBatchEdit(RootModel):
+    root: List[SessionEdit] = Field(..., min_length=1)
+
+class SessionsBatchDelete(BaseModel):
+    ids: List[str] = Field(..., min_length=1)
\ No newline at end of file
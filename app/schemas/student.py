@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional 
+from pydantic import BaseModel, Field
+from typing import List, Optional 
 from datetime import datetime
 # --- Students ---
 class Student(BaseModel):
@@ -18,4 +18,11 @@ class StudentCreate(BaseModel):
 
 class StudentCreateFromPDF(BaseModel):
     pdf_file: bytes
-    filename: str
\ No newline at end of file
+    filename: str
+
+# --- Bulk summary regeneration ---
+class SummaryJobCreate(BaseModel):
+    student_ids: Optional[List[str]] = Field(None, description="Students to refresh; all of the teacher's students if omitted")
+    job_id: Optional[str] = Field(None, description="Resume an existing job from its checkpoint")
+    concurrency: int = Field(4, ge=1, le=16, description="Summaries generated in parallel")
+    force: bool = Field(True, description="Regenerate even if the summary inputs are unchanged")
\ No newline at end of file
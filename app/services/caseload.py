@@ -0,0 +1,121 @@
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+import os
+
+from app.services import data_version
+from app.utils.chunked_query import fetch_all
+from app.utils.versioned_cache import VersionedCache
+
+# teacher -> CaseloadSnapshot, valid until any caseload scope is written.
+# Bounded across teachers; the least recently read snapshots are dropped first.
+_cache = VersionedCache(maxsize=int(os.getenv("CASELOAD_CACHE_SIZE", "256")))
+
+_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="caseload")
+
+CASELOAD_TABLES = ("students", "goals", "objectives", "subject_areas")
+
+
+def _newest_first(rows: List[Dict]) -> List[Dict]:
+    # Same order as .order("updated_at", desc=True): nulls first, then newest
+    return sorted(rows, key=lambda r: (r.get("updated_at") is None, r.get("updated_at") or ""), reverse=True)
+
+
+def _group(rows: List[Dict], column: str) -> Dict[str, List[Dict]]:
+    grouped = defaultdict(list)
+    for row in rows:
+        grouped[row.get(column)].append(row)
+    return dict(grouped)
+
+
+def pick(row: Optional[Dict], fields: Iterable[str]) -> Optional[Dict]:
+    """A copy of `row` narrowed to `fields`, or None, like a to-one embed."""
+    if row is None:
+        return None
+    return {field: row.get(field) for field in fields}
+
+
+class CaseloadSnapshot:
+    """
+    A teacher's students, goals, objectives and subject areas as plain rows,
+    each list newest-updated first, with id indexes and per-parent groupings.
+
+    Snapshots are shared between requests: treat rows as read-only and copy
+    them before adding keys.
+    """
+
+    def __init__(self, students: List[Dict], goals: List[Dict], objectives: List[Dict], subject_areas: List[Dict]):
+        self.students = _newest_first(students)
+        self.goals = _newest_first(goals)
+        self.objectives = _newest_first(objectives)
+        self.subject_areas = _newest_first(subject_areas)
+
+        self.students_by_id = {row["id"]: row for row in self.students}
+        self.goals_by_id = {row["id"]: row for row in self.goals}
+        self.objectives_by_id = {row["id"]: row for row in self.objectives}
+        self.subject_areas_by_id = {row["id"]: row for row in self.subject_areas}
+
+        self.goals_by_student = _group(self.goals, "student_id")
+        self.objectives_by_student = _group(self.objectives, "student_id")
+        self.objectives_by_goal = _group(self.objectives, "goal_id")
+        self.objectives_by_subject_area = _group(self.objectives, "subject_area_id")
+
+    def objective_with_relations(self, objective: Dict) -> Dict:
+        """Objective copy embedding subject_area {id, name} and goal {id, title}."""
+        return {
+            **objective,
+            "subject_area": pick(self.subject_areas_by_id.get(objective.get("subject_area_id")), ("id", "name")),
+            "goal": pick(self.goals_by_id.get(objective.get("goal_id")), ("id", "title")),
+        }
+
+    def students_with_objectives(self) -> List[Dict]:
+        """Student copies embedding their objectives, each with its subject area and goal."""
+        return [
+            {
+                **student,
+                "objectives": [
+                    self.objective_with_relations(o) for o in self.objectives_by_student.get(student["id"], [])
+                ],
+            }
+            for student in self.students
+        ]
+
+
+def load_caseload(supabase, user_id: str) -> CaseloadSnapshot:
+    """Fetch the four caseload tables concurrently, bypassing the cache."""
+    futures = [
+        _pool.submit(fetch_all, lambda table=table: supabase.table(table).select("*").eq("teacher_id", user_id).order("id"))
+        for table in CASELOAD_TABLES
+    ]
+    return CaseloadSnapshot(*(future.result() for future in futures))
+
+
+def get_caseload(supabase, user_id: str) -> CaseloadSnapshot:
+    """
+    Read-through snapshot of a teacher's caseload.
+
+    Every write to students, goals, objectives or subject areas bumps its
+    data_version scope, so the next read after a write reloads. Writes from
+    elsewhere are picked up once a conditional read syncs the scopes with the
+    database (data_version.sync).
+    """
+    version = data_version.current(user_id, *data_version.CASELOAD)
+    return _cache.get_or_compute(user_id, version, lambda: load_caseload(supabase, user_id))
+
+
+def update_cached_student(user_id: str, student_id: str, values: Dict):
+    """
+    Apply a write of columns nothing else in the snapshot is derived from
+    (the summary) to the cached snapshot, instead of bumping STUDENTS and
+    reloading the whole caseload. The row is replaced, not mutated, since
+    readers may be copying the old one.
+    """
+    def replace(snapshot: CaseloadSnapshot):
+        student = snapshot.students_by_id.get(student_id)
+        if student is None:
+            return
+        updated = {**student, **values}
+        snapshot.students_by_id[student_id] = updated
+        snapshot.students = [updated if row is student else row for row in snapshot.students]
+
+    _cache.modify(user_id, replace)
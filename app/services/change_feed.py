@@ -0,0 +1,132 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+import base64
+import json
+import os
+import uuid
+
+# Synced tables and what each row carries. Sessions embed their progress row,
+# which touches the session when it changes.
+CHANGE_TABLES = {
+    "students": "*",
+    "goals": "*",
+    "objectives": "*",
+    "subject_areas": "*",
+    "sessions": "*, objective_progress:objective_progress(*)",
+}
+TOMBSTONE_TABLE = "tombstones"
+
+# Tombstones are kept this long (see prune_tombstones); older cursors must resync
+TOMBSTONE_RETENTION_DAYS = int(os.getenv("TOMBSTONE_RETENTION_DAYS", "30"))
+
+# A poll re-reads this far behind its last position, so a row whose
+# transaction committed after a later row was already served is still seen.
+# Clients upsert by id, so the re-read rows are harmless.
+CHANGES_OVERLAP_SECONDS = 5
+
+_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="change-feed")
+
+
+def encode_changes_cursor(positions: Dict[str, List], overlap: bool, issued_at: str) -> str:
+    payload = json.dumps(
+        {"p": positions, "o": overlap, "t": issued_at},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _position(table: str, position) -> List:
+    """
+    Validated [timestamp, id] with both parts re-rendered, since they are
+    interpolated into an or_ filter: ids are UUIDs, except tombstones' which
+    are integers.
+    """
+    if not (isinstance(position, list) and len(position) == 2):
+        raise ValueError("Invalid cursor")
+    value, row_id = position
+    if not isinstance(value, str) or isinstance(row_id, bool):
+        raise ValueError("Invalid cursor")
+    value = datetime.fromisoformat(value).isoformat()
+    row_id = str(int(row_id)) if table == TOMBSTONE_TABLE else str(uuid.UUID(row_id))
+    return [value, row_id]
+
+
+def decode_changes_cursor(cursor: str) -> Dict:
+    """
+    Decode into {"p": positions, "o": overlap, "t": issued_at}, positions
+    validated. Raises ValueError if malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        positions = state["p"]
+        datetime.fromisoformat(state["t"])
+        known = set(CHANGE_TABLES) | {TOMBSTONE_TABLE}
+        if not isinstance(positions, dict) or not set(positions) <= known or not isinstance(state["o"], bool):
+            raise ValueError("Invalid cursor")
+        state["p"] = {table: _position(table, position) for table, position in positions.items()}
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return state
+
+
+def cursor_expired(state: Dict) -> bool:
+    issued_at = datetime.fromisoformat(state["t"])
+    return issued_at < datetime.now(timezone.utc) - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+
+
+def _after(query, column: str, position: Optional[List], overlap: bool, limit: int):
+    """Rows after `position` in (column, id) order, or from CHANGES_OVERLAP_SECONDS before it."""
+    if position:
+        value, row_id = position
+        if overlap:
+            since = datetime.fromisoformat(value) - timedelta(seconds=CHANGES_OVERLAP_SECONDS)
+            query = query.gte(column, since.isoformat())
+        else:
+            query = query.or_(f'{column}.gt."{value}",and({column}.eq."{value}",id.gt."{row_id}")')
+    return query.order(column).order("id").limit(limit + 1)
+
+
+def fetch_changes(supabase, user_id: str, positions: Dict[str, List], overlap: bool, limit: int) -> Dict:
+    """
+    One page of changes per table after `positions` (table -> [updated_at, id]),
+    read concurrently from the (teacher_id, updated_at, id) indexes.
+
+    Returns {"changes": {table: rows}, "deleted": {table: ids},
+    "positions": new positions, "has_more": bool}. `overlap` re-reads a few
+    seconds behind each position; pages after the first of a poll don't.
+    """
+    def table_page(table: str):
+        query = supabase.table(table).select(CHANGE_TABLES[table]).eq("teacher_id", user_id)
+        return _after(query, "updated_at", positions.get(table), overlap, limit).execute().data or []
+
+    def tombstone_page():
+        query = supabase.table(TOMBSTONE_TABLE).select("id, table_name, row_id, deleted_at").eq("teacher_id", user_id)
+        return _after(query, "deleted_at", positions.get(TOMBSTONE_TABLE), overlap, limit).execute().data or []
+
+    futures = {table: _pool.submit(table_page, table) for table in CHANGE_TABLES}
+    tombstones_future = _pool.submit(tombstone_page)
+
+    new_positions = dict(positions)
+    has_more = False
+
+    changes = {}
+    for table, future in futures.items():
+        rows = future.result()
+        has_more = has_more or len(rows) > limit
+        rows = rows[:limit]
+        if rows:
+            new_positions[table] = [rows[-1]["updated_at"], rows[-1]["id"]]
+            changes[table] = rows
+
+    tombstones = tombstones_future.result()
+    has_more = has_more or len(tombstones) > limit
+    tombstones = tombstones[:limit]
+    deleted: Dict[str, List[str]] = {}
+    for tombstone in tombstones:
+        deleted.setdefault(tombstone["table_name"], []).append(tombstone["row_id"])
+    if tombstones:
+        new_positions[TOMBSTONE_TABLE] = [tombstones[-1]["deleted_at"], str(tombstones[-1]["id"])]
+
+    return {"changes": changes, "deleted": deleted, "positions": new_positions, "has_more": has_more}
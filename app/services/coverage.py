@@ -0,0 +1,207 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.services.progress_engine import parse_timestamp
+from app.utils.chunked_query import fetch_all
+
+# Longest range one coverage request may span
+MAX_COVERAGE_DAYS = 400
+
+PERIOD_DAYS = {"day": 1, "week": 7, "month": 30, "quarter": 91}
+
+# The rollup's last_logged_at dates objectives with no sessions in the range
+COVERAGE_OBJECTIVE_SELECT = (
+    "id, description, student_id, reporting_frequency, student:students(id, name), "
+    "rollup:objective_rollups(last_logged_at)"
+)
+
+_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="coverage")
+
+
+def as_utc(value: datetime) -> datetime:
+    """Dates without a timezone are taken as UTC, like the weekly summary's week boundaries."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def reporting_period(frequency: Optional[str]) -> str:
+    """
+    Map a free-text reporting_frequency onto the period it must be logged in.
+    Anything unrecognised ("At Opportunity", missing) is expected weekly,
+    matching the weekly summary.
+    """
+    text = (frequency or "").lower()
+    for period, keyword in (("day", "daily"), ("week", "weekly"), ("month", "monthly"), ("quarter", "quarterly")):
+        if keyword in text:
+            return period
+    return "week"
+
+
+def _period_keys(days: np.ndarray, period: str) -> np.ndarray:
+    if period == "week":
+        # 1970-01-01 was a Thursday; shift so weeks start on Monday
+        return days - ((days.astype(np.int64) + 3) % 7).astype("timedelta64[D]")
+    if period == "month":
+        return days.astype("datetime64[M]").astype(np.int64)
+    if period == "quarter":
+        return days.astype("datetime64[M]").astype(np.int64) // 3
+    return days
+
+
+def _rollup_last_logged(objective: Dict) -> Optional[float]:
+    rollup = objective.get("rollup")
+    if isinstance(rollup, list):
+        rollup = rollup[0] if rollup else None
+    value = (rollup or {}).get("last_logged_at")
+    return parse_timestamp(value) if value else None
+
+
+def compute_coverage(
+    objectives: List[Dict],
+    sessions: List[Dict],
+    start: datetime,
+    end: datetime,
+    now: Optional[datetime] = None,
+) -> Dict:
+    """
+    Expected vs actual logging per objective over [start, end).
+
+    Sessions are scattered into one objectives x days bitmap; each reporting
+    period (day, Monday week, month, quarter) is an OR-reduction over its run
+    of day columns, so the whole range is one pass per period kind. Daily
+    objectives are only expected on weekdays.
+
+    Only periods that have ended are expected: the period containing today is
+    still open, so it counts neither as expected nor as missed and is reported
+    as current_period_logged instead. overdue_days counts whole days since the
+    objective was last logged (or since the range start if it never was).
+    """
+    start, end = as_utc(start), as_utc(end)
+    now = as_utc(now) if now else datetime.now(timezone.utc)
+    today = np.datetime64(now.date(), "D")
+    first_day = np.datetime64(start.date(), "D")
+    last_day = np.datetime64((end - timedelta(microseconds=1)).date(), "D")
+    # Days after today can't have been logged yet
+    as_of = min(last_day, today)
+    # Overdue is measured up to the end of the range, or now if that's sooner
+    until = min(end, now).timestamp()
+
+    n_days = max(int((as_of - first_day).astype(np.int64)) + 1, 0)
+    days = first_day + np.arange(n_days).astype("timedelta64[D]")
+
+    index = {obj["id"]: i for i, obj in enumerate(objectives)}
+    k = len(objectives)
+
+    logged = [s for s in sessions if s.get("objective_id") in index and s.get("created_at")]
+    obj_idx = np.fromiter((index[s["objective_id"]] for s in logged), dtype=np.int64, count=len(logged))
+    ts = np.fromiter((parse_timestamp(s["created_at"]) for s in logged), dtype=np.float64, count=len(logged))
+    day_idx = (ts // 86400).astype(np.int64) - first_day.astype(np.int64)
+    in_range = (day_idx >= 0) & (day_idx < n_days)
+    obj_idx, day_idx = obj_idx[in_range], day_idx[in_range]
+
+    bitmap = np.zeros((k, n_days), dtype=bool)
+    bitmap[obj_idx, day_idx] = True
+    sessions_logged = np.bincount(obj_idx, minlength=k)
+
+    # Latest log per objective: in range if there is one, else the rollup's
+    # when it predates the range, else nothing is known before the range start
+    last_ts = np.full(k, -np.inf)
+    np.maximum.at(last_ts, obj_idx, ts[in_range])
+    for i, objective in enumerate(objectives):
+        if last_ts[i] == -np.inf:
+            before = _rollup_last_logged(objective)
+            last_ts[i] = before if before is not None and before < start.timestamp() else start.timestamp()
+
+    # Last logged day in range, per objective
+    any_logged = bitmap.any(axis=1)
+    last_day_idx = np.full(k, -1)
+    if n_days:
+        last_day_idx = np.where(any_logged, n_days - 1 - np.argmax(bitmap[:, ::-1], axis=1), -1)
+
+    periods = np.array([reporting_period(obj.get("reporting_frequency")) for obj in objectives])
+    expected = np.zeros(k, dtype=np.int64)
+    actual = np.zeros(k, dtype=np.int64)
+    trailing_missed = np.zeros(k, dtype=np.int64)
+    current_logged = np.full(k, None, dtype=object)
+
+    weekday = (days.astype(np.int64) + 3) % 7
+    for period in PERIOD_DAYS:
+        rows = np.flatnonzero(periods == period)
+        if len(rows) == 0 or n_days == 0:
+            continue
+        columns = np.flatnonzero(weekday < 5) if period == "day" else np.arange(n_days)
+        if len(columns) == 0:
+            continue
+        keys = _period_keys(days[columns], period)
+        boundaries = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        hits = np.logical_or.reduceat(bitmap[np.ix_(rows, columns)], boundaries, axis=1)
+        # Columns stop at today, so only the last period can still be open
+        if days[columns[-1]] == today:
+            current_logged[rows] = hits[:, -1]
+            hits = hits[:, :-1]
+
+        n_periods = hits.shape[1]
+        expected[rows] = n_periods
+        actual[rows] = hits.sum(axis=1)
+        last_hit = np.where(hits.any(axis=1), n_periods - 1 - np.argmax(hits[:, ::-1], axis=1), -1)
+        trailing_missed[rows] = n_periods - 1 - last_hit
+
+    overdue_days = np.where(trailing_missed > 0, np.maximum((until - last_ts) // 86400, 0), 0).astype(np.int64)
+
+    results = []
+    for i, objective in enumerate(objectives):
+        results.append({
+            "objective_id": objective["id"],
+            "description": objective.get("description"),
+            "student_id": objective.get("student_id"),
+            "student_name": (objective.get("student") or {}).get("name"),
+            "reporting_frequency": objective.get("reporting_frequency"),
+            "period": str(periods[i]),
+            "expected": int(expected[i]),
+            "logged": int(actual[i]),
+            "missed": int(expected[i] - actual[i]),
+            "coverage": round(actual[i] / expected[i], 4) if expected[i] else None,
+            "sessions_logged": int(sessions_logged[i]),
+            "last_logged_on": str(days[last_day_idx[i]]) if last_day_idx[i] >= 0 else None,
+            "current_period_logged": None if current_logged[i] is None else bool(current_logged[i]),
+            "consecutive_missed": int(trailing_missed[i]),
+            "overdue_days": int(overdue_days[i]),
+        })
+
+    overdue = sorted(
+        (r for r in results if r["consecutive_missed"] > 0),
+        key=lambda r: (-r["overdue_days"], -r["missed"], r["objective_id"]),
+    )
+
+    expected_total = int(expected.sum())
+    logged_total = int(actual.sum())
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "as_of": str(as_of),
+        "objectives_total": k,
+        "expected_total": expected_total,
+        "logged_total": logged_total,
+        "coverage_percent": round(logged_total / expected_total * 100) if expected_total else 0,
+        "overdue": overdue,
+        "objectives": results,
+    }
+
+
+def load_coverage_inputs(supabase, user_id: str, start: datetime, end: datetime):
+    """Objectives and the range's session timestamps, fetched concurrently."""
+    start, end = as_utc(start), as_utc(end)
+    objectives = _pool.submit(
+        fetch_all,
+        lambda: supabase.table("objectives").select(COVERAGE_OBJECTIVE_SELECT).eq("teacher_id", user_id).order("id"),
+    )
+    sessions = _pool.submit(
+        fetch_all,
+        lambda: supabase.table("sessions").select("id, objective_id, created_at")
+        .eq("teacher_id", user_id).gte("created_at", start.isoformat()).lt("created_at", end.isoformat()).order("id"),
+    )
+    return objectives.result(), sessions.result()
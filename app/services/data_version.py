@@ -0,0 +1,64 @@
+import threading
+import uuid
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+
+# Scopes a teacher's data is versioned under. Write routes bump the scopes they
+# touch; readers combine the scopes their response depends on.
+STUDENTS = "students"
+OBJECTIVES = "objectives"
+GOALS = "goals"
+SUBJECT_AREAS = "subject_areas"
+SESSIONS = "sessions"
+# Student summaries and their regeneration status. Kept out of CASELOAD so
+# summary churn doesn't reload the caseload snapshot.
+SUMMARIES = "summaries"
+# Objective rollups, written in the background after the session write that
+# already bumped SESSIONS. Only progress reads depend on it.
+PROGRESS = "progress"
+
+CASELOAD = (STUDENTS, GOALS, OBJECTIVES, SUBJECT_AREAS)
+ALL = CASELOAD + (SESSIONS, SUMMARIES)
+
+# Distinguishes this process's counters from another process's (or a previous
+# run's) so versions are never confused across restarts.
+BOOT_ID = uuid.uuid4().hex
+
+_lock = threading.Lock()
+_versions: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+# teacher -> scope -> database marker last seen by sync()
+_markers: Dict[str, Dict[str, Optional[str]]] = defaultdict(dict)
+
+
+def bump(teacher_id: str, *scopes: str):
+    """Record that a teacher's data in `scopes` changed."""
+    with _lock:
+        versions = _versions[teacher_id]
+        for scope in scopes:
+            versions[scope] += 1
+
+
+def current(teacher_id: str, *scopes: str) -> Tuple:
+    """Opaque version of a teacher's data across `scopes`; changes whenever any of them is bumped."""
+    with _lock:
+        versions = _versions[teacher_id]
+        return (BOOT_ID,) + tuple(versions[scope] for scope in scopes)
+
+
+def sync(supabase, teacher_id: str, *scopes: str):
+    """
+    Bump any of `scopes` whose database marker (newest updated_at or tombstone,
+    see the data_markers RPC) moved since this process last looked, so writes
+    made by another process or outside the API are not served from counters
+    that never saw them. One cheap query.
+    """
+    markers = supabase.rpc("data_markers", {"p_teacher_id": teacher_id}).execute().data or {}
+    with _lock:
+        seen = _markers[teacher_id]
+        versions = _versions[teacher_id]
+        for scope in scopes:
+            if scope not in markers:
+                continue
+            if scope not in seen or seen[scope] != markers[scope]:
+                seen[scope] = markers[scope]
+                versions[scope] += 1
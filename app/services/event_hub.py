@@ -0,0 +1,162 @@
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, Optional, Set, Tuple
+import asyncio
+import logging
+import os
+import threading
+import uuid
+
+from cachetools import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Events a subscriber may have waiting before it counts as a slow client
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "100"))
+# Recent events kept per teacher so a reconnect with Last-Event-ID can catch up
+EVENT_REPLAY_SIZE = int(os.getenv("EVENT_REPLAY_SIZE", "100"))
+MAX_SUBSCRIBERS_PER_TEACHER = int(os.getenv("MAX_SUBSCRIBERS_PER_TEACHER", "10"))
+
+# Event types
+STUDENT_SUMMARY = "student_summary"
+PROGRESS = "progress"
+SUMMARY_JOB = "summary_job"
+REPORT = "report"
+# Sent instead of events a subscriber missed; the client should refetch
+RESYNC = "resync"
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+class Subscription:
+    """
+    One connected client. Events arrive on `queue` from any thread; when the
+    client falls EVENT_QUEUE_SIZE events behind, its backlog is dropped and
+    replaced by a single resync event, so a slow reader never holds memory
+    or blocks publishers.
+    """
+
+    def __init__(self, teacher_id: str, loop: asyncio.AbstractEventLoop):
+        self.teacher_id = teacher_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+
+    def _deliver(self, event: Dict):
+        # Runs on the subscriber's event loop
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(_resync_event(event["id"]))
+            logger.info(f"Event subscriber for teacher {self.teacher_id} fell behind; sent resync")
+
+
+def _resync_event(event_id: str) -> Dict:
+    return {"id": event_id, "type": RESYNC, "data": {}, "at": datetime.now(timezone.utc).isoformat()}
+
+
+class _History:
+    """
+    A teacher's recent events. Ids are "<epoch>-<seq>": seq counts up so gaps
+    are detectable, and the epoch is new whenever the history is (re)created,
+    after a restart or an LRU eviction, so an id from an earlier history
+    never matches a position in this one.
+    """
+
+    def __init__(self):
+        self.epoch = uuid.uuid4().hex[:12]
+        self.seq = 0
+        self.events: Deque[Dict] = deque(maxlen=EVENT_REPLAY_SIZE)
+
+    def latest_id(self) -> str:
+        return f"{self.epoch}-{self.seq}"
+
+
+def parse_event_id(event_id: str) -> Optional[Tuple[str, int]]:
+    """(epoch, seq) of an event id, or None if it isn't one of ours."""
+    epoch, _, seq = event_id.strip().rpartition("-")
+    if not epoch or not seq.isdigit():
+        return None
+    return epoch, int(seq)
+
+
+# In-process only: subscribers hear events published by this worker, and
+# histories (and so epochs) are per worker too.
+_lock = threading.Lock()
+_subscribers: Dict[str, Set[Subscription]] = {}
+# teacher -> _History
+_history: LRUCache = LRUCache(maxsize=1000)
+
+
+def _teacher_history(teacher_id: str) -> _History:
+    # Caller must hold _lock
+    history = _history.get(teacher_id)
+    if history is None:
+        history = _history[teacher_id] = _History()
+    return history
+
+
+def publish(teacher_id: str, event_type: str, data: Dict):
+    """Send an event to every subscriber of a teacher. Safe to call from any thread; never blocks."""
+    with _lock:
+        history = _teacher_history(teacher_id)
+        history.seq += 1
+        event = {
+            "id": history.latest_id(),
+            "seq": history.seq,
+            "type": event_type,
+            "data": data,
+            "at": datetime.now(timezone.utc).isoformat(),
+        }
+        history.events.append(event)
+        subscribers = list(_subscribers.get(teacher_id, ()))
+
+    for subscription in subscribers:
+        try:
+            subscription.loop.call_soon_threadsafe(subscription._deliver, event)
+        except RuntimeError:
+            # Loop already closed; the subscription is being torn down
+            pass
+
+
+def subscribe(teacher_id: str, last_event_id: Optional[str] = None) -> Subscription:
+    """
+    Register a subscriber on the running event loop. With `last_event_id`,
+    buffered events after it are queued first, or a resync if some of them
+    are no longer buffered or the id is from another epoch (a restart or an
+    evicted history).
+    """
+    subscription = Subscription(teacher_id, asyncio.get_running_loop())
+    with _lock:
+        subscribers = _subscribers.setdefault(teacher_id, set())
+        if len(subscribers) >= MAX_SUBSCRIBERS_PER_TEACHER:
+            raise TooManySubscribers(teacher_id)
+        subscribers.add(subscription)
+
+        if last_event_id is not None:
+            history = _teacher_history(teacher_id)
+            position = parse_event_id(last_event_id)
+            oldest = history.events[0]["seq"] if history.events else history.seq + 1
+            if position is None or position[0] != history.epoch or not oldest - 1 <= position[1] <= history.seq:
+                missed = None
+            else:
+                missed = [event for event in history.events if event["seq"] > position[1]]
+            if missed is None or len(missed) > EVENT_QUEUE_SIZE:
+                subscription.queue.put_nowait(_resync_event(history.latest_id()))
+            else:
+                for event in missed:
+                    subscription.queue.put_nowait(event)
+    return subscription
+
+
+def unsubscribe(subscription: Subscription):
+    with _lock:
+        subscribers = _subscribers.get(subscription.teacher_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del _subscribers[subscription.teacher_id]
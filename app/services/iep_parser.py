@@ -1,5 +1,4 @@
 import os
-import json
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field, ValidationError
@@ -8,6 +7,7 @@ import pdfplumber
 from tempfile import NamedTemporaryFile
 import logging
 from app.services.objective_parser import parse_objective
+from app.services.llm import chat_structured, StructuredOutputError
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -176,7 +176,7 @@ class IEPParser:
 
         return "\n".join(text_chunks)
 
-    def get_raw_response(self, text: str) -> str:
+    def build_messages(self, text: str) -> List[Dict[str, str]]:
         instructions = (
             "You are parsing an IEP. Return valid JSON with these fields:\n"
             "1) student_name (string)\n"
@@ -194,17 +194,30 @@ class IEPParser:
             "- Return ONLY valid JSON. No markdown or extra text.\n"
             "- Capture area of need, goals, and objectives exactly as they appear."
         )
-
+        return [
+            {"role": "system", "content": instructions},
+            {"role": "user", "content": f"IEP Text:\n{text}"}
+        ]
+
+    def get_structured_response(self, text: str) -> IEP:
+        """
+        Request the IEP in JSON mode and validate it against the IEP model.
+
+        Malformed output is repaired locally first; the model is only asked
+        again when repair and cleaning still don't yield a valid IEP.
+        """
         try:
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": instructions},
-                    {"role": "user", "content": f"IEP Text:\n{text}"}
-                ],
-                temperature=0.3
+            return chat_structured(
+                self.build_messages(text),
+                IEP,
+                temperature=0.3,
+                llm_client=self.client,
+                llm_model=self.model_name,
+                prepare=clean_model_output,
             )
-            return response.choices[0].message.content.strip()
+        except StructuredOutputError as e:
+            logger.error(f"Invalid JSON returned from model: {str(e)[:100]}...")
+            raise ValueError(f"Invalid JSON returned from model: {str(e)}")
         except Exception as e:
             logger.error(f"Error calling OpenAI API: {str(e)}")
             raise RuntimeError(f"Error calling OpenAI API: {str(e)}")
@@ -215,18 +228,9 @@ class IEPParser:
             text = self.extract_text_from_pdf_bytes(pdf_bytes)
             logger.info(f"Extracted {len(text)} characters from PDF")
             
-            raw_response = self.get_raw_response(text)
+            iep_obj = self.get_structured_response(text)
             logger.info("Received response from OpenAI")
-            
-            try:
-                parsed_json = json.loads(raw_response)
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON returned from model: {raw_response[:100]}...")
-                raise ValueError(f"Invalid JSON returned from model: {str(e)}")
-
-            cleaned_data = clean_model_output(parsed_json)
-            iep_obj = IEP(**cleaned_data)
             return iep_obj
         except Exception as e:
             logger.error(f"Error parsing IEP: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
\ No newline at end of file
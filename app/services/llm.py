@@ -0,0 +1,129 @@
+from together import Together
+from openai import OpenAI
+from pydantic import BaseModel, ValidationError
+from typing import Callable, Dict, List, Optional, Type, TypeVar
+import logging
+import os
+
+from dotenv import load_dotenv
+from app.utils.json_repair import parse_json_lenient
+from app.utils.single_flight import SingleFlight, hash_key
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+client = Together(api_key=os.getenv("TOGETHER_API_KEY"))  # auth defaults to env TOGETHER_API_KEY
+model = os.getenv("TOGETHER_MODEL", "meta-llama/Llama-3.3-70B-Instruct-Turbo-Free")
+
+T = TypeVar("T", bound=BaseModel)
+
+# Identical prompts in flight at the same time (double clicks, frontend retries,
+# several sessions for one student) share a single completion.
+_inflight = SingleFlight()
+
+
+class StructuredOutputError(ValueError):
+    """The model did not produce output matching the requested schema."""
+
+
+def json_response_format(llm_client, response_model: Type[BaseModel]) -> Dict:
+    """
+    Provider-specific JSON mode for a Pydantic model.
+
+    Together accepts the JSON schema alongside json_object mode; OpenAI's
+    json_object mode only guarantees syntactically valid JSON, so the schema
+    is enforced by validation afterwards.
+    """
+    if isinstance(llm_client, OpenAI):
+        return {"type": "json_object"}
+    return {"type": "json_object", "schema": response_model.model_json_schema()}
+
+
+def chat(
+    messages: List[Dict],
+    temperature: float = 0.2,
+    max_tokens: Optional[int] = None,
+    response_format: Optional[Dict] = None,
+    llm_client=None,
+    llm_model: Optional[str] = None,
+) -> str:
+    """
+    Run a chat completion and return the stripped message content.
+
+    Concurrent calls with the same client type, model, messages and sampling
+    parameters are coalesced into one provider request.
+    """
+    llm_client = llm_client or client
+    kwargs = {
+        "model": llm_model or model,
+        "messages": messages,
+        "temperature": temperature,
+    }
+    if max_tokens is not None:
+        kwargs["max_tokens"] = max_tokens
+    if response_format is not None:
+        kwargs["response_format"] = response_format
+
+    key = hash_key(type(llm_client).__name__, kwargs)
+    return _inflight.do(key, _complete, llm_client, kwargs)
+
+
+def _complete(llm_client, kwargs: Dict) -> str:
+    response = llm_client.chat.completions.create(**kwargs)
+
+    if not response.choices or not response.choices[0].message.content:
+        raise RuntimeError("LLM returned an empty response")
+
+    return response.choices[0].message.content.strip()
+
+
+def chat_structured(
+    messages: List[Dict],
+    response_model: Type[T],
+    temperature: float = 0.2,
+    max_tokens: Optional[int] = None,
+    llm_client=None,
+    llm_model: Optional[str] = None,
+    prepare: Optional[Callable] = None,
+    retries: int = 1,
+) -> T:
+    """
+    Run a chat completion in JSON mode and validate it against `response_model`.
+
+    The raw content goes through the lenient JSON repair parser and the
+    optional `prepare` hook before validation. Only when that fails is the
+    model asked again, with the validation error fed back to it.
+    """
+    llm_client = llm_client or client
+    response_format = json_response_format(llm_client, response_model)
+    attempt_messages = list(messages)
+    last_error = None
+
+    for attempt in range(retries + 1):
+        raw = chat(
+            attempt_messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_format=response_format,
+            llm_client=llm_client,
+            llm_model=llm_model,
+        )
+        try:
+            data = parse_json_lenient(raw)
+            if prepare is not None:
+                data = prepare(data)
+            return response_model.model_validate(data)
+        except (ValueError, ValidationError) as e:
+            last_error = e
+            logger.warning(f"Structured output attempt {attempt + 1} failed: {str(e)[:200]}")
+            attempt_messages = list(messages) + [
+                {"role": "assistant", "content": raw},
+                {
+                    "role": "user",
+                    "content": f"That reply did not match the required JSON schema ({str(e)[:500]}). "
+                               "Reply again with ONLY the corrected JSON.",
+                },
+            ]
+
+    raise StructuredOutputError(f"Model output did not match {response_model.__name__}: {str(last_error)}")
@@ -0,0 +1,271 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.utils.chunked_query import fetch_all
+from app.utils.downsample import lttb
+
+# Used when an objective has no consistency target set
+DEFAULT_WINDOW = 10
+DEFAULT_REQUIRED = 8
+
+# Trend is the least-squares slope of per-session accuracy across the last-N
+# window; fewer points than this give no trend
+MIN_TREND_SESSIONS = 3
+TREND_EPSILON = 0.01
+
+PROGRESS_OBJECTIVE_SELECT = (
+    "id, student_id, description, objective_type, target_accuracy, "
+    "target_consistency_trials, target_consistency_successes"
+)
+PROGRESS_SESSION_SELECT = "id, objective_id, created_at, objective_progress:objective_progress(trials_completed, trials_total)"
+
+
+def normalize_target(value) -> float:
+    """Targets are stored as fractions, but IEP imports sometimes carry percentages (e.g. 80)."""
+    if value is None:
+        return 1.0
+    value = float(value)
+    return value / 100.0 if value > 1 else value
+
+
+def parse_timestamp(value: str) -> float:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def load_progress_inputs(
+    supabase,
+    user_id: str,
+    student_id: Optional[str] = None,
+    objective_id: Optional[str] = None,
+):
+    """Fetch (objectives, sessions with their progress rows) for a teacher, optionally narrowed."""
+    def objectives_query():
+        query = supabase.table("objectives").select(PROGRESS_OBJECTIVE_SELECT).eq("teacher_id", user_id)
+        if student_id:
+            query = query.eq("student_id", student_id)
+        if objective_id:
+            query = query.eq("id", objective_id)
+        return query.order("id")
+
+    def sessions_query():
+        query = supabase.table("sessions").select(PROGRESS_SESSION_SELECT).eq("teacher_id", user_id)
+        if student_id:
+            query = query.eq("student_id", student_id)
+        if objective_id:
+            query = query.eq("objective_id", objective_id)
+        return query.order("id")
+
+    return fetch_all(objectives_query), fetch_all(sessions_query)
+
+
+def to_arrays(objectives: List[Dict], sessions: List[Dict]) -> Dict[str, np.ndarray]:
+    """
+    Flatten session history into parallel arrays sorted by (objective, created_at).
+    Sessions for objectives not in `objectives`, or without a progress row, are dropped.
+    """
+    index = {obj["id"]: i for i, obj in enumerate(objectives)}
+
+    # One column at a time straight into arrays; no per-session intermediate objects
+    kept = [
+        s for s in sessions
+        if s.get("objective_id") in index and s.get("objective_progress") and s.get("created_at")
+    ]
+    count = len(kept)
+
+    obj_idx = np.fromiter((index[s["objective_id"]] for s in kept), dtype=np.int64, count=count)
+    ts = np.fromiter((parse_timestamp(s["created_at"]) for s in kept), dtype=np.float64, count=count)
+    completed = np.fromiter((s["objective_progress"]["trials_completed"] or 0 for s in kept), dtype=np.float64, count=count)
+    total = np.fromiter((s["objective_progress"]["trials_total"] or 0 for s in kept), dtype=np.float64, count=count)
+    order = np.lexsort((ts, obj_idx))
+
+    return {
+        "obj": obj_idx[order],
+        "ts": ts[order],
+        "completed": completed[order],
+        "total": total[order],
+    }
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    return np.divide(numerator, denominator, out=np.full(numerator.shape, np.nan), where=denominator > 0)
+
+
+def compute_progress(objectives: List[Dict], sessions: List[Dict]) -> List[Dict]:
+    """
+    Per-objective progress over the whole history, computed without per-objective loops:
+    overall and last-N accuracy, how many of the last N sessions met the target,
+    the accuracy trend across that window, and mastery status.
+    """
+    k = len(objectives)
+    if k == 0:
+        return []
+
+    target = np.array([normalize_target(obj.get("target_accuracy")) for obj in objectives])
+    window = np.array([obj.get("target_consistency_trials") or DEFAULT_WINDOW for obj in objectives], dtype=np.int64)
+    window = np.maximum(window, 1)
+    required = np.array([obj.get("target_consistency_successes") or DEFAULT_REQUIRED for obj in objectives], dtype=np.int64)
+    required = np.clip(required, 1, window)
+
+    a = to_arrays(objectives, sessions)
+    obj, completed, total = a["obj"], a["completed"], a["total"]
+    n = len(obj)
+
+    counts = np.bincount(obj, minlength=k)
+    starts = np.cumsum(counts) - counts
+
+    # Position of each session within its objective's history, and from the end of it
+    pos = np.arange(n) - starts[obj]
+    from_end = counts[obj] - 1 - pos
+    in_window = from_end < window[obj]
+
+    valid = total > 0
+    accuracy = _ratio(completed, total)
+    hit = valid & (accuracy >= target[obj] - 1e-9)
+
+    sum_completed = np.bincount(obj, weights=completed, minlength=k)
+    sum_total = np.bincount(obj, weights=total, minlength=k)
+    win_completed = np.bincount(obj, weights=completed * in_window, minlength=k)
+    win_total = np.bincount(obj, weights=total * in_window, minlength=k)
+    window_hits = np.bincount(obj, weights=hit & in_window, minlength=k).astype(np.int64)
+    window_sessions = np.minimum(counts, window)
+    mastered = (counts >= window) & (window_hits >= required)
+
+    # Least-squares slope of accuracy against session order within the window
+    m = in_window & valid
+    x = (window_sessions[obj] - 1 - from_end).astype(np.float64)
+    y = np.nan_to_num(accuracy)
+    pts = np.bincount(obj[m], minlength=k).astype(np.float64)
+    sx = np.bincount(obj[m], weights=x[m], minlength=k)
+    sy = np.bincount(obj[m], weights=y[m], minlength=k)
+    sxx = np.bincount(obj[m], weights=x[m] * x[m], minlength=k)
+    sxy = np.bincount(obj[m], weights=x[m] * y[m], minlength=k)
+    denom = pts * sxx - sx * sx
+    slope = _ratio(pts * sxy - sx * sy, np.where(pts >= MIN_TREND_SESSIONS, denom, 0.0))
+
+    overall_accuracy = _ratio(sum_completed, sum_total)
+    recent_accuracy = _ratio(win_completed, win_total)
+
+    last_ts = np.full(k, np.nan)
+    logged = counts > 0
+    last_ts[logged] = a["ts"][starts[logged] + counts[logged] - 1]
+
+    results = []
+    for i, objective in enumerate(objectives):
+        if counts[i] == 0:
+            status = "not_started"
+        elif mastered[i]:
+            status = "mastered"
+        elif not np.isnan(recent_accuracy[i]) and recent_accuracy[i] >= target[i]:
+            status = "on_track"
+        else:
+            status = "needs_support"
+
+        if np.isnan(slope[i]):
+            trend_direction = None
+        elif slope[i] > TREND_EPSILON:
+            trend_direction = "improving"
+        elif slope[i] < -TREND_EPSILON:
+            trend_direction = "declining"
+        else:
+            trend_direction = "flat"
+
+        results.append({
+            "objective_id": objective["id"],
+            "student_id": objective.get("student_id"),
+            "description": objective.get("description"),
+            "target_accuracy": float(target[i]),
+            "sessions_logged": int(counts[i]),
+            "trials_completed": int(sum_completed[i]),
+            "trials_total": int(sum_total[i]),
+            "accuracy": None if np.isnan(overall_accuracy[i]) else round(float(overall_accuracy[i]), 4),
+            "recent_accuracy": None if np.isnan(recent_accuracy[i]) else round(float(recent_accuracy[i]), 4),
+            "consistency": {
+                "window": int(window[i]),
+                "required": int(required[i]),
+                "sessions": int(window_sessions[i]),
+                "at_target": int(window_hits[i]),
+            },
+            "trend": None if np.isnan(slope[i]) else round(float(slope[i]), 4),
+            "trend_direction": trend_direction,
+            "last_logged_at": None if np.isnan(last_ts[i]) else datetime.fromtimestamp(last_ts[i], timezone.utc).isoformat(),
+            "mastered": bool(mastered[i]),
+            "status": status,
+        })
+
+    return results
+
+
+BUCKETS = ("session", "day", "week", "month")
+
+
+def accuracy_series(sessions: List[Dict], bucket: str = "week", points: Optional[int] = None) -> Dict:
+    """
+    Accuracy over time for one objective's sessions, as parallel columns.
+
+    With bucket="session" every session is a point; otherwise sessions are
+    grouped by UTC day, ISO week (starting Monday) or month, and each point
+    carries the pooled accuracy, the session count and the min/max
+    per-session accuracy in the bucket. When there are more than `points`
+    points, the series is LTTB-downsampled to that budget.
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"Unknown bucket: {bucket}")
+
+    rows = [s for s in sessions if s.get("objective_progress") and s.get("created_at")]
+    count = len(rows)
+    ts = np.fromiter((parse_timestamp(s["created_at"]) for s in rows), dtype=np.float64, count=count)
+    completed = np.fromiter((s["objective_progress"]["trials_completed"] or 0 for s in rows), dtype=np.float64, count=count)
+    total = np.fromiter((s["objective_progress"]["trials_total"] or 0 for s in rows), dtype=np.float64, count=count)
+
+    valid = total > 0
+    ts, completed, total = ts[valid], completed[valid], total[valid]
+    order = np.argsort(ts, kind="stable")
+    ts, completed, total = ts[order], completed[order], total[order]
+    accuracy = completed / total
+
+    moments = ts.astype("datetime64[s]")
+    if bucket == "session":
+        keys = moments
+    elif bucket == "day":
+        keys = moments.astype("datetime64[D]")
+    elif bucket == "week":
+        days = moments.astype("datetime64[D]")
+        # 1970-01-01 was a Thursday; shift so weeks start on Monday
+        keys = days - ((days.astype(np.int64) + 3) % 7).astype("timedelta64[D]")
+    else:
+        keys = moments.astype("datetime64[M]").astype("datetime64[D]")
+
+    starts, inverse = np.unique(keys, return_inverse=True)
+    k = len(starts)
+    sessions_per_bucket = np.bincount(inverse, minlength=k)
+    bucket_completed = np.bincount(inverse, weights=completed, minlength=k)
+    bucket_total = np.bincount(inverse, weights=total, minlength=k)
+    low = np.full(k, np.inf)
+    high = np.full(k, -np.inf)
+    np.minimum.at(low, inverse, accuracy)
+    np.maximum.at(high, inverse, accuracy)
+
+    bucket_accuracy = bucket_completed / np.maximum(bucket_total, 1)
+    total_points = k
+    if points and k > points:
+        keep = lttb(starts.astype("datetime64[s]").astype(np.float64), bucket_accuracy, points)
+        starts, bucket_accuracy, sessions_per_bucket = starts[keep], bucket_accuracy[keep], sessions_per_bucket[keep]
+        bucket_completed, bucket_total, low, high = bucket_completed[keep], bucket_total[keep], low[keep], high[keep]
+
+    return {
+        "bucket": bucket,
+        "total_points": total_points,
+        "downsampled": len(starts) < total_points,
+        "t": [str(start) for start in starts],
+        "accuracy": np.round(bucket_accuracy, 4).tolist(),
+        "sessions": sessions_per_bucket.tolist(),
+        "trials_completed": bucket_completed.astype(np.int64).tolist(),
+        "trials_total": bucket_total.astype(np.int64).tolist(),
+        "min": np.round(low, 4).tolist(),
+        "max": np.round(high, 4).tolist(),
+    }
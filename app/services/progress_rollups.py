@@ -0,0 +1,343 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+import logging
+import threading
+
+from app.services import data_version, event_hub
+from app.utils.chunked_query import fetch_all, in_chunks
+from app.services.progress_engine import (
+    DEFAULT_WINDOW,
+    PROGRESS_OBJECTIVE_SELECT,
+    PROGRESS_SESSION_SELECT,
+    compute_progress,
+    load_progress_inputs,
+    parse_timestamp,
+)
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_TABLE = "objective_rollups"
+
+# Rollups are read-modify-write, so a teacher's updates are applied one at a time
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _teacher_lock(teacher_id: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(teacher_id, threading.Lock())
+
+
+# Objective columns a stored rollup depends on (window size and mastery)
+ROLLUP_INPUTS = ("target_accuracy", "target_consistency_trials", "target_consistency_successes")
+
+
+def rollup_inputs_changed(before: Dict, after: Dict) -> bool:
+    """Whether an objective edit invalidates its rollup."""
+    return any(before.get(column) != after.get(column) for column in ROLLUP_INPUTS)
+
+
+def window_size(objective: Dict) -> int:
+    return max(objective.get("target_consistency_trials") or DEFAULT_WINDOW, 1)
+
+
+def session_entry(session: Dict, progress: Optional[Dict]) -> Dict:
+    """
+    The part of a session (and its progress row) a rollup tracks. Sessions
+    without a progress row are not `counted`, as in build_rollups.
+    """
+    # The write RPCs return a missing row as an all-null record
+    counted = bool(progress) and any(v is not None for v in progress.values())
+    progress = progress or {}
+    return {
+        "session_id": session["id"],
+        "objective_id": session["objective_id"],
+        "created_at": session["created_at"],
+        "trials_completed": progress.get("trials_completed") or 0,
+        "trials_total": progress.get("trials_total") or 0,
+        "counted": counted,
+    }
+
+
+def _entry_key(entry: Dict):
+    # Same order as the window refill query: created_at, then id
+    return parse_timestamp(entry["created_at"]), entry["session_id"]
+
+
+def _window_entry(entry: Dict) -> Dict:
+    return {k: entry[k] for k in ("session_id", "created_at", "trials_completed", "trials_total")}
+
+
+def _as_sessions(objective_id: str, recent: List[Dict]) -> List[Dict]:
+    """Window entries in the shape progress_engine reads sessions in."""
+    return [
+        {
+            "objective_id": objective_id,
+            "created_at": entry["created_at"],
+            "objective_progress": {
+                "trials_completed": entry["trials_completed"],
+                "trials_total": entry["trials_total"],
+            },
+        }
+        for entry in recent
+    ]
+
+
+def build_rollups(objectives: List[Dict], sessions: List[Dict]) -> List[Dict]:
+    """Compute rollup rows from scratch for `objectives` given all of their sessions."""
+    by_objective = defaultdict(list)
+    for session in sessions:
+        if session.get("objective_progress") and session.get("created_at"):
+            by_objective[session["objective_id"]].append(session_entry(session, session["objective_progress"]))
+
+    rows = []
+    for objective in objectives:
+        entries = sorted(by_objective.get(objective["id"], []), key=_entry_key)
+        recent = [_window_entry(e) for e in entries[-window_size(objective):]]
+        rows.append({
+            "objective_id": objective["id"],
+            "student_id": objective["student_id"],
+            "sessions_logged": len(entries),
+            "trials_completed": sum(e["trials_completed"] for e in entries),
+            "trials_total": sum(e["trials_total"] for e in entries),
+            "last_logged_at": recent[-1]["created_at"] if recent else None,
+            "recent": recent,
+            "window_size": window_size(objective),
+        })
+    return rows
+
+
+def _set_mastery(objectives: List[Dict], rows: List[Dict]):
+    """Fill in the mastered flag for many rollups in one vectorized pass over their windows."""
+    rows_by_id = {row["objective_id"]: row for row in rows}
+    sessions = []
+    for row in rows:
+        sessions.extend(_as_sessions(row["objective_id"], row["recent"]))
+    for result in compute_progress(objectives, sessions):
+        rows_by_id[result["objective_id"]]["mastered"] = result["mastered"]
+
+
+def _fetch_recent(supabase, user_id: str, objective_id: str, limit: int) -> List[Dict]:
+    rows = supabase \
+        .table("sessions") \
+        .select(PROGRESS_SESSION_SELECT) \
+        .eq("teacher_id", user_id) \
+        .eq("objective_id", objective_id) \
+        .order("created_at", desc=True) \
+        .order("id", desc=True) \
+        .limit(limit) \
+        .execute().data
+    entries = [session_entry(row, row.get("objective_progress")) for row in rows if row.get("objective_progress")]
+    return [_window_entry(e) for e in sorted(entries, key=_entry_key)]
+
+
+def _store(supabase, user_id: str, objectives: List[Dict], rows: List[Dict]):
+    if not rows:
+        return
+    _set_mastery([o for o in objectives if o["id"] in {row["objective_id"] for row in rows}], rows)
+    now = datetime.now(timezone.utc).isoformat()
+    for row in rows:
+        row["teacher_id"] = user_id
+        row["updated_at"] = now
+    supabase.table(ROLLUP_TABLE).upsert(rows).execute()
+    data_version.bump(user_id, data_version.PROGRESS)
+    event_hub.publish(user_id, event_hub.PROGRESS, {
+        "objective_ids": [row["objective_id"] for row in rows],
+        "student_ids": sorted({row["student_id"] for row in rows}),
+    })
+
+
+def apply_session_changes(supabase, user_id: str, added: Iterable[Dict], removed: Iterable[Dict]):
+    """
+    Fold session writes into the affected objectives' rollups.
+
+    `added` and `removed` are session_entry() dicts; an edit is its old entry
+    removed plus its new entry added. Totals are adjusted by the deltas of
+    counted entries; an added session already in the window (a refill or
+    rebuild got to it first) is skipped, so it isn't counted twice. The
+    last-N window takes new entries in place, and is refilled from the latest
+    N sessions only when an entry inside it was removed (so an older session
+    slides in) or the objective's window size changed. Objectives without a
+    rollup yet are built from their full history.
+    """
+    added = list(added)
+    removed = list(removed)
+    objective_ids = list({e["objective_id"] for e in added + removed})
+    if not objective_ids:
+        return
+
+    with _teacher_lock(user_id):
+        objectives = in_chunks(
+            lambda: supabase.table("objectives").select(PROGRESS_OBJECTIVE_SELECT).eq("teacher_id", user_id),
+            "id", objective_ids,
+        )
+        rollups = {
+            row["objective_id"]: row
+            for row in in_chunks(
+                lambda: supabase.table(ROLLUP_TABLE).select("*").eq("teacher_id", user_id),
+                "objective_id", objective_ids,
+            )
+        }
+
+        rows = []
+        for objective in objectives:
+            objective_id = objective["id"]
+            rollup = rollups.get(objective_id)
+            if rollup is None:
+                _, sessions = load_progress_inputs(supabase, user_id, objective_id=objective_id)
+                rows.extend(build_rollups([objective], sessions))
+                continue
+
+            recent = rollup["recent"] or []
+            removes = [e for e in removed if e["objective_id"] == objective_id and e["counted"]]
+            removed_ids = {e["session_id"] for e in removes}
+            in_window = {e["session_id"] for e in recent} - removed_ids
+            adds = list({
+                e["session_id"]: e for e in added
+                if e["objective_id"] == objective_id and e["counted"] and e["session_id"] not in in_window
+            }.values())
+            n = window_size(objective)
+
+            sessions_logged = rollup["sessions_logged"] + len(adds) - len(removes)
+            trials_completed = rollup["trials_completed"] \
+                + sum(e["trials_completed"] for e in adds) - sum(e["trials_completed"] for e in removes)
+            trials_total = rollup["trials_total"] \
+                + sum(e["trials_total"] for e in adds) - sum(e["trials_total"] for e in removes)
+
+            # Sessions logged without a date get the database's now(), which only a refill sees
+            refill = rollup["window_size"] != n \
+                or any(e["session_id"] in removed_ids for e in recent) \
+                or any(not e["created_at"] for e in adds)
+            if not refill:
+                recent = sorted(recent + [_window_entry(e) for e in adds], key=_entry_key)[-n:]
+                # A short window while older sessions exist means the rollup drifted
+                refill = len(recent) < min(n, sessions_logged)
+            if refill:
+                recent = _fetch_recent(supabase, user_id, objective_id, n)
+
+            rows.append({
+                "objective_id": objective_id,
+                "student_id": objective["student_id"],
+                "sessions_logged": max(sessions_logged, 0),
+                "trials_completed": max(trials_completed, 0),
+                "trials_total": max(trials_total, 0),
+                "last_logged_at": recent[-1]["created_at"] if recent else None,
+                "recent": recent,
+                "window_size": n,
+            })
+
+        _store(supabase, user_id, objectives, rows)
+
+
+def refresh_rollups(supabase, user_id: str, objective_ids: Iterable[str]):
+    """Rebuild the given objectives' rollups from their full history (e.g. after targets change)."""
+    with _teacher_lock(user_id):
+        for objective_id in set(objective_ids):
+            objectives, sessions = load_progress_inputs(supabase, user_id, objective_id=objective_id)
+            _store(supabase, user_id, objectives, build_rollups(objectives, sessions))
+
+
+def _same(expected: Dict, stored: Optional[Dict]) -> bool:
+    if stored is None:
+        return False
+    for field in ("sessions_logged", "trials_completed", "trials_total", "window_size", "mastered"):
+        if expected[field] != stored.get(field):
+            return False
+    stored_recent = stored.get("recent") or []
+    if len(expected["recent"]) != len(stored_recent):
+        return False
+    for a, b in zip(expected["recent"], stored_recent):
+        if _entry_key(a) != _entry_key(b) \
+                or (a["trials_completed"], a["trials_total"]) != (b["trials_completed"], b["trials_total"]):
+            return False
+    return True
+
+
+def rebuild_rollups(supabase, user_id: str, fix: bool = True) -> List[str]:
+    """
+    Recompute every rollup for a teacher from full history and compare with
+    what is stored. Returns the objective ids whose rollup was missing or
+    differed; with `fix` those rows are rewritten.
+    """
+    with _teacher_lock(user_id):
+        objectives, sessions = load_progress_inputs(supabase, user_id)
+        expected = build_rollups(objectives, sessions)
+        _set_mastery(objectives, expected)
+
+        stored = {
+            row["objective_id"]: row
+            for row in fetch_all(lambda: supabase.table(ROLLUP_TABLE).select("*").eq("teacher_id", user_id).order("objective_id"))
+        }
+        mismatched = [row for row in expected if not _same(row, stored.get(row["objective_id"]))]
+        if fix:
+            _store(supabase, user_id, objectives, mismatched)
+        return [row["objective_id"] for row in mismatched]
+
+
+def apply_in_background(supabase, user_id: str, added: Iterable[Dict], removed: Iterable[Dict]):
+    """BackgroundTasks entry point: rollup failures are logged, never surfaced to the write."""
+    try:
+        apply_session_changes(supabase, user_id, added, removed)
+    except Exception:
+        logger.exception("Failed to update progress rollups for teacher %s", user_id)
+
+
+def refresh_in_background(supabase, user_id: str, objective_ids: Iterable[str]):
+    try:
+        refresh_rollups(supabase, user_id, objective_ids)
+    except Exception:
+        logger.exception("Failed to refresh progress rollups for teacher %s", user_id)
+
+
+def load_rollup_progress(
+    supabase,
+    user_id: str,
+    student_id: Optional[str] = None,
+    objective_id: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Progress read from rollups: O(objectives) rows instead of every session.
+    Same shape as progress_engine.compute_progress; window metrics are
+    computed over the stored last-N sessions and totals come from the rollup.
+    """
+    def objectives_query():
+        query = supabase.table("objectives").select(PROGRESS_OBJECTIVE_SELECT).eq("teacher_id", user_id)
+        if student_id:
+            query = query.eq("student_id", student_id)
+        if objective_id:
+            query = query.eq("id", objective_id)
+        return query.order("id")
+
+    def rollups_query():
+        query = supabase.table(ROLLUP_TABLE).select("*").eq("teacher_id", user_id)
+        if student_id:
+            query = query.eq("student_id", student_id)
+        if objective_id:
+            query = query.eq("objective_id", objective_id)
+        return query.order("objective_id")
+
+    return rollup_progress(fetch_all(objectives_query), fetch_all(rollups_query))
+
+
+def rollup_progress(objectives: List[Dict], rollup_rows: List[Dict]) -> List[Dict]:
+    """Progress for already-fetched objectives (with their target columns) and rollup rows."""
+    rollups = {row["objective_id"]: row for row in rollup_rows}
+
+    sessions = []
+    for objective in objectives:
+        rollup = rollups.get(objective["id"])
+        if rollup:
+            # The stored window may be longer than the objective's current one
+            sessions.extend(_as_sessions(objective["id"], rollup["recent"][-window_size(objective):]))
+
+    results = compute_progress(objectives, sessions)
+    for result in results:
+        rollup = rollups.get(result["objective_id"])
+        if not rollup:
+            continue
+        result["sessions_logged"] = rollup["sessions_logged"]
+        result["trials_completed"] = rollup["trials_completed"]
+        result["trials_total"] = rollup["trials_total"]
+        result["accuracy"] = round(rollup["trials_completed"] / rollup["trials_total"], 4) if rollup["trials_total"] else None
+    return results
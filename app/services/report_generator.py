@@ -0,0 +1,262 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+import json
+import logging
+import time
+
+from app.services import event_hub, llm
+from app.services.progress_engine import (
+    PROGRESS_OBJECTIVE_SELECT,
+    PROGRESS_SESSION_SELECT,
+    compute_progress,
+)
+from app.utils.chunked_query import fetch_all, in_chunks
+from app.utils.checkpoint import load_checkpoint, release_lease, renew_lease, save_checkpoint
+from app.utils.single_flight import hash_key
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_KIND = "reports"
+
+# Session memos per objective handed to the model; the statistics cover the rest
+REPORT_MEMO_LIMIT = 12
+
+# Used instead of a model call for objectives with no sessions in the period
+NO_SESSIONS_NARRATIVE = "No sessions were logged for this objective during this period."
+
+REPORT_OBJECTIVE_SELECT = PROGRESS_OBJECTIVE_SELECT + ", goals(title), subject_areas(name)"
+REPORT_SESSION_SELECT = PROGRESS_SESSION_SELECT + ", student_id, memo"
+
+
+def new_report(user_id: str, start: str, end: str, student_ids: Optional[List[str]], concurrency: int) -> Dict:
+    return {
+        "teacher_id": user_id,
+        "status": "pending",
+        "start": start,
+        "end": end,
+        "student_ids": student_ids,
+        "concurrency": concurrency,
+        # objective_id -> {"fingerprint", "narrative"}; survives failures so a resume only redoes the rest
+        "narratives": {},
+        "sections": {},
+        "failed": {},
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def fetch_report_inputs(supabase, user_id: str, start: str, end: str, student_ids: Optional[List[str]]):
+    """Bulk-fetch students, objectives and in-range sessions for the whole caseload."""
+    def students_query():
+        return supabase.table("students").select("id, name, grade_level, disability_type").eq("teacher_id", user_id).order("id")
+
+    def objectives_query():
+        return supabase.table("objectives").select(REPORT_OBJECTIVE_SELECT).eq("teacher_id", user_id).order("id")
+
+    def sessions_query():
+        return supabase \
+            .table("sessions") \
+            .select(REPORT_SESSION_SELECT) \
+            .eq("teacher_id", user_id) \
+            .gte("created_at", start) \
+            .lt("created_at", end) \
+            .order("id")
+
+    if not student_ids:
+        return fetch_all(students_query), fetch_all(objectives_query), fetch_all(sessions_query)
+
+    # Long student lists are split so the in_ filters stay within URL limits
+    return (
+        in_chunks(students_query, "id", student_ids, paginate=True),
+        in_chunks(objectives_query, "student_id", student_ids, paginate=True),
+        in_chunks(sessions_query, "student_id", student_ids, paginate=True),
+    )
+
+
+def build_objective_prompt(objective: Dict, stats: Dict, memos: List[Dict], start: str, end: str) -> str:
+    return f"""
+        You are an IEP assistant writing one section of a progress report covering {start[:10]} to {end[:10]}.
+
+        Objective: {objective["description"]}
+        Goal: {(objective.get("goals") or {}).get("title", "Unknown")}
+        Subject Area: {(objective.get("subject_areas") or {}).get("name", "Unknown")}
+
+        Progress statistics for the period:
+        {json.dumps({k: stats[k] for k in ("target_accuracy", "sessions_logged", "accuracy", "recent_accuracy", "consistency", "trend_direction", "status")}, indent=2)}
+
+        Session notes from the period (most recent last):
+        {json.dumps(memos, indent=2)}
+
+        Write a short paragraph (max 80 words) describing progress on this objective during the period.
+        Ground every claim in the statistics and notes. Use gender and name-neutral language.
+        If no sessions were logged, say so plainly.
+    """
+
+
+def _narrate(objective: Dict, stats: Dict, memos: List[Dict], start: str, end: str) -> str:
+    prompt = build_objective_prompt(objective, stats, memos, start, end)
+    return llm.chat([{"role": "user", "content": prompt}], temperature=0.3)
+
+
+def _section(student: Dict, objectives: List[Dict], stats: Dict[str, Dict], narratives: Dict[str, Dict], failed: Dict[str, str]) -> Dict:
+    return {
+        "student_id": student["id"],
+        "name": student.get("name"),
+        "grade_level": student.get("grade_level"),
+        "disability_type": student.get("disability_type"),
+        "objectives": [
+            {
+                **stats[o["id"]],
+                "goal": (o.get("goals") or {}).get("title"),
+                "subject_area": (o.get("subject_areas") or {}).get("name"),
+                "narrative": (narratives.get(o["id"]) or {}).get("narrative"),
+                "error": failed.get(o["id"]),
+            }
+            for o in objectives
+        ],
+    }
+
+
+def _line(event: Dict) -> str:
+    return json.dumps(event, default=str) + "\n"
+
+
+def stream_report(supabase, user_id: str, report_id: str) -> Iterator[str]:
+    """
+    Generate a report as NDJSON lines, one per student section as it completes.
+
+    Statistics come from the progress engine over the period's sessions; each
+    objective's narrative is one LLM call, run `concurrency` at a time.
+    Narratives are checkpointed as they finish, so resuming a failed or
+    interrupted report replays finished sections first and only calls the
+    model for objectives whose narrative is missing or whose data changed.
+    Objectives with no sessions in the period get NO_SESSIONS_NARRATIVE
+    without a call.
+
+    The caller must hold the report's lease (checkpoint.acquire_lease); it is
+    renewed as narratives finish and released when the stream ends.
+    """
+    try:
+        yield from _stream_report(supabase, user_id, report_id)
+    finally:
+        release_lease(CHECKPOINT_KIND, report_id)
+
+
+def _stream_report(supabase, user_id: str, report_id: str) -> Iterator[str]:
+    report = load_checkpoint(CHECKPOINT_KIND, report_id)
+    if report is None:
+        raise ValueError(f"Report {report_id} not found")
+
+    started = time.monotonic()
+    report["status"] = "running"
+    report["failed"] = {}
+    save_checkpoint(CHECKPOINT_KIND, report_id, report)
+
+    pool = None
+    try:
+        students, objectives, sessions = fetch_report_inputs(
+            supabase, user_id, report["start"], report["end"], report["student_ids"]
+        )
+        stats = {s["objective_id"]: s for s in compute_progress(objectives, sessions)}
+
+        memos_by_objective: Dict[str, List[Dict]] = {}
+        for session in sorted(sessions, key=lambda s: s["created_at"]):
+            if session.get("memo"):
+                memos_by_objective.setdefault(session["objective_id"], []).append(
+                    {"date": session["created_at"][:10], "memo": session["memo"]}
+                )
+
+        objectives_by_student: Dict[str, List[Dict]] = {s["id"]: [] for s in students}
+        for objective in objectives:
+            if objective["student_id"] in objectives_by_student:
+                objectives_by_student[objective["student_id"]].append(objective)
+
+        yield _line({"type": "start", "report_id": report_id, "students_total": len(students)})
+
+        # Objectives whose checkpointed narrative still matches their data need no new call
+        pending: Dict[str, Dict] = {}
+        fingerprints = {}
+        for objective in (o for objs in objectives_by_student.values() for o in objs):
+            memos = memos_by_objective.get(objective["id"], [])[-REPORT_MEMO_LIMIT:]
+            fingerprints[objective["id"]] = hash_key(llm.model, objective, stats[objective["id"]], memos)
+            if stats[objective["id"]]["sessions_logged"] == 0:
+                report["narratives"][objective["id"]] = {
+                    "fingerprint": fingerprints[objective["id"]],
+                    "narrative": NO_SESSIONS_NARRATIVE,
+                }
+                continue
+            cached = report["narratives"].get(objective["id"])
+            if not cached or cached["fingerprint"] != fingerprints[objective["id"]]:
+                pending[objective["id"]] = {"objective": objective, "memos": memos}
+
+        remaining = {
+            student_id: sum(1 for o in objs if o["id"] in pending)
+            for student_id, objs in objectives_by_student.items()
+        }
+
+        def finish(student_id: str) -> str:
+            section = _section(
+                next(s for s in students if s["id"] == student_id),
+                objectives_by_student[student_id], stats, report["narratives"], report["failed"],
+            )
+            report["sections"][student_id] = section
+            save_checkpoint(CHECKPOINT_KIND, report_id, report)
+            return _line({"type": "student", "section": section})
+
+        for student_id, count in remaining.items():
+            if count == 0:
+                yield finish(student_id)
+
+        pool = ThreadPoolExecutor(max_workers=report["concurrency"], thread_name_prefix="report")
+        futures = {
+            pool.submit(_narrate, item["objective"], stats[objective_id], item["memos"], report["start"], report["end"]): objective_id
+            for objective_id, item in pending.items()
+        }
+        for future in as_completed(futures):
+            objective_id = futures[future]
+            student_id = pending[objective_id]["objective"]["student_id"]
+            try:
+                report["narratives"][objective_id] = {
+                    "fingerprint": fingerprints[objective_id],
+                    "narrative": future.result(),
+                }
+            except Exception as e:
+                logger.error(f"Report {report_id}: objective {objective_id} failed: {str(e)}")
+                report["failed"][objective_id] = str(e)
+            renew_lease(CHECKPOINT_KIND, report_id)
+            remaining[student_id] -= 1
+            if remaining[student_id] == 0:
+                yield finish(student_id)
+            else:
+                save_checkpoint(CHECKPOINT_KIND, report_id, report)
+
+        elapsed = time.monotonic() - started
+        report["status"] = "completed" if not report["failed"] else "completed_with_errors"
+        report["finished_at"] = datetime.now(timezone.utc).isoformat()
+        report["report"] = {
+            "students_total": len(students),
+            "objectives_total": len(objectives),
+            "narratives_generated": len(pending) - len(report["failed"]),
+            "narratives_failed": len(report["failed"]),
+            "elapsed_seconds": round(elapsed, 2),
+        }
+        save_checkpoint(CHECKPOINT_KIND, report_id, report)
+        logger.info(f"Report {report_id} finished: {report['report']}")
+        event_hub.publish(user_id, event_hub.REPORT, {"report_id": report_id, "status": report["status"], **report["report"]})
+        yield _line({"type": "done", "report_id": report_id, "status": report["status"], **report["report"]})
+    except GeneratorExit:
+        # Client went away; what finished is checkpointed and the report can be resumed
+        report["status"] = "interrupted"
+        save_checkpoint(CHECKPOINT_KIND, report_id, report)
+        event_hub.publish(user_id, event_hub.REPORT, {"report_id": report_id, "status": report["status"]})
+        raise
+    except Exception as e:
+        logger.error(f"Report {report_id} aborted: {str(e)}")
+        report["status"] = "failed"
+        report["error"] = str(e)
+        save_checkpoint(CHECKPOINT_KIND, report_id, report)
+        event_hub.publish(user_id, event_hub.REPORT, {"report_id": report_id, "status": report["status"], "error": str(e)})
+        yield _line({"type": "error", "report_id": report_id, "error": str(e)})
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,176 @@
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+import csv
+import io
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.services.caseload import get_caseload
+from app.services.progress_engine import normalize_target
+from app.utils.pagination import apply_keyset, split_page
+
+EXPORT_FORMATS = ("csv", "parquet")
+
+# Rows per keyset page fetched from the database
+EXPORT_PAGE_SIZE = 1000
+# Rows buffered per Parquet row group; bounds memory together with the page size
+EXPORT_ROW_GROUP_SIZE = 50_000
+
+# Names and targets are joined from the caseload snapshot, so the query only
+# carries the session and its progress row
+EXPORT_SESSION_SELECT = (
+    "id, created_at, student_id, objective_id, memo, "
+    "objective_progress:objective_progress(trials_completed, trials_total)"
+)
+
+EXPORT_SCHEMA = pa.schema([
+    ("session_id", pa.string()),
+    ("created_at", pa.timestamp("us", tz="UTC")),
+    ("student_id", pa.string()),
+    ("student_name", pa.string()),
+    ("objective_id", pa.string()),
+    ("objective_description", pa.string()),
+    ("objective_type", pa.string()),
+    ("target_accuracy", pa.float64()),
+    ("goal_id", pa.string()),
+    ("goal_title", pa.string()),
+    ("subject_area_id", pa.string()),
+    ("subject_area_name", pa.string()),
+    ("trials_completed", pa.int64()),
+    ("trials_total", pa.int64()),
+    ("accuracy", pa.float64()),
+    ("memo", pa.string()),
+])
+EXPORT_COLUMNS = EXPORT_SCHEMA.names
+
+
+def iter_session_rows(
+    supabase,
+    user_id: str,
+    filters: Dict[str, str],
+    start: Optional[datetime],
+    end: Optional[datetime],
+) -> Iterator[List[Dict]]:
+    """
+    Yield the teacher's sessions one keyset page at a time, newest first,
+    flattened to EXPORT_COLUMNS. Only one page is held at a time.
+    """
+    caseload = get_caseload(supabase, user_id)
+    cursor = None
+    while True:
+        query = supabase.table("sessions").select(EXPORT_SESSION_SELECT).eq("teacher_id", user_id)
+        for column, value in filters.items():
+            query = query.eq(column, value)
+        if start:
+            query = query.gte("created_at", start.isoformat())
+        if end:
+            query = query.lt("created_at", end.isoformat())
+
+        page, cursor = split_page(apply_keyset(query, cursor, EXPORT_PAGE_SIZE).execute().data, EXPORT_PAGE_SIZE)
+        if page:
+            yield [_flatten(caseload, session) for session in page]
+        if not cursor:
+            return
+
+
+def _flatten(caseload, session: Dict) -> Dict:
+    student = caseload.students_by_id.get(session.get("student_id")) or {}
+    objective = caseload.objectives_by_id.get(session.get("objective_id")) or {}
+    goal = caseload.goals_by_id.get(objective.get("goal_id")) or {}
+    subject_area = caseload.subject_areas_by_id.get(objective.get("subject_area_id")) or {}
+    progress = session.get("objective_progress") or {}
+    completed = progress.get("trials_completed")
+    total = progress.get("trials_total")
+    return {
+        "session_id": session["id"],
+        "created_at": session.get("created_at"),
+        "student_id": session.get("student_id"),
+        "student_name": student.get("name"),
+        "objective_id": session.get("objective_id"),
+        "objective_description": objective.get("description"),
+        "objective_type": objective.get("objective_type"),
+        "target_accuracy": normalize_target(objective["target_accuracy"]) if objective.get("target_accuracy") is not None else None,
+        "goal_id": objective.get("goal_id"),
+        "goal_title": goal.get("title"),
+        "subject_area_id": objective.get("subject_area_id"),
+        "subject_area_name": subject_area.get("name"),
+        "trials_completed": completed,
+        "trials_total": total,
+        "accuracy": round(completed / total, 4) if completed is not None and total else None,
+        "memo": session.get("memo"),
+    }
+
+
+def stream_csv(pages: Iterator[List[Dict]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for rows in pages:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.getvalue():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands written bytes back to the caller between row groups."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _parse_created_at(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+
+
+def stream_parquet(pages: Iterator[List[Dict]]) -> Iterator[bytes]:
+    """
+    Write pages as Parquet, one row group per EXPORT_ROW_GROUP_SIZE rows, and
+    yield each row group's bytes as soon as it is written.
+    """
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, EXPORT_SCHEMA, compression="zstd")
+    batches: List[pa.RecordBatch] = []
+    buffered = 0
+
+    def flush():
+        nonlocal batches, buffered
+        if batches:
+            writer.write_table(pa.Table.from_batches(batches, schema=EXPORT_SCHEMA), row_group_size=buffered)
+            batches, buffered = [], 0
+        return sink.drain()
+
+    try:
+        for rows in pages:
+            for row in rows:
+                row["created_at"] = _parse_created_at(row["created_at"])
+            batches.append(pa.RecordBatch.from_pylist(rows, schema=EXPORT_SCHEMA))
+            buffered += len(rows)
+            if buffered >= EXPORT_ROW_GROUP_SIZE:
+                data = flush()
+                if data:
+                    yield data
+        data = flush()
+    finally:
+        writer.close()
+    yield data + sink.drain()
@@ -1,72 +1,80 @@
-from together import Together
-import os
 import json
+import logging
+import os
+import threading
 
-client = Together(api_key=os.getenv("TOGETHER_API_KEY"))
-model = os.getenv("TOGETHER_MODEL", "meta-llama/Llama-3.3-70B-Instruct-Turbo-Free")
+from cachetools import LRUCache
 
-def generate_and_store_student_summary(supabase, student_id: str, user_id: str):
-    print(f"✅ Generating and storing student summary for student {student_id}")
-    # 1. Fetch latest 5 sessions
-    sessions_res = (
-        supabase.table("sessions")
-        .select(
-            "id, created_at, raw_input, memo, "
-            "objectives(id, description, goal_id, subject_area_id, "
-            "goals(title), subject_areas(name))"
-        )
-        .eq("student_id", student_id)    
-        .eq("teacher_id", user_id)
-        .order("created_at", desc=True)
-        .limit(10)
-        .execute()
-    )
+from app.services import data_version, llm
+from app.services.llm import chat
+from app.services.caseload import get_caseload, pick, update_cached_student
+from app.utils.single_flight import hash_key
 
-    # 2. Fetch all objectives
-    objectives_res = (
-        supabase.table("objectives")
-        .select("id, description, reporting_frequency, goals(title), subject_areas(name)")
-        .eq("student_id", student_id)
-        .eq("teacher_id", user_id)
-        .execute()
-    )
+logger = logging.getLogger(__name__)
 
-    # 3. Fetch student
-    student_res = (
-        supabase.table("students")
-        .select("*")
-        .eq("id", student_id)
-        .eq("teacher_id", user_id)
-        .execute()
-    )
+# Up to this many new sessions (with nothing else changed) are summarized
+# incrementally from the previous summary instead of from the full window.
+INCREMENTAL_MAX_NEW_SESSIONS = int(os.getenv("SUMMARY_INCREMENTAL_MAX_NEW", "3"))
+
+SUMMARY_UNAVAILABLE = "Unable to generate summary at this time."
+
+# student_id -> fingerprint of the input the stored summary was generated from.
+# Bounded; a student whose fingerprint was dropped gets a full regeneration.
+_fingerprints_lock = threading.Lock()
+_fingerprints = LRUCache(maxsize=int(os.getenv("SUMMARY_FINGERPRINT_CACHE_SIZE", "10000")))
 
-    formatted_input = {
+
+def format_session(s: dict) -> dict:
+    return {
+        "date": s["created_at"],
+        "objective": s["objectives"]["description"] if s.get("objectives") else "Unknown",
+        "subject_area": s["objectives"]["subject_areas"]["name"] if s.get("objectives") and s["objectives"].get("subject_areas") else "Unknown",
+        "goal": s["objectives"]["goals"]["title"] if s.get("objectives") and s["objectives"].get("goals") else "Unknown",
+        "memo": s.get("memo") or s.get("raw_input")
+    }
+
+
+def format_summary_input(student: dict, sessions: list, objectives: list) -> dict:
+    return {
         "student": {
-            "disability_type": student_res.data[0]["disability_type"],
-            "grade_level": student_res.data[0]["grade_level"],
-            "summary": student_res.data[0]["summary"],
+            "disability_type": student["disability_type"],
+            "grade_level": student["grade_level"],
+            "summary": student["summary"],
         },
-        "latest_sessions": [
-            {
-                "date": s["created_at"],
-                "objective": s["objectives"]["description"] if s.get("objectives") else "Unknown",
-                "subject_area": s["objectives"]["subject_areas"]["name"] if s.get("objectives") and s["objectives"].get("subject_areas") else "Unknown",
-                "goal": s["objectives"]["goals"]["title"] if s.get("objectives") and s["objectives"].get("goals") else "Unknown",
-                "memo": s.get("memo") or s.get("raw_input")
-            }
-            for s in sessions_res.data
-        ],
+        "latest_sessions": [format_session(s) for s in sessions],
         "objectives": [
             {
                 "description": o["description"],
                 "subject_area": o["subject_areas"]["name"] if o.get("subject_areas") else "Unknown",
                 "goal": o["goals"]["title"] if o.get("goals") else "Unknown",
             }
-            for o in objectives_res.data
+            for o in objectives
         ]
     }
 
-    prompt = f"""
+
+def summary_fingerprint(student: dict, sessions: list, objectives: list) -> dict:
+    """
+    Fingerprint of everything the summary is derived from, excluding the
+    previous summary itself (which changes on every regeneration).
+    """
+    formatted = format_summary_input(student, sessions, objectives)
+    session_hashes = {s["id"]: hash_key(format_session(s)) for s in sessions}
+    context = hash_key(
+        llm.model,
+        formatted["student"]["disability_type"],
+        formatted["student"]["grade_level"],
+        formatted["objectives"],
+    )
+    return {
+        "digest": hash_key(context, formatted["latest_sessions"]),
+        "context": context,
+        "sessions": session_hashes,
+    }
+
+
+def build_summary_prompt(formatted_input: dict) -> str:
+    return f"""
         You are an IEP assistant tasked with writing a short (max 100 words) progress update about a student.
 
         The student's general information:
@@ -87,9 +95,145 @@ def generate_and_store_student_summary(supabase, student_id: str, user_id: str):
         Make sure it is under 100 words.
     """
 
+
+def build_incremental_summary_prompt(formatted_input: dict, new_sessions: list) -> str:
+    return f"""
+        You are an IEP assistant updating a short (max 100 words) progress update about a student.
+
+        The student's general information:
+        - Grade Level: {formatted_input["student"]["grade_level"]}
+        - Disability Type: {formatted_input["student"]["disability_type"]}
+
+        Current Summary:
+        {formatted_input["student"]["summary"]}
+
+        New Sessions since the current summary was written:
+        {json.dumps(new_sessions, indent=2)}
+
+        Rewrite the summary so it reflects the new sessions while keeping what is still accurate.
+        Use gender and name-neutral language. Mention trends, strengths, improvements, and progress towards goals.
+        Keep it factual but positive. Make sure it is under 100 words.
+    """
+
+
+def _incremental_sessions(previous: dict, current: dict, sessions: list):
+    """
+    New sessions to feed incrementally, or None if a full regeneration is needed:
+    objectives/student context changed, an already-summarized session changed,
+    or too many sessions are new.
+    """
+    if previous is None or previous["context"] != current["context"]:
+        return None
+    new_sessions = []
+    for i, s in enumerate(sessions):  # newest first
+        old_hash = previous["sessions"].get(s["id"])
+        if old_hash is None:
+            if len(new_sessions) != i:
+                # An older session appeared (e.g. a delete pulled one into the window)
+                return None
+            new_sessions.append(format_session(s))
+        elif old_hash != current["sessions"][s["id"]]:
+            return None
+    if not new_sessions or len(new_sessions) > INCREMENTAL_MAX_NEW_SESSIONS:
+        return None
+    # Previously summarized sessions may only be missing because new ones pushed them out
+    if len(set(previous["sessions"]) - set(current["sessions"])) > len(new_sessions):
+        return None
+    return new_sessions
+
+
+# Session/objective shapes the summarizer formats; shared by the single-student
+# and bulk fetches.
+SUMMARY_SESSION_SELECT = (
+    "id, created_at, raw_input, memo, "
+    "objectives(id, description, goal_id, subject_area_id, "
+    "goals(title), subject_areas(name))"
+)
+SUMMARY_STUDENT_FIELDS = ("id", "disability_type", "grade_level", "summary")
+SUMMARY_SESSION_LIMIT = 10
+
+
+def summary_student(caseload, student_id: str):
+    """The student row fields the summary reads, copied out of the caseload snapshot."""
+    return pick(caseload.students_by_id.get(student_id), SUMMARY_STUDENT_FIELDS)
+
+
+def summary_objectives(caseload, student_id: str) -> list:
+    """A student's objectives with their goal title and subject area name embedded."""
+    return [
+        {
+            "id": o["id"],
+            "description": o["description"],
+            "reporting_frequency": o.get("reporting_frequency"),
+            "goals": pick(caseload.goals_by_id.get(o.get("goal_id")), ("title",)),
+            "subject_areas": pick(caseload.subject_areas_by_id.get(o.get("subject_area_id")), ("name",)),
+        }
+        for o in caseload.objectives_by_student.get(student_id, [])
+    ]
+
+
+def fetch_summary_inputs(supabase, student_id: str, user_id: str):
+    """
+    Student and objectives come from the caseload snapshot; only the latest
+    sessions are queried.
+
+    Returns (student, sessions, objectives), or (None, [], []) if the student
+    doesn't belong to the user.
+    """
+    caseload = get_caseload(supabase, user_id)
+    student = summary_student(caseload, student_id)
+    if student is None:
+        return None, [], []
+
+    sessions = (
+        supabase.table("sessions")
+        .select(SUMMARY_SESSION_SELECT)
+        .eq("student_id", student_id)
+        .eq("teacher_id", user_id)
+        .order("created_at", desc=True)
+        .limit(SUMMARY_SESSION_LIMIT)
+        .execute()
+    ).data or []
+    return student, sessions, summary_objectives(caseload, student_id)
+
+
+def generate_and_store_student_summary(supabase, student_id: str, user_id: str):
+    print(f"✅ Generating and storing student summary for student {student_id}")
+    student, sessions, objectives = fetch_summary_inputs(supabase, student_id, user_id)
+    if student is None:
+        raise ValueError(f"Student {student_id} not found")
+
+    return summarize_student(supabase, student, sessions, objectives, user_id)
+
+
+def summarize_student(supabase, student: dict, sessions: list, objectives: list, user_id: str, force: bool = False):
+    """
+    Generate and store a summary from already-fetched inputs.
+
+    Skips the LLM when the inputs match the stored summary's fingerprint,
+    unless `force` is set.
+    """
+    student_id = student["id"]
+    formatted_input = format_summary_input(student, sessions, objectives)
+    fingerprint = summary_fingerprint(student, sessions, objectives)
+
+    with _fingerprints_lock:
+        previous = _fingerprints.get(student_id)
+
+    # Nothing the summary depends on has changed since it was written
+    if not force and student["summary"] and previous and previous["digest"] == fingerprint["digest"]:
+        logger.info(f"Inputs unchanged, keeping existing summary for student {student_id}")
+        return student["summary"]
+
+    new_sessions = _incremental_sessions(previous, fingerprint, sessions) if student["summary"] and not force else None
+    if new_sessions is not None:
+        prompt = build_incremental_summary_prompt(formatted_input, new_sessions)
+    else:
+        prompt = build_summary_prompt(formatted_input)
+
     summary = call_llm_student_summary(prompt)
 
-    # 3. Store summary back in students table
+    # Store summary back in students table
     update_res = (
         supabase.table("students")
         .update({"summary": summary})
@@ -97,15 +241,20 @@ def generate_and_store_student_summary(supabase, student_id: str, user_id: str):
         .eq("teacher_id", user_id)
         .execute()
     )
+    update_cached_student(user_id, student_id, {"summary": summary})
+    data_version.bump(user_id, data_version.SUMMARIES)
+
+    if summary != SUMMARY_UNAVAILABLE:
+        with _fingerprints_lock:
+            _fingerprints[student_id] = fingerprint
 
     return summary
 
 
 def call_llm_student_summary(prompt: str) -> str:
     try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
+        return chat(
+            [
                 {"role": "system", "content": "You are a helpful assistant that writes IEP progress summaries based on session logs and objectives."},
                 {"role": "user", "content": prompt}
             ],
@@ -113,9 +262,6 @@ def call_llm_student_summary(prompt: str) -> str:
             max_tokens=600,
         )
 
-        content = response.choices[0].message.content.strip()
-        return content
-
     except Exception as e:
         print("❌ LLM summary generation failed:", e)
-        return "Unable to generate summary at this time."
\ No newline at end of file
+        return SUMMARY_UNAVAILABLE
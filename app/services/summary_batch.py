@@ -0,0 +1,162 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import logging
+import threading
+import time
+
+from app.services import event_hub
+from app.services.caseload import get_caseload
+from app.services.student_summarizer import (
+    SUMMARY_SESSION_LIMIT,
+    SUMMARY_SESSION_SELECT,
+    SUMMARY_UNAVAILABLE,
+    summarize_student,
+    summary_objectives,
+    summary_student,
+)
+from app.utils.checkpoint import load_checkpoint, release_lease, renew_lease, save_checkpoint
+from app.utils.chunked_query import in_chunks
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_KIND = "summary_jobs"
+
+
+def prefetch_summary_inputs(supabase, user_id: str, student_ids: List[str]) -> Dict[str, Dict]:
+    """
+    Bulk-fetch summarizer inputs for many students.
+
+    Students and objectives come from the caseload snapshot. Sessions use a
+    students-rooted nested select so the embedded limit applies per student;
+    each id chunk is one request and the chunks run concurrently.
+    Returns {student_id: {"student", "sessions", "objectives"}}.
+    """
+    def query():
+        return (
+            supabase.table("students")
+            .select(f"id, sessions({SUMMARY_SESSION_SELECT})")
+            .eq("teacher_id", user_id)
+            .eq("sessions.teacher_id", user_id)
+            .order("created_at", desc=True, foreign_table="sessions")
+            .limit(SUMMARY_SESSION_LIMIT, foreign_table="sessions")
+        )
+
+    caseload = get_caseload(supabase, user_id)
+    known = [student_id for student_id in student_ids if student_id in caseload.students_by_id]
+
+    inputs = {}
+    for row in in_chunks(query, "id", known):
+        inputs[row["id"]] = {
+            "student": summary_student(caseload, row["id"]),
+            "sessions": row.get("sessions") or [],
+            "objectives": summary_objectives(caseload, row["id"]),
+        }
+    return inputs
+
+
+def new_job(user_id: str, student_ids: Optional[List[str]], concurrency: int, force: bool) -> Dict:
+    return {
+        "teacher_id": user_id,
+        "status": "pending",
+        "student_ids": student_ids,
+        "concurrency": concurrency,
+        "force": force,
+        "completed": [],
+        "failed": {},
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "report": None,
+    }
+
+
+def run_summary_job(supabase, user_id: str, job_id: str):
+    """
+    Regenerate summaries for every student in a job, resuming from its checkpoint.
+
+    Students already completed are skipped; failures are recorded and retried
+    when the job is resumed. Progress is checkpointed after every student.
+
+    The caller must hold the job's lease (checkpoint.acquire_lease); it is
+    renewed as students finish and released when the job ends.
+    """
+    try:
+        return _run_summary_job(supabase, user_id, job_id)
+    finally:
+        release_lease(CHECKPOINT_KIND, job_id)
+
+
+def _run_summary_job(supabase, user_id: str, job_id: str):
+    job = load_checkpoint(CHECKPOINT_KIND, job_id)
+    if job is None:
+        raise ValueError(f"Summary job {job_id} not found")
+
+    job["status"] = "running"
+    save_checkpoint(CHECKPOINT_KIND, job_id, job)
+
+    try:
+        student_ids = job["student_ids"]
+        if student_ids is None:
+            student_ids = [s["id"] for s in get_caseload(supabase, user_id).students]
+            job["student_ids"] = student_ids
+
+        done = set(job["completed"])
+        remaining = [sid for sid in student_ids if sid not in done]
+        job["failed"] = {}
+
+        started = time.monotonic()
+        inputs = prefetch_summary_inputs(supabase, user_id, remaining)
+        lock = threading.Lock()
+
+        def regenerate(student_id: str):
+            data = inputs.get(student_id)
+            if data is None:
+                raise ValueError("Student not found")
+            summary = summarize_student(
+                supabase, data["student"], data["sessions"], data["objectives"], user_id, force=job["force"]
+            )
+            if summary == SUMMARY_UNAVAILABLE:
+                raise RuntimeError("LLM summary generation failed")
+
+        with ThreadPoolExecutor(max_workers=job["concurrency"], thread_name_prefix="summary-job") as pool:
+            futures = {pool.submit(regenerate, sid): sid for sid in remaining}
+            for future in as_completed(futures):
+                student_id = futures[future]
+                with lock:
+                    try:
+                        future.result()
+                        job["completed"].append(student_id)
+                    except Exception as e:
+                        logger.error(f"Summary job {job_id}: student {student_id} failed: {str(e)}")
+                        job["failed"][student_id] = str(e)
+                    save_checkpoint(CHECKPOINT_KIND, job_id, job)
+                renew_lease(CHECKPOINT_KIND, job_id)
+                event_hub.publish(user_id, event_hub.STUDENT_SUMMARY, {
+                    "student_id": student_id,
+                    "status": "failed" if student_id in job["failed"] else "ready",
+                    "error": job["failed"].get(student_id),
+                })
+
+        elapsed = time.monotonic() - started
+        processed = len(remaining) - len(job["failed"])
+        job["report"] = {
+            "students_total": len(student_ids),
+            "students_processed": processed,
+            "students_failed": len(job["failed"]),
+            "elapsed_seconds": round(elapsed, 2),
+            "students_per_minute": round(processed / elapsed * 60, 2) if elapsed > 0 else None,
+        }
+        job["status"] = "completed" if not job["failed"] else "completed_with_errors"
+        job["finished_at"] = datetime.now(timezone.utc).isoformat()
+        logger.info(f"Summary job {job_id} finished: {job['report']}")
+    except Exception as e:
+        logger.error(f"Summary job {job_id} aborted: {str(e)}")
+        job["status"] = "failed"
+        job["error"] = str(e)
+
+    save_checkpoint(CHECKPOINT_KIND, job_id, job)
+    event_hub.publish(user_id, event_hub.SUMMARY_JOB, {
+        "job_id": job_id,
+        "status": job["status"],
+        "report": job["report"],
+    })
+    return job
@@ -0,0 +1,154 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List
+import logging
+import os
+import threading
+import time
+
+from app.services import data_version, event_hub
+from app.services.student_summarizer import generate_and_store_student_summary
+
+logger = logging.getLogger(__name__)
+
+# Summary regeneration runs off the request path on a small bounded pool so
+# session writes return after their own DB round trips.
+executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SUMMARY_WORKERS", "2")),
+    thread_name_prefix="student-summary",
+)
+
+# Triggers for the same student within the window collapse into one run that
+# sees the final state. A steady stream of triggers is flushed after max wait.
+DEBOUNCE_SECONDS = float(os.getenv("SUMMARY_DEBOUNCE_SECONDS", "5"))
+MAX_WAIT_SECONDS = float(os.getenv("SUMMARY_MAX_WAIT_SECONDS", "30"))
+
+_lock = threading.Lock()
+_status: Dict[str, Dict] = {}
+
+_PUBLIC_FIELDS = ("status", "version", "error", "updated_at")
+
+
+def _entry(student_id: str) -> Dict:
+    # Caller must hold _lock
+    return _status.setdefault(student_id, {
+        "status": "idle",
+        "version": 0,
+        "error": None,
+        "updated_at": None,
+        "timer": None,
+        "first_trigger": None,
+        "running": False,
+        "dirty": False,
+        "args": None,
+        "generation": 0,
+    })
+
+
+def _set_status(entry: Dict, status: str, error=None):
+    # Caller must hold _lock
+    entry["status"] = status
+    entry["error"] = error
+    entry["updated_at"] = datetime.now(timezone.utc).isoformat()
+
+
+def get_summary_status(student_id: str) -> Dict:
+    """Current regeneration state of a student's summary: status, version, updated_at, error."""
+    with _lock:
+        entry = _status.get(student_id)
+        if entry is None:
+            return {"status": "idle", "version": 0, "error": None, "updated_at": None}
+        return {k: entry[k] for k in _PUBLIC_FIELDS}
+
+
+def annotate_students(students: List[Dict]) -> List[Dict]:
+    """Attach summary_status/summary_version to student rows in place."""
+    for student in students:
+        status = get_summary_status(student["id"])
+        student["summary_status"] = status["status"]
+        student["summary_version"] = status["version"]
+    return students
+
+
+def _run(student_id: str):
+    while True:
+        with _lock:
+            entry = _status[student_id]
+            supabase, user_id = entry["args"]
+            entry["dirty"] = False
+            _set_status(entry, "running")
+
+        try:
+            generate_and_store_student_summary(supabase, student_id, user_id)
+            error = None
+        except Exception as e:
+            logger.error(f"Summary regeneration failed for student {student_id}: {str(e)}")
+            error = str(e)
+
+        with _lock:
+            entry = _status[student_id]
+            if error is None:
+                entry["version"] += 1
+            if entry["dirty"]:
+                # Triggered again while running: regenerate from the newer state
+                continue
+            entry["running"] = False
+            # Student reads carry summary_status, so they must not be served as unchanged;
+            # SUMMARIES leaves the caseload snapshot alone
+            data_version.bump(user_id, data_version.SUMMARIES)
+            if entry["timer"] is not None:
+                _set_status(entry, "pending")
+            elif error is not None:
+                _set_status(entry, "failed", error)
+            else:
+                _set_status(entry, "ready")
+            status = {k: entry[k] for k in _PUBLIC_FIELDS}
+
+        event_hub.publish(user_id, event_hub.STUDENT_SUMMARY, {"student_id": student_id, **status})
+        return
+
+
+def _fire(student_id: str, generation: int):
+    with _lock:
+        entry = _status[student_id]
+        if entry["generation"] != generation:
+            # Superseded by a later trigger that restarted the window
+            return
+        entry["timer"] = None
+        entry["first_trigger"] = None
+        if entry["running"]:
+            # The in-flight run picks up the latest state when it finishes
+            entry["dirty"] = True
+            return
+        entry["running"] = True
+    executor.submit(_run, student_id)
+
+
+def schedule_student_summary(supabase, student_id: str, user_id: str):
+    """
+    Request a summary regeneration for a student and return immediately.
+
+    Triggers are debounced per student; only one regeneration per student runs
+    at a time, and it always uses the most recent client/state.
+    """
+    now = time.monotonic()
+    with _lock:
+        entry = _entry(student_id)
+        entry["args"] = (supabase, user_id)
+        if entry["status"] != "running":
+            _set_status(entry, "pending")
+            data_version.bump(user_id, data_version.SUMMARIES)
+
+        timer = entry["timer"]
+        if timer is not None:
+            if now - entry["first_trigger"] >= MAX_WAIT_SECONDS:
+                return
+            timer.cancel()
+        else:
+            entry["first_trigger"] = now
+
+        entry["generation"] += 1
+        timer = threading.Timer(DEBOUNCE_SECONDS, _fire, args=(student_id, entry["generation"]))
+        timer.daemon = True
+        entry["timer"] = timer
+        timer.start()
@@ -1,13 +1,8 @@
 from pydantic import BaseModel
 from typing import List
 # from openai import OpenAI
-from together import Together
 
-import os
-import json
-
-from dotenv import load_dotenv
-load_dotenv()
+from app.services.llm import chat_structured
 
 
 # ---------- Pydantic Models ----------
@@ -19,6 +14,9 @@ class ParsedSession(BaseModel):
     objective_description: str
     memo: str
 
+class ParsedSessionList(BaseModel):
+    sessions: List[ParsedSession]
+
 class MatchStudent(BaseModel):
     id: str
     name: str
@@ -59,9 +57,6 @@ class SuggestedSession(BaseModel):
     matches: List[StudentWithObjectives]
 
 
-client = Together(api_key=os.getenv("TOGETHER_API_KEY")) # auth defaults to env TOGETHER_API_KEY
-model = os.getenv("TOGETHER_MODEL", "meta-llama/Llama-3.3-70B-Instruct-Turbo-Free")
-
 # ---------- LLM Calls ----------
 def call_llm_extract_sessions(transcript: str, student_names: List[str] = None) -> List[dict]:
     student_names_text = ""
@@ -82,49 +77,38 @@ def call_llm_extract_sessions(transcript: str, student_names: List[str] = None)
 
         🛑 Do **NOT** combine different sessions into one JSON object, even if the same student/objective is involved.
 
-        If there is no meaningful session data in the transcript, return an empty list: []
+        If there is no meaningful session data in the transcript, return an empty sessions list: {{"sessions": []}}
 
-        Respond ONLY in valid JSON list format, like this:
-        [
+        Respond ONLY in valid JSON, like this:
         {{
-            "student_name": "Johnny",
-            "objective_description": "Johnny is working on solving word problems.",
-            "memo": "Johnny solved 10 out of 15 problems correctly."
-        }},
-        ]
+            "sessions": [
+                {{
+                    "student_name": "Johnny",
+                    "objective_description": "Johnny is working on solving word problems.",
+                    "memo": "Johnny solved 10 out of 15 problems correctly."
+                }}
+            ]
+        }}
 
         Transcript:
         \"\"\"{transcript}\"\"\"
         """
 
     try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
+        parsed = chat_structured(
+            [
                 {"role": "system", "content": "You extract structured IEP session logs from transcripts."},
                 {"role": "user", "content": prompt}
             ],
+            ParsedSessionList,
             temperature=0.2,
+            # Tolerate a bare list even though the prompt asks for {"sessions": [...]}
+            prepare=lambda data: {"sessions": data} if isinstance(data, list) else data,
         )
-
-        if not response.choices or not response.choices[0].message.content:
-            raise RuntimeError("OpenAI returned an empty response")
-
-        raw_output = response.choices[0].message.content.strip()
-
-        if not raw_output:
-            raise RuntimeError("OpenAI returned an empty string")
-
-        try:
-            parsed_output = json.loads(raw_output)
-            if not isinstance(parsed_output, list):
-                raise RuntimeError("OpenAI response is not a list")
-            return parsed_output
-        except json.JSONDecodeError as e:
-            raise RuntimeError(f"Failed to parse OpenAI response as JSON: {str(e)}\nResponse content: {raw_output}")
+        return [session.model_dump() for session in parsed.sessions]
 
     except Exception as e:
-        raise RuntimeError(f"OpenAI call failed: {str(e)}")
+        raise RuntimeError(f"LLM session extraction failed: {str(e)}")
 
 
 def infer_trials_completed(
@@ -176,17 +160,15 @@ def infer_trials_completed(
             """
 
     try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
+        progress = chat_structured(
+            [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
+            ObjectiveProgress,
             temperature=0.1,
         )
-        content = response.choices[0].message.content.strip()
-
-        return json.loads(content)
+        return progress.model_dump()
 
     except Exception as e:
         print("❌ Error inferring trials:", e)
@@ -0,0 +1,83 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", ".checkpoints")
+
+# A job lease lapses unless renewed within this long, so a job whose worker
+# died (or whose background task never started) can be resumed.
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "600"))
+
+_SAFE_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def _path(kind: str, job_id: str) -> str:
+    if not _SAFE_ID.match(kind) or not _SAFE_ID.match(job_id):
+        raise ValueError(f"Invalid checkpoint id: {kind}/{job_id}")
+    return os.path.join(CHECKPOINT_DIR, kind, f"{job_id}.json")
+
+
+def load_checkpoint(kind: str, job_id: str) -> Optional[Dict]:
+    """Load a job checkpoint, or None if the job has never been checkpointed."""
+    try:
+        with open(_path(kind, job_id)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_checkpoint(kind: str, job_id: str, data: Dict):
+    """Atomically replace a job checkpoint so a crash never leaves a torn file."""
+    path = _path(kind, job_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, default=str)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+# (kind, job_id) -> monotonic expiry of the job's lease in this process
+_leases_lock = threading.Lock()
+_leases: Dict[Tuple[str, str], float] = {}
+
+
+def acquire_lease(kind: str, job_id: str) -> bool:
+    """
+    Claim a job for running. Returns False if it is already leased, so
+    checking and starting a job is one atomic step.
+    """
+    now = time.monotonic()
+    with _leases_lock:
+        for key in [key for key, expires in _leases.items() if expires <= now]:
+            del _leases[key]
+        if (kind, job_id) in _leases:
+            return False
+        _leases[(kind, job_id)] = now + JOB_LEASE_SECONDS
+        return True
+
+
+def renew_lease(kind: str, job_id: str):
+    """Extend a held lease; call while the job makes progress."""
+    with _leases_lock:
+        if (kind, job_id) in _leases:
+            _leases[(kind, job_id)] = time.monotonic() + JOB_LEASE_SECONDS
+
+
+def release_lease(kind: str, job_id: str):
+    with _leases_lock:
+        _leases.pop((kind, job_id), None)
+
+
+def lease_held(kind: str, job_id: str) -> bool:
+    """Whether the job is running. A checkpoint saying "running" without a lease was interrupted."""
+    with _leases_lock:
+        expires = _leases.get((kind, job_id))
+        return expires is not None and expires > time.monotonic()
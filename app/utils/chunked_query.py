@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List
+
+# UUIDs per in_ filter, keeping PostgREST GET URLs well under common limits
+IN_CHUNK_SIZE = 100
+FETCH_PAGE_SIZE = 1000
+
+_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="chunked-query")
+
+
+def fetch_all(query_factory: Callable) -> List[Dict]:
+    """Page through a query PostgREST would otherwise cap at its max-rows setting."""
+    rows = []
+    start = 0
+    while True:
+        page = query_factory().range(start, start + FETCH_PAGE_SIZE - 1).execute().data
+        rows.extend(page)
+        if len(page) < FETCH_PAGE_SIZE:
+            return rows
+        start += FETCH_PAGE_SIZE
+
+
+def in_chunks(
+    query_factory: Callable,
+    column: str,
+    values: Iterable,
+    chunk_size: int = IN_CHUNK_SIZE,
+    paginate: bool = False,
+) -> List[Dict]:
+    """
+    Run `query_factory().in_(column, chunk)` for each chunk of `values`
+    concurrently and concatenate the returned rows.
+
+    `query_factory` must return a fresh query (select, update or delete) each
+    call. A single chunk runs inline, so short id lists cost one request.
+    With `paginate`, each chunk is paged through with fetch_all.
+    """
+    values = list(dict.fromkeys(values))
+    if not values:
+        return []
+
+    def run(chunk):
+        if paginate:
+            return fetch_all(lambda: query_factory().in_(column, chunk))
+        return query_factory().in_(column, chunk).execute().data or []
+
+    chunks = [values[i:i + chunk_size] for i in range(0, len(values), chunk_size)]
+    if len(chunks) == 1:
+        return run(chunks[0])
+
+    rows = []
+    for future in [_pool.submit(run, chunk) for chunk in chunks]:
+        rows.extend(future.result())
+    return rows
@@ -0,0 +1,77 @@
+import hashlib
+import json
+import threading
+from typing import Callable, Dict, Iterable, Optional
+
+from cachetools import LRUCache
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.services import data_version
+from app.utils.single_flight import hash_key
+
+# (teacher_id, request key) -> (data version, etag) of the last response served.
+# Lets a matching If-None-Match be answered before running the query.
+_known = LRUCache(maxsize=10000)
+_known_lock = threading.Lock()
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def conditional_json(
+    request: Request,
+    supabase,
+    teacher_id: str,
+    scopes: Iterable[str],
+    compute: Callable,
+    headers: Optional[Dict[str, str]] = None,
+    vary: Iterable = (),
+) -> Response:
+    """
+    Serve a JSON read with a strong ETag and honour If-None-Match.
+
+    The ETag is a hash of the serialized body. If the client already holds the
+    ETag last served for this request and none of the teacher's data `scopes`
+    have been written since, a 304 is returned without calling `compute`.
+    Scopes are first synced with the database's change markers, so writes this
+    process did not make also count. `headers` may be filled in by `compute`
+    and are sent with a 200. `vary` lists anything else the body depends on
+    that isn't in the URL (e.g. the current date range), so a 304 is never
+    served across a change in it.
+    """
+    scopes = tuple(scopes)
+    key = (teacher_id, hash_key(request.url.path, sorted(request.query_params.multi_items()), list(vary)))
+    data_version.sync(supabase, teacher_id, *scopes)
+    version = data_version.current(teacher_id, *scopes)
+    if_none_match = request.headers.get("if-none-match")
+
+    with _known_lock:
+        known = _known.get(key)
+    if known and known[0] == version and _matches(if_none_match, known[1]):
+        return not_modified(known[1])
+
+    headers = headers if headers is not None else {}
+    body = json.dumps(jsonable_encoder(compute()), separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+    # Versions were read before computing, so a concurrent write leaves this entry stale, not wrong
+    with _known_lock:
+        _known[key] = (version, etag)
+
+    if _matches(if_none_match, etag):
+        return not_modified(etag)
+
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={**headers, "ETag": etag, "Cache-Control": "private, no-cache"},
+    )
@@ -0,0 +1,133 @@
+import json
+import re
+from typing import Any
+
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+
+
+def _strip_trailing_commas(text: str) -> str:
+    """Remove commas that directly precede a closing brace/bracket, ignoring string contents."""
+    out = []
+    in_string = False
+    escaped = False
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+            out.append(ch)
+        elif ch == ",":
+            j = i + 1
+            while j < len(text) and text[j].isspace():
+                j += 1
+            if j < len(text) and text[j] in "}]":
+                i += 1
+                continue
+            out.append(ch)
+        else:
+            out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+_SMART_QUOTES = "\u201c\u201d"
+
+
+def _repair_smart_quotes(text: str) -> str:
+    """
+    Turn smart quotes used as string delimiters into straight quotes. Smart
+    quotes inside a string value are content and are left alone; a smart
+    quote only closes a string it opened when JSON structure follows it.
+    """
+    out = []
+    in_string = False
+    smart_opened = False
+    escaped = False
+    for i, ch in enumerate(text):
+        if not in_string:
+            if ch == '"' or ch in _SMART_QUOTES:
+                in_string = True
+                smart_opened = ch != '"'
+                out.append('"')
+            else:
+                out.append(ch)
+            continue
+        if escaped:
+            escaped = False
+            out.append(ch)
+        elif ch == "\\":
+            escaped = True
+            out.append(ch)
+        elif smart_opened and ch in _SMART_QUOTES:
+            j = i + 1
+            while j < len(text) and text[j].isspace():
+                j += 1
+            if j == len(text) or text[j] in ":,}]":
+                in_string = False
+                out.append('"')
+            else:
+                out.append(ch)
+        elif ch == '"':
+            if smart_opened:
+                # A straight quote inside a smart-quoted value is content
+                out.append('\\"')
+            else:
+                in_string = False
+                out.append(ch)
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def _outermost_block(text: str) -> str:
+    """Slice from the first opening brace/bracket to its last matching closer."""
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        return text
+    start = min(starts)
+    closer = "}" if text[start] == "{" else "]"
+    end = text.rfind(closer)
+    if end <= start:
+        return text[start:]
+    return text[start:end + 1]
+
+
+def parse_json_lenient(raw: str) -> Any:
+    """
+    Parse JSON returned by an LLM, repairing the most common formatting slips.
+
+    Handles markdown code fences, prose before/after the payload, trailing
+    commas and smart quotes. Raises ValueError if nothing parseable remains.
+    """
+    if raw is None:
+        raise ValueError("Empty model response")
+
+    text = raw.strip()
+    if not text:
+        raise ValueError("Empty model response")
+
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    fenced = _FENCE_RE.search(text)
+    if fenced:
+        text = fenced.group(1).strip()
+
+    text = _outermost_block(text)
+    text = _repair_smart_quotes(text)
+    text = _strip_trailing_commas(text)
+
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Could not repair model output as JSON: {str(e)}")
@@ -0,0 +1,50 @@
+from datetime import datetime
+import base64
+import json
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(row: Dict, column: str = "created_at") -> str:
+    payload = json.dumps([row[column], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Decode a cursor into (timestamp, id). Raises ValueError unless it holds an
+    ISO timestamp and a UUID, since both are spliced into a PostgREST filter.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        datetime.fromisoformat(value)
+        row_id = str(uuid.UUID(row_id))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return value, row_id
+
+
+def apply_keyset(query, cursor: Optional[str], limit: int, column: str = "created_at"):
+    """
+    Order a PostgREST query newest-first by (column, id) and continue after `cursor`.
+
+    Fetches one extra row so the caller can tell whether another page exists.
+    """
+    if cursor:
+        value, row_id = decode_cursor(cursor)
+        query = query.or_(f'{column}.lt."{value}",and({column}.eq."{value}",id.lt."{row_id}")')
+    return query \
+        .order(column, desc=True) \
+        .order("id", desc=True) \
+        .limit(limit + 1)
+
+
+def split_page(rows: List[Dict], limit: int, column: str = "created_at") -> Tuple[List[Dict], Optional[str]]:
+    """Trim the look-ahead row and return (page, next_cursor)."""
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(page[-1], column)
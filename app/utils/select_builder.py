@@ -0,0 +1,84 @@
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+_IDENTIFIER = re.compile(r"^[a-z_][a-z0-9_]*(\.[a-z_][a-z0-9_]*)*$")
+
+
+def _split(param: Optional[str]) -> List[str]:
+    if not param:
+        return []
+    items = [item.strip() for item in param.split(",") if item.strip()]
+    for item in items:
+        if not _IDENTIFIER.match(item):
+            raise ValueError(f"Invalid field or relation name: {item}")
+    return items
+
+
+def _prefixes(path: str) -> Iterable[str]:
+    parts = path.split(".")
+    for i in range(1, len(parts) + 1):
+        yield ".".join(parts[:i])
+
+
+def _build(relations: Dict, fields: Dict[str, List[str]], expand: Set[str], path: str, default_columns: List[str]) -> str:
+    columns = list(fields.get(path) or default_columns)
+    for name, spec in relations.items():
+        child = f"{path}.{name}" if path else name
+        if child in expand:
+            inner = _build(spec.get("relations", {}), fields, expand, child, spec.get("fields", ["*"]))
+            columns.append(f"{spec['select']}({inner})")
+    return ", ".join(columns)
+
+
+def build_select(
+    relations: Dict,
+    fields: Optional[str],
+    expand: Optional[str],
+    default_expand: Iterable[str],
+    required: Iterable[str] = ("id",),
+) -> str:
+    """
+    Map `fields=` and `expand=` query parameters onto a PostgREST select string.
+
+    `relations` describes the embeddable relations as
+    {name: {"select": "alias:table", "fields": [...], "relations": {...}}}.
+    `fields` lists columns, dotted for nested relations (e.g. "id,name,objectives.id").
+    `expand` lists relations to embed, dotted for nested ones; `None` keeps the
+    endpoint's default embedding and an empty string returns flat rows.
+    Columns in `required` are always selected at the top level.
+    Raises ValueError for malformed or unknown names.
+    """
+    field_list = _split(fields)
+    expand_list = list(default_expand) if expand is None else _split(expand)
+
+    known = set()
+
+    def collect(rels: Dict, prefix: str):
+        for name, spec in rels.items():
+            path = f"{prefix}.{name}" if prefix else name
+            known.add(path)
+            collect(spec.get("relations", {}), path)
+
+    collect(relations, "")
+
+    expand_set: Set[str] = set()
+    for path in expand_list:
+        if path not in known:
+            raise ValueError(f"Unknown relation: {path}")
+        expand_set.update(_prefixes(path))
+
+    fields_by_path: Dict[str, List[str]] = {}
+    for field in field_list:
+        relation, _, column = field.rpartition(".")
+        if relation:
+            if relation not in known:
+                raise ValueError(f"Unknown relation: {relation}")
+            # Asking for a nested column implies embedding its relation
+            expand_set.update(_prefixes(relation))
+        fields_by_path.setdefault(relation, []).append(column)
+
+    if fields_by_path.get(""):
+        top = fields_by_path[""]
+        fields_by_path[""] = [col for col in required if col not in top] + top
+
+    return _build(relations, fields_by_path, expand_set, "", ["*"])
@@ -5,6 +5,7 @@ from typing import List, Optional, Dict, Tuple
 import torch
 import os
 from dotenv import load_dotenv
+from app.utils.single_flight import SingleFlight, hash_key
 # from app.services.transcript_parser import standardize_objective_text
 
 load_dotenv()
@@ -13,6 +14,13 @@ ST_MODEL = os.getenv("ST_MODEL")
 
 model = SentenceTransformer(ST_MODEL)
 
+# Concurrent requests encoding the same texts (e.g. the same caseload's names)
+# share one forward pass.
+_inflight = SingleFlight()
+
+def encode(texts):
+    return _inflight.do(hash_key(ST_MODEL, texts), model.encode, texts, convert_to_tensor=True)
+
 # Top K Semantic Matches
 def top_k_semantic_matches(
     query: str,
@@ -29,8 +37,8 @@ def top_k_semantic_matches(
     texts = [c[key] for c in candidates]
     print(f"Encoding {len(texts)} texts for {key}")
     print("Encoding query: ", query)
-    candidate_embeddings = model.encode(texts, convert_to_tensor=True)
-    query_embedding = model.encode(query, convert_to_tensor=True)
+    candidate_embeddings = encode(texts)
+    query_embedding = encode(query)
 
     scores = util.cos_sim(query_embedding, candidate_embeddings)[0]
 
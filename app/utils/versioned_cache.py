@@ -0,0 +1,47 @@
+import threading
+from typing import Any, Callable, Hashable
+
+from cachetools import LRUCache
+
+
+class VersionedCache:
+    """
+    LRU cache whose entries are only served while their version is current.
+
+    Callers read the data version *before* computing, so a write that lands
+    during the computation leaves an entry under the old version, which the
+    next reader treats as a miss instead of serving it.
+    """
+
+    def __init__(self, maxsize: int):
+        self._cache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Hashable, version: Any, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            self._cache[key] = (version, value)
+        return value
+
+    def modify(self, key: Hashable, apply: Callable[[Any], None]):
+        """
+        Run `apply` on the cached value for `key`, whatever its version, under
+        the cache lock. Nothing happens if the key isn't cached.
+        """
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                apply(entry[1])
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Rebuild and verify the objective_rollups table from full session history.
+
+Usage:
+    python3 scripts/rebuild_progress_rollups.py                 # check and fix every teacher
+    python3 scripts/rebuild_progress_rollups.py --teacher <id>  # one teacher
+    python3 scripts/rebuild_progress_rollups.py --check         # report drift without writing
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Add the parent directory to the sys.path to import app modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from supabase import create_client
+
+from app.utils.chunked_query import fetch_all
+from app.services.progress_rollups import rebuild_rollups
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teacher", action="append", help="Teacher id to rebuild (repeatable); defaults to all")
+    parser.add_argument("--check", action="store_true", help="Only report rollups that differ from history")
+    args = parser.parse_args()
+
+    load_dotenv()
+    supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+
+    teacher_ids = args.teacher or sorted({
+        row["teacher_id"]
+        for row in fetch_all(lambda: supabase.table("objectives").select("teacher_id").order("id"))
+    })
+
+    drifted = 0
+    for teacher_id in teacher_ids:
+        mismatched = rebuild_rollups(supabase, teacher_id, fix=not args.check)
+        drifted += len(mismatched)
+        status = "ok" if not mismatched else f"{len(mismatched)} {'drifted' if args.check else 'rebuilt'}"
+        print(f"{teacher_id}: {status}")
+        for objective_id in mismatched:
+            print(f"  - {objective_id}")
+
+    print(f"\n{len(teacher_ids)} teachers, {drifted} objective rollups {'drifted' if args.check else 'rebuilt'}")
+    if args.check and drifted:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+-- Atomic session edit/delete used by PUT /sessions/{id} and DELETE /sessions/{id}.
+-- Each call is one round trip and runs in a single transaction: the ownership
+-- check and both row changes succeed or fail together.
+
+create or replace function public.edit_session_with_progress(
+    p_teacher_id uuid,
+    p_session_id uuid,
+    p_student_id uuid,
+    p_objective_id uuid,
+    p_memo text,
+    p_created_at timestamptz,
+    p_trials_completed integer,
+    p_trials_total integer
+)
+returns json
+language plpgsql
+as $$
+declare
+    v_previous_student_id uuid;
+    v_session public.sessions;
+    v_progress public.objective_progress;
+begin
+    select student_id into v_previous_student_id
+    from public.sessions
+    where id = p_session_id and teacher_id = p_teacher_id
+    for update;
+
+    if not found then
+        return null;
+    end if;
+
+    update public.sessions
+    set student_id = p_student_id,
+        objective_id = p_objective_id,
+        memo = p_memo,
+        created_at = coalesce(p_created_at, created_at)
+    where id = p_session_id
+    returning * into v_session;
+
+    update public.objective_progress
+    set student_id = p_student_id,
+        objective_id = p_objective_id,
+        trials_completed = p_trials_completed,
+        trials_total = p_trials_total
+    where id = v_session.objective_progress_id
+    returning * into v_progress;
+
+    return json_build_object(
+        'session', row_to_json(v_session),
+        'progress', row_to_json(v_progress),
+        'previous_student_id', v_previous_student_id
+    );
+end;
+$$;
+
+create or replace function public.delete_session_with_progress(
+    p_teacher_id uuid,
+    p_session_id uuid
+)
+returns json
+language plpgsql
+as $$
+declare
+    v_session public.sessions;
+begin
+    delete from public.sessions
+    where id = p_session_id and teacher_id = p_teacher_id
+    returning * into v_session;
+
+    if not found then
+        return null;
+    end if;
+
+    -- Sessions reference their progress row, so it goes once the session is gone
+    delete from public.objective_progress
+    where id = v_session.objective_progress_id;
+
+    return row_to_json(v_session);
+end;
+$$;
@@ -0,0 +1,127 @@
+-- Per-objective progress aggregates, maintained incrementally by the session
+-- write routes (app/services/progress_rollups.py) so progress reads are
+-- O(objectives) instead of O(sessions). Rebuild/verify with
+-- scripts/rebuild_progress_rollups.py.
+
+create table if not exists public.objective_rollups (
+    objective_id uuid primary key references public.objectives(id) on delete cascade,
+    teacher_id uuid not null,
+    student_id uuid not null,
+    sessions_logged integer not null default 0,
+    trials_completed integer not null default 0,
+    trials_total integer not null default 0,
+    last_logged_at timestamptz,
+    -- Last N sessions oldest first: [{session_id, created_at, trials_completed, trials_total}]
+    recent jsonb not null default '[]'::jsonb,
+    window_size integer not null default 0,
+    mastered boolean not null default false,
+    updated_at timestamptz not null default now()
+);
+
+create index if not exists objective_rollups_teacher_student_idx
+    on public.objective_rollups (teacher_id, student_id);
+
+-- Refilling a rollup's window reads an objective's latest sessions
+create index if not exists sessions_objective_created_at_idx
+    on public.sessions (objective_id, created_at desc, id desc);
+
+-- The rollups need the values a session had before an edit or delete, so both
+-- RPCs now also return the previous session and progress rows.
+
+create or replace function public.edit_session_with_progress(
+    p_teacher_id uuid,
+    p_session_id uuid,
+    p_student_id uuid,
+    p_objective_id uuid,
+    p_memo text,
+    p_created_at timestamptz,
+    p_trials_completed integer,
+    p_trials_total integer
+)
+returns json
+language plpgsql
+as $$
+declare
+    v_previous_session public.sessions;
+    v_previous_progress public.objective_progress;
+    v_session public.sessions;
+    v_progress public.objective_progress;
+begin
+    select * into v_previous_session
+    from public.sessions
+    where id = p_session_id and teacher_id = p_teacher_id
+    for update;
+
+    if not found then
+        return null;
+    end if;
+
+    select * into v_previous_progress
+    from public.objective_progress
+    where id = v_previous_session.objective_progress_id
+    for update;
+
+    update public.sessions
+    set student_id = p_student_id,
+        objective_id = p_objective_id,
+        memo = p_memo,
+        created_at = coalesce(p_created_at, created_at)
+    where id = p_session_id
+    returning * into v_session;
+
+    update public.objective_progress
+    set student_id = p_student_id,
+        objective_id = p_objective_id,
+        trials_completed = p_trials_completed,
+        trials_total = p_trials_total
+    where id = v_session.objective_progress_id
+    returning * into v_progress;
+
+    return json_build_object(
+        'session', row_to_json(v_session),
+        'progress', row_to_json(v_progress),
+        'previous_student_id', v_previous_session.student_id,
+        'previous_session', row_to_json(v_previous_session),
+        'previous_progress', row_to_json(v_previous_progress)
+    );
+end;
+$$;
+
+create or replace function public.delete_session_with_progress(
+    p_teacher_id uuid,
+    p_session_id uuid
+)
+returns json
+language plpgsql
+as $$
+declare
+    v_session public.sessions;
+    v_progress public.objective_progress;
+begin
+    delete from public.sessions
+    where id = p_session_id and teacher_id = p_teacher_id
+    returning * into v_session;
+
+    if not found then
+        return null;
+    end if;
+
+    -- Sessions reference their progress row, so it goes once the session is gone
+    delete from public.objective_progress
+    where id = v_session.objective_progress_id
+    returning * into v_progress;
+
+    return (to_jsonb(v_session) || jsonb_build_object('objective_progress', to_jsonb(v_progress)))::json;
+end;
+$$;
+
+-- Same protection as the other teacher-scoped tables: clients using the anon
+-- key only ever see their own rollups
+alter table public.objective_rollups enable row level security;
+
+drop policy if exists "Teachers manage their own objective rollups" on public.objective_rollups;
+create policy "Teachers manage their own objective rollups"
+    on public.objective_rollups
+    for all
+    using (teacher_id = auth.uid())
+    with check (teacher_id = auth.uid());
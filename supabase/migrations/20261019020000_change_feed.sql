@@ -0,0 +1,111 @@
+-- Change feed for GET /changes (app/services/change_feed.py): every synced
+-- table carries an updated_at maintained by trigger and indexed per teacher,
+-- and deletes leave a tombstone so clients can drop rows they hold.
+
+create or replace function public.touch_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    -- clock_timestamp, not now(): rows written late in a long transaction
+    -- should not sort before rows other transactions committed meanwhile
+    new.updated_at = clock_timestamp();
+    return new;
+end;
+$$;
+
+create table if not exists public.tombstones (
+    id bigserial primary key,
+    teacher_id uuid not null,
+    table_name text not null,
+    row_id uuid not null,
+    deleted_at timestamptz not null default clock_timestamp()
+);
+
+create index if not exists tombstones_teacher_deleted_at_idx
+    on public.tombstones (teacher_id, deleted_at, id);
+
+-- Security definer so deletes made through the API can write tombstones
+-- while clients themselves are only allowed to read them (policy below).
+create or replace function public.record_tombstone()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    insert into public.tombstones (teacher_id, table_name, row_id)
+    values (old.teacher_id, tg_table_name, old.id);
+    return old;
+end;
+$$;
+
+alter table public.tombstones enable row level security;
+
+drop policy if exists "Teachers read their own tombstones" on public.tombstones;
+create policy "Teachers read their own tombstones"
+    on public.tombstones
+    for select
+    using (teacher_id = auth.uid());
+
+-- Row-level triggers also fire for rows removed by on delete cascade, so
+-- deleting a student tombstones its goals, objectives and sessions too.
+do $$
+declare
+    t text;
+begin
+    foreach t in array array['students', 'goals', 'objectives', 'subject_areas', 'sessions'] loop
+        execute format('alter table public.%I add column if not exists updated_at timestamptz not null default now()', t);
+
+        execute format('drop trigger if exists %I on public.%I', t || '_touch_updated_at', t);
+        execute format(
+            'create trigger %I before update on public.%I for each row execute function public.touch_updated_at()',
+            t || '_touch_updated_at', t
+        );
+
+        execute format('drop trigger if exists %I on public.%I', t || '_record_tombstone', t);
+        execute format(
+            'create trigger %I after delete on public.%I for each row execute function public.record_tombstone()',
+            t || '_record_tombstone', t
+        );
+
+        execute format(
+            'create index if not exists %I on public.%I (teacher_id, updated_at, id)',
+            t || '_teacher_updated_at_idx', t
+        );
+    end loop;
+end;
+$$;
+
+-- Progress rows are synced embedded in their session, so a progress-only
+-- change has to move the session forward in the feed.
+create or replace function public.touch_progress_session()
+returns trigger
+language plpgsql
+as $$
+begin
+    update public.sessions
+    set updated_at = clock_timestamp()
+    where objective_progress_id = new.id;
+    return new;
+end;
+$$;
+
+drop trigger if exists objective_progress_touch_session on public.objective_progress;
+create trigger objective_progress_touch_session
+    after update on public.objective_progress
+    for each row execute function public.touch_progress_session();
+
+-- Cursors older than the retention window get 410 from GET /changes, so
+-- tombstones past it can be dropped.
+create or replace function public.prune_tombstones(p_retention interval default interval '30 days')
+returns integer
+language sql
+as $$
+    with deleted as (
+        delete from public.tombstones
+        where deleted_at < now() - p_retention
+        returning 1
+    )
+    select count(*)::integer from deleted;
+$$;
@@ -0,0 +1,48 @@
+-- Cheap per-teacher change markers for conditional reads (app/utils/etag.py).
+-- Each data_version scope maps to the newest updated_at of its tables and the
+-- newest tombstone they left, so writes made by another process or outside
+-- the API still invalidate this process's ETags and caches.
+
+create index if not exists tombstones_teacher_table_deleted_at_idx
+    on public.tombstones (teacher_id, table_name, deleted_at);
+
+create index if not exists objective_rollups_teacher_updated_at_idx
+    on public.objective_rollups (teacher_id, updated_at);
+
+drop trigger if exists objective_rollups_touch_updated_at on public.objective_rollups;
+create trigger objective_rollups_touch_updated_at
+    before update on public.objective_rollups
+    for each row execute function public.touch_updated_at();
+
+create or replace function public.data_markers(p_teacher_id uuid)
+returns json
+language sql
+stable
+as $$
+    select json_build_object(
+        'students', greatest(
+            (select max(updated_at) from public.students where teacher_id = p_teacher_id),
+            (select max(deleted_at) from public.tombstones where teacher_id = p_teacher_id and table_name = 'students')
+        ),
+        'goals', greatest(
+            (select max(updated_at) from public.goals where teacher_id = p_teacher_id),
+            (select max(deleted_at) from public.tombstones where teacher_id = p_teacher_id and table_name = 'goals')
+        ),
+        'objectives', greatest(
+            (select max(updated_at) from public.objectives where teacher_id = p_teacher_id),
+            (select max(deleted_at) from public.tombstones where teacher_id = p_teacher_id and table_name = 'objectives')
+        ),
+        'subject_areas', greatest(
+            (select max(updated_at) from public.subject_areas where teacher_id = p_teacher_id),
+            (select max(deleted_at) from public.tombstones where teacher_id = p_teacher_id and table_name = 'subject_areas')
+        ),
+        -- Progress rows touch their session
+        'sessions', greatest(
+            (select max(updated_at) from public.sessions where teacher_id = p_teacher_id),
+            (select max(deleted_at) from public.tombstones where teacher_id = p_teacher_id and table_name = 'sessions')
+        ),
+        -- Rollups land after the session write that caused them; removed
+        -- rollups cascade from objectives, which move their own marker
+        'progress', (select max(updated_at) from public.objective_rollups where teacher_id = p_teacher_id)
+    );
+$$;
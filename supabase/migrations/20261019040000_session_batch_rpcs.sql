@@ -0,0 +1,129 @@
+-- Batch session edit/delete used by POST /sessions/batch/edit and
+-- POST /sessions/batch/delete. Each call is one round trip and one
+-- transaction: the sessions are locked and checked against the teacher first,
+-- and the batch applies to every session or to none.
+--
+-- If any requested session is missing or belongs to another teacher, nothing
+-- changes and {"missing": [ids]} is returned.
+
+-- p_edits: [{id, student_id?, objective_id?, memo?, created_at?,
+-- objective_progress?: {trials_completed, trials_total}}]; absent keys are
+-- left as they are. Returns {"results": [{session, progress,
+-- previous_session, previous_progress}]}.
+create or replace function public.edit_sessions_with_progress(
+    p_teacher_id uuid,
+    p_edits jsonb
+)
+returns json
+language plpgsql
+as $$
+declare
+    v_ids uuid[];
+    v_missing uuid[];
+    v_edit jsonb;
+    v_previous_session public.sessions;
+    v_previous_progress public.objective_progress;
+    v_session public.sessions;
+    v_progress public.objective_progress;
+    v_results jsonb := '[]'::jsonb;
+begin
+    select array_agg((value->>'id')::uuid) into v_ids
+    from jsonb_array_elements(p_edits);
+
+    perform 1 from public.sessions
+    where id = any(v_ids) and teacher_id = p_teacher_id
+    for update;
+
+    select coalesce(array_agg(requested.id), '{}') into v_missing
+    from unnest(v_ids) as requested(id)
+    where not exists (
+        select 1 from public.sessions s where s.id = requested.id and s.teacher_id = p_teacher_id
+    );
+    if cardinality(v_missing) > 0 then
+        return json_build_object('missing', v_missing);
+    end if;
+
+    for v_edit in select value from jsonb_array_elements(p_edits) loop
+        select * into v_previous_session
+        from public.sessions
+        where id = (v_edit->>'id')::uuid;
+
+        v_previous_progress := null;
+        select * into v_previous_progress
+        from public.objective_progress
+        where id = v_previous_session.objective_progress_id
+        for update;
+
+        update public.sessions
+        set student_id = case when v_edit ? 'student_id' then (v_edit->>'student_id')::uuid else student_id end,
+            objective_id = case when v_edit ? 'objective_id' then (v_edit->>'objective_id')::uuid else objective_id end,
+            memo = case when v_edit ? 'memo' then v_edit->>'memo' else memo end,
+            created_at = case when v_edit ? 'created_at' then (v_edit->>'created_at')::timestamptz else created_at end
+        where id = v_previous_session.id
+        returning * into v_session;
+
+        v_progress := null;
+        update public.objective_progress
+        set student_id = v_session.student_id,
+            objective_id = v_session.objective_id,
+            trials_completed = coalesce((v_edit->'objective_progress'->>'trials_completed')::integer, trials_completed),
+            trials_total = coalesce((v_edit->'objective_progress'->>'trials_total')::integer, trials_total)
+        where id = v_session.objective_progress_id
+        returning * into v_progress;
+
+        v_results := v_results || jsonb_build_array(jsonb_build_object(
+            'session', to_jsonb(v_session),
+            'progress', case when v_progress.id is null then null else to_jsonb(v_progress) end,
+            'previous_session', to_jsonb(v_previous_session),
+            'previous_progress', case when v_previous_progress.id is null then null else to_jsonb(v_previous_progress) end
+        ));
+    end loop;
+
+    return json_build_object('results', v_results);
+end;
+$$;
+
+-- Returns {"deleted": [session rows, each with its objective_progress row embedded]}.
+create or replace function public.delete_sessions_with_progress(
+    p_teacher_id uuid,
+    p_session_ids uuid[]
+)
+returns json
+language plpgsql
+as $$
+declare
+    v_missing uuid[];
+    v_deleted jsonb;
+begin
+    perform 1 from public.sessions
+    where id = any(p_session_ids) and teacher_id = p_teacher_id
+    for update;
+
+    select coalesce(array_agg(requested.id), '{}') into v_missing
+    from unnest(p_session_ids) as requested(id)
+    where not exists (
+        select 1 from public.sessions s where s.id = requested.id and s.teacher_id = p_teacher_id
+    );
+    if cardinality(v_missing) > 0 then
+        return json_build_object('missing', v_missing);
+    end if;
+
+    -- Sessions reference their progress rows; both go in one statement
+    with deleted_sessions as (
+        delete from public.sessions
+        where id = any(p_session_ids) and teacher_id = p_teacher_id
+        returning *
+    ), deleted_progress as (
+        delete from public.objective_progress p
+        using deleted_sessions s
+        where p.id = s.objective_progress_id
+        returning p.*
+    )
+    select coalesce(jsonb_agg(to_jsonb(s) || jsonb_build_object('objective_progress', to_jsonb(p))), '[]'::jsonb)
+    into v_deleted
+    from deleted_sessions s
+    left join deleted_progress p on p.id = s.objective_progress_id;
+
+    return json_build_object('deleted', v_deleted);
+end;
+$$;
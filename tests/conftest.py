@@ -0,0 +1,88 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# app.services.llm builds its client at import time
+os.environ.setdefault("TOGETHER_API_KEY", "test")
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.dependencies.auth import user_supabase_client
+from tests.fake_supabase import FakeSupabase
+
+TEACHER_ID = "00000000-0000-0000-0000-0000000000aa"
+OTHER_TEACHER_ID = "00000000-0000-0000-0000-0000000000bb"
+
+
+@pytest.fixture
+def checkpoint_dir(tmp_path, monkeypatch):
+    from app.utils import checkpoint
+    monkeypatch.setattr(checkpoint, "CHECKPOINT_DIR", str(tmp_path))
+    monkeypatch.setattr(checkpoint, "_leases", {})
+    return tmp_path
+
+
+@pytest.fixture
+def api():
+    """Build a TestClient for one router, authenticated as TEACHER_ID against a FakeSupabase."""
+    def build(router, prefix: str, supabase: FakeSupabase, user_id: str = TEACHER_ID) -> TestClient:
+        app = FastAPI()
+        app.include_router(router, prefix=prefix)
+        app.dependency_overrides[user_supabase_client] = lambda: {
+            "supabase": supabase, "user_id": user_id, "user": None,
+        }
+        return TestClient(app)
+    return build
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "supabase", "migrations")
+BASE_SCHEMA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sql", "supabase_base.sql")
+
+
+@pytest.fixture(scope="session")
+def postgres_url(tmp_path_factory):
+    """
+    A throwaway database with the Supabase base schema and every migration
+    applied. Uses TEST_DATABASE_URL (a server the tests may create databases
+    on) if set, otherwise a local pgserver; skips if neither is available.
+    """
+    psycopg = pytest.importorskip("psycopg")
+
+    server = None
+    admin_url = os.getenv("TEST_DATABASE_URL")
+    if not admin_url:
+        pgserver = pytest.importorskip("pgserver")
+        server = pgserver.get_server(str(tmp_path_factory.mktemp("pg")), cleanup_mode="stop")
+        admin_url = server.get_uri()
+
+    name = f"mirae_test_{os.getpid()}"
+    with psycopg.connect(admin_url, autocommit=True) as admin:
+        admin.execute(f"drop database if exists {name}")
+        admin.execute(f"create database {name}")
+    url = psycopg.conninfo.make_conninfo(admin_url, dbname=name)
+
+    with psycopg.connect(url, autocommit=True) as conn:
+        with open(BASE_SCHEMA) as f:
+            conn.execute(f.read())
+        for migration in sorted(os.listdir(MIGRATIONS_DIR)):
+            with open(os.path.join(MIGRATIONS_DIR, migration)) as f:
+                conn.execute(f.read())
+
+    yield url
+
+    with psycopg.connect(admin_url, autocommit=True) as admin:
+        admin.execute(f"drop database if exists {name}")
+    if server is not None:
+        server.cleanup()
+
+
+@pytest.fixture
+def pg(postgres_url):
+    """Autocommit connection to the migrated test database; rows come back as dicts."""
+    import psycopg
+    from psycopg.rows import dict_row
+    with psycopg.connect(postgres_url, autocommit=True, row_factory=dict_row) as conn:
+        yield conn
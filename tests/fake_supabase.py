@@ -0,0 +1,213 @@
+"""
+In-memory stand-in for the supabase-py client, covering the PostgREST calls
+the app makes: select (with the objective_progress embed on sessions), eq,
+in_, gte/gt/lt/lte, the keyset or_ filters, order, limit, range, insert,
+upsert, update, delete and rpc.
+"""
+import copy
+import re
+from typing import Callable, Dict, List, Optional
+
+_KEYSET_RE = re.compile(
+    r'(?P<column>\w+)\.(?P<op>gt|lt)\."(?P<value>[^"]*)",'
+    r'and\(\w+\.eq\."[^"]*",id\.(?:gt|lt)\."(?P<row_id>[^"]*)"\)'
+)
+
+_PRIMARY_KEYS = {"objective_rollups": "objective_id"}
+
+
+class Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class Query:
+    def __init__(self, db: "FakeSupabase", table: str):
+        self.db = db
+        self.table = table
+        self.filters: List[Callable[[Dict], bool]] = []
+        self.orders = []
+        self.row_limit: Optional[int] = None
+        self.row_range = None
+        self.operation = "select"
+        self.payload = None
+        self.columns = "*"
+
+    # -------- Filters --------
+    def select(self, columns="*", **kwargs):
+        self.columns = columns
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) >= value)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) > value)
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) < value)
+        return self
+
+    def lte(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) <= value)
+        return self
+
+    def or_(self, expression):
+        match = _KEYSET_RE.fullmatch(expression)
+        if not match:
+            raise ValueError(f"Unsupported or_ filter: {expression}")
+        column, op = match["column"], match["op"]
+        bound = (match["value"], match["row_id"])
+
+        def keyset(row):
+            key = (row.get(column), str(row.get("id")))
+            return key > bound if op == "gt" else key < bound
+
+        self.filters.append(keyset)
+        return self
+
+    def order(self, column, desc=False, **kwargs):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, count, **kwargs):
+        self.row_limit = count
+        return self
+
+    def range(self, start, end):
+        self.row_range = (start, end)
+        return self
+
+    # -------- Writes --------
+    def insert(self, rows, **kwargs):
+        self.operation = "insert"
+        self.payload = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(self, rows, **kwargs):
+        self.operation = "upsert"
+        self.payload = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def update(self, values):
+        self.operation = "update"
+        self.payload = values
+        return self
+
+    def delete(self):
+        self.operation = "delete"
+        return self
+
+    def execute(self):
+        self.db.calls.append((self.table, self.operation))
+        if self.db.fail is not None:
+            self.db.fail(self)
+        rows = self.db.tables.setdefault(self.table, [])
+        key = _PRIMARY_KEYS.get(self.table, "id")
+
+        if self.operation in ("insert", "upsert"):
+            for new in self.payload:
+                existing = next((row for row in rows if row.get(key) == new.get(key)), None)
+                if existing is not None:
+                    existing.update(copy.deepcopy(new))
+                else:
+                    rows.append(copy.deepcopy(new))
+            return Result(copy.deepcopy(self.payload))
+
+        matched = [row for row in rows if all(f(row) for f in self.filters)]
+        if self.operation == "delete":
+            for row in matched:
+                rows.remove(row)
+            return Result(copy.deepcopy(matched))
+        if self.operation == "update":
+            for row in matched:
+                row.update(copy.deepcopy(self.payload))
+            return Result(copy.deepcopy(matched))
+
+        for column, desc in reversed(self.orders):
+            matched = sorted(matched, key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        out = [self._embed(copy.deepcopy(row)) for row in matched]
+        if self.row_range:
+            out = out[self.row_range[0]:self.row_range[1] + 1]
+        if self.row_limit is not None:
+            out = out[:self.row_limit]
+        return Result(out)
+
+    def _embed(self, row: Dict) -> Dict:
+        if self.table == "sessions" and "objective_progress" in self.columns:
+            progress = next(
+                (p for p in self.db.tables.get("objective_progress", []) if p["id"] == row.get("objective_progress_id")),
+                None,
+            )
+            row["objective_progress"] = copy.deepcopy(progress)
+        return row
+
+
+class _Rpc:
+    def __init__(self, result):
+        self.result = result
+
+    def execute(self):
+        return Result(self.result)
+
+
+_MARKER_TABLES = {
+    "students": ("students",),
+    "goals": ("goals",),
+    "objectives": ("objectives",),
+    "subject_areas": ("subject_areas",),
+    "sessions": ("sessions",),
+    "progress": ("objective_rollups",),
+}
+
+
+def data_markers(db: "FakeSupabase", params: Dict) -> Dict:
+    """Mirror of the data_markers RPC: newest updated_at or tombstone per scope."""
+    teacher_id = params["p_teacher_id"]
+    markers = {}
+    for scope, tables in _MARKER_TABLES.items():
+        stamps = [
+            row.get("updated_at")
+            for table in tables
+            for row in db.tables.get(table, [])
+            if row.get("teacher_id") == teacher_id
+        ] + [
+            row.get("deleted_at")
+            for row in db.tables.get("tombstones", [])
+            if row.get("teacher_id") == teacher_id and row.get("table_name") == scope
+        ]
+        stamps = [stamp for stamp in stamps if stamp is not None]
+        markers[scope] = max(stamps) if stamps else None
+    return markers
+
+
+class FakeSupabase:
+    """
+    `tables` maps table name to a list of row dicts. Register RPCs in
+    `rpcs` (name -> fn(db, params)). `fail`, when set, is called with every
+    query before it runs and may raise to simulate a failed request.
+    """
+
+    def __init__(self, tables: Optional[Dict[str, List[Dict]]] = None):
+        self.tables: Dict[str, List[Dict]] = copy.deepcopy(tables or {})
+        self.rpcs: Dict[str, Callable] = {"data_markers": data_markers}
+        self.calls = []
+        self.fail: Optional[Callable[[Query], None]] = None
+
+    def table(self, name: str) -> Query:
+        return Query(self, name)
+
+    def rpc(self, name: str, params: Dict):
+        self.calls.append((name, "rpc"))
+        return _Rpc(self.rpcs[name](self, params))
@@ -0,0 +1,83 @@
+-- The parts of the Supabase project the migrations build on, for tests that
+-- run supabase/migrations against a throwaway Postgres (the postgres_url and
+-- pg fixtures in tests/conftest.py).
+-- Column sets cover what the app reads and writes, not the full schema.
+
+create schema if not exists auth;
+
+create or replace function auth.uid()
+returns uuid
+language sql
+stable
+as $$
+    select nullif(current_setting('request.jwt.claim.sub', true), '')::uuid;
+$$;
+
+do $$
+begin
+    if not exists (select 1 from pg_roles where rolname = 'authenticated') then
+        create role authenticated nologin;
+    end if;
+end;
+$$;
+
+create table public.students (
+    id uuid primary key default gen_random_uuid(),
+    teacher_id uuid not null,
+    name text,
+    disability_type text,
+    grade_level text,
+    summary text,
+    created_at timestamptz not null default now()
+);
+
+create table public.subject_areas (
+    id uuid primary key default gen_random_uuid(),
+    teacher_id uuid not null,
+    student_id uuid references public.students(id) on delete cascade,
+    name text,
+    created_at timestamptz not null default now()
+);
+
+create table public.goals (
+    id uuid primary key default gen_random_uuid(),
+    teacher_id uuid not null,
+    student_id uuid references public.students(id) on delete cascade,
+    subject_area_id uuid references public.subject_areas(id) on delete cascade,
+    title text,
+    created_at timestamptz not null default now()
+);
+
+create table public.objectives (
+    id uuid primary key default gen_random_uuid(),
+    teacher_id uuid not null,
+    student_id uuid references public.students(id) on delete cascade,
+    goal_id uuid references public.goals(id) on delete cascade,
+    subject_area_id uuid references public.subject_areas(id) on delete cascade,
+    description text,
+    objective_type text,
+    target_accuracy numeric,
+    reporting_frequency text,
+    created_at timestamptz not null default now()
+);
+
+create table public.objective_progress (
+    id uuid primary key default gen_random_uuid(),
+    teacher_id uuid not null,
+    student_id uuid references public.students(id) on delete cascade,
+    objective_id uuid references public.objectives(id) on delete cascade,
+    trials_completed integer not null,
+    trials_total integer not null,
+    created_at timestamptz not null default now()
+);
+
+create table public.sessions (
+    id uuid primary key default gen_random_uuid(),
+    teacher_id uuid not null,
+    student_id uuid references public.students(id) on delete cascade,
+    objective_id uuid references public.objectives(id) on delete cascade,
+    objective_progress_id uuid references public.objective_progress(id),
+    memo text,
+    raw_input text,
+    created_at timestamptz not null default now()
+);
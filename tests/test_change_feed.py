@@ -0,0 +1,100 @@
+import base64
+import json
+import uuid
+
+import pytest
+
+from app.routes import changes
+from app.services.change_feed import decode_changes_cursor, encode_changes_cursor
+from tests.conftest import OTHER_TEACHER_ID, TEACHER_ID
+from tests.fake_supabase import FakeSupabase
+
+ISSUED_AT = "2026-10-19T00:00:00+00:00"
+
+
+def _id(n):
+    return str(uuid.UUID(int=n))
+
+
+def _student(n, updated_at, teacher_id=TEACHER_ID):
+    return {"id": _id(n), "teacher_id": teacher_id, "name": f"student {n}", "updated_at": updated_at}
+
+
+def _raw_cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def test_poll_sees_writes_made_outside_this_process(api):
+    db = FakeSupabase({"students": [_student(1, "2026-10-18T10:00:00+00:00")]})
+    client = api(changes.router, "/changes", db)
+
+    first = client.get("/changes").json()
+    assert [row["id"] for row in first["changes"]["students"]] == [_id(1)]
+    assert first["has_more"] is False
+
+    # Written by another worker: no in-process counter saw it
+    db.tables["students"].append(_student(2, "2026-10-18T11:00:00+00:00"))
+    db.tables["students"].append(_student(3, "2026-10-18T11:00:00+00:00", OTHER_TEACHER_ID))
+
+    second = client.get("/changes", params={"since": first["cursor"]}).json()
+    assert _id(2) in [row["id"] for row in second["changes"]["students"]]
+    assert _id(3) not in [row["id"] for row in second["changes"]["students"]]
+
+
+def test_pages_continue_exactly_and_polls_overlap(api):
+    db = FakeSupabase({"students": [_student(n, f"2026-10-18T10:00:0{n}+00:00") for n in range(1, 5)]})
+    client = api(changes.router, "/changes", db)
+
+    page = client.get("/changes", params={"limit": 2}).json()
+    assert page["has_more"] is True
+    assert decode_changes_cursor(page["cursor"])["o"] is False
+
+    page = client.get("/changes", params={"since": page["cursor"], "limit": 2}).json()
+    assert [row["id"] for row in page["changes"]["students"]] == [_id(3), _id(4)]
+    assert page["has_more"] is False
+    # Drained: the next poll starts a few seconds behind the last position
+    assert decode_changes_cursor(page["cursor"])["o"] is True
+    page = client.get("/changes", params={"since": page["cursor"], "limit": 10}).json()
+    assert len(page["changes"]["students"]) == 4
+
+
+def test_tombstones_are_reported_as_deleted(api):
+    db = FakeSupabase({"tombstones": [
+        {"id": 7, "teacher_id": TEACHER_ID, "table_name": "students", "row_id": _id(1), "deleted_at": "2026-10-18T10:00:00+00:00"},
+        {"id": 8, "teacher_id": OTHER_TEACHER_ID, "table_name": "students", "row_id": _id(2), "deleted_at": "2026-10-18T10:00:00+00:00"},
+    ]})
+    page = api(changes.router, "/changes", db).get("/changes").json()
+    assert page["deleted"] == {"students": [_id(1)]}
+    assert decode_changes_cursor(page["cursor"])["p"]["tombstones"] == ["2026-10-18T10:00:00+00:00", "7"]
+
+
+@pytest.mark.parametrize("positions", [
+    {"students": ['2026-10-18T10:00:00+00:00",id.gt."0', _id(1)]},
+    {"students": ["2026-10-18T10:00:00+00:00", 'x",teacher_id.neq."y']},
+    {"students": ["not a timestamp", _id(1)]},
+    {"students": ["2026-10-18T10:00:00+00:00"]},
+    {"tombstones": ["2026-10-18T10:00:00+00:00", _id(1)]},
+    {"tombstones": ["2026-10-18T10:00:00+00:00", True]},
+    {"enrollments": ["2026-10-18T10:00:00+00:00", _id(1)]},
+])
+def test_malformed_positions_are_rejected(api, positions):
+    cursor = _raw_cursor({"p": positions, "o": True, "t": ISSUED_AT})
+    with pytest.raises(ValueError):
+        decode_changes_cursor(cursor)
+
+    db = FakeSupabase()
+    response = api(changes.router, "/changes", db).get("/changes", params={"since": cursor})
+    assert response.status_code == 400
+    assert db.calls == []
+
+
+def test_positions_are_normalized():
+    cursor = encode_changes_cursor(
+        {"students": ["2026-10-18T10:00:00Z", _id(1).upper()], "tombstones": ["2026-10-18T10:00:00+00:00", 12]},
+        True,
+        ISSUED_AT,
+    )
+    assert decode_changes_cursor(cursor)["p"] == {
+        "students": ["2026-10-18T10:00:00+00:00", _id(1)],
+        "tombstones": ["2026-10-18T10:00:00+00:00", "12"],
+    }
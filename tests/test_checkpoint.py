@@ -0,0 +1,106 @@
+import os
+
+import pytest
+
+from app.routes import students
+from app.services import summary_batch
+from app.utils import checkpoint
+from app.utils.checkpoint import (
+    acquire_lease,
+    lease_held,
+    load_checkpoint,
+    release_lease,
+    renew_lease,
+    save_checkpoint,
+)
+from tests.conftest import OTHER_TEACHER_ID, TEACHER_ID
+from tests.fake_supabase import FakeSupabase
+
+
+def test_save_and_load_round_trip(checkpoint_dir):
+    save_checkpoint("jobs", "job-1", {"status": "pending", "completed": ["a"]})
+    assert load_checkpoint("jobs", "job-1") == {"status": "pending", "completed": ["a"]}
+    # The temp file was renamed into place, not left behind
+    assert os.listdir(checkpoint_dir / "jobs") == ["job-1.json"]
+
+
+def test_missing_checkpoint_loads_as_none(checkpoint_dir):
+    assert load_checkpoint("jobs", "nope") is None
+
+
+@pytest.mark.parametrize("job_id", ["../escape", "a/b", "", "job.json"])
+def test_unsafe_ids_are_rejected(checkpoint_dir, job_id):
+    with pytest.raises(ValueError):
+        load_checkpoint("jobs", job_id)
+    with pytest.raises(ValueError):
+        save_checkpoint("jobs", job_id, {})
+
+
+def test_lease_is_exclusive_until_released(checkpoint_dir):
+    assert acquire_lease("jobs", "job-1")
+    assert not acquire_lease("jobs", "job-1")
+    assert lease_held("jobs", "job-1")
+    assert acquire_lease("jobs", "job-2")
+
+    release_lease("jobs", "job-1")
+    assert not lease_held("jobs", "job-1")
+    assert acquire_lease("jobs", "job-1")
+
+
+def test_lease_lapses_without_renewal(checkpoint_dir, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(checkpoint.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(checkpoint, "JOB_LEASE_SECONDS", 60)
+
+    assert acquire_lease("jobs", "job-1")
+    clock[0] += 50
+    renew_lease("jobs", "job-1")
+    clock[0] += 50
+    assert lease_held("jobs", "job-1")
+    clock[0] += 11
+    assert not lease_held("jobs", "job-1")
+    # A lapsed lease (e.g. a worker that died) can be taken over
+    assert acquire_lease("jobs", "job-1")
+
+
+def test_summary_job_releases_lease_when_it_fails(checkpoint_dir):
+    assert acquire_lease(summary_batch.CHECKPOINT_KIND, "gone")
+    with pytest.raises(ValueError):
+        summary_batch.run_summary_job(FakeSupabase(), TEACHER_ID, "gone")
+    assert not lease_held(summary_batch.CHECKPOINT_KIND, "gone")
+
+
+def _stale_running_job(job_id, teacher_id=TEACHER_ID):
+    job = summary_batch.new_job(teacher_id, [], 1, False)
+    job["status"] = "running"
+    save_checkpoint(summary_batch.CHECKPOINT_KIND, job_id, job)
+
+
+def test_job_left_running_by_a_crash_can_be_resumed(checkpoint_dir, api, monkeypatch):
+    started = []
+    monkeypatch.setattr(students, "run_summary_job", lambda supabase, user_id, job_id: started.append(job_id))
+    _stale_running_job("job-1")
+    client = api(students.router, "/students", FakeSupabase())
+
+    assert client.get("/students/summaries/jobs/job-1").json()["status"] == "interrupted"
+
+    response = client.post("/students/summaries/regenerate", json={"job_id": "job-1"})
+    assert response.status_code == 200
+    assert started == ["job-1"]
+
+
+def test_concurrent_resume_is_rejected_while_leased(checkpoint_dir, api, monkeypatch):
+    monkeypatch.setattr(students, "run_summary_job", lambda *args: None)
+    _stale_running_job("job-1")
+    client = api(students.router, "/students", FakeSupabase())
+
+    # The background task never released the lease, as if it were still running
+    assert client.post("/students/summaries/regenerate", json={"job_id": "job-1"}).status_code == 200
+    assert client.post("/students/summaries/regenerate", json={"job_id": "job-1"}).status_code == 409
+    assert client.get("/students/summaries/jobs/job-1").json()["status"] == "running"
+
+
+def test_other_teachers_job_is_not_found(checkpoint_dir, api):
+    _stale_running_job("job-1", teacher_id=OTHER_TEACHER_ID)
+    client = api(students.router, "/students", FakeSupabase())
+    assert client.post("/students/summaries/regenerate", json={"job_id": "job-1"}).status_code == 404
@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+from app.utils import chunked_query
+from app.utils.chunked_query import fetch_all, in_chunks
+from tests.fake_supabase import FakeSupabase
+
+
+@pytest.fixture
+def db():
+    return FakeSupabase({"rows": [{"id": f"r{i:03d}", "n": i} for i in range(25)]})
+
+
+def _query(db):
+    return lambda: db.table("rows").select("*").order("id")
+
+
+@pytest.mark.parametrize("page_size, requests", [(10, 3), (5, 6), (25, 2), (100, 1)])
+def test_fetch_all_pages_through_everything(db, monkeypatch, page_size, requests):
+    monkeypatch.setattr(chunked_query, "FETCH_PAGE_SIZE", page_size)
+    rows = fetch_all(_query(db))
+    assert [row["n"] for row in rows] == list(range(25))
+    # A full last page needs one more (empty) request to know it was the last
+    assert len(db.calls) == requests
+
+
+def test_in_chunks_with_no_values_makes_no_request(db):
+    assert in_chunks(_query(db), "id", []) == []
+    assert db.calls == []
+
+
+def test_in_chunks_dedupes_and_runs_a_single_chunk_inline(db):
+    caller = threading.current_thread()
+    threads = []
+    db.fail = lambda query: threads.append(threading.current_thread())
+
+    rows = in_chunks(_query(db), "id", ["r001", "r002", "r001"])
+
+    assert sorted(row["id"] for row in rows) == ["r001", "r002"]
+    assert threads == [caller]
+
+
+def test_in_chunks_splits_and_concatenates_in_chunk_order(db):
+    ids = [f"r{i:03d}" for i in reversed(range(25))]
+    rows = in_chunks(_query(db), "id", ids, chunk_size=10)
+
+    assert len(db.calls) == 3
+    assert sorted(row["id"] for row in rows) == sorted(ids)
+    # Each chunk's rows come back together, chunks in the order of `values`
+    assert [row["id"] for row in rows[:10]] == sorted(ids[:10])
+
+
+def test_in_chunks_paginates_each_chunk(db, monkeypatch):
+    monkeypatch.setattr(chunked_query, "FETCH_PAGE_SIZE", 4)
+    ids = [f"r{i:03d}" for i in range(12)]
+    rows = in_chunks(_query(db), "id", ids, chunk_size=6, paginate=True)
+    assert sorted(row["n"] for row in rows) == list(range(12))
+
+
+def test_in_chunks_surfaces_a_failed_chunk(db):
+    def fail(query):
+        if len(db.calls) == 2:
+            raise RuntimeError("timeout")
+    db.fail = fail
+    with pytest.raises(RuntimeError):
+        in_chunks(_query(db), "id", [f"r{i:03d}" for i in range(25)], chunk_size=10)
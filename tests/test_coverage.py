@@ -0,0 +1,155 @@
+from datetime import datetime, timezone
+
+from app.services.coverage import compute_coverage, reporting_period
+
+# A Wednesday
+NOW = datetime(2026, 3, 11, 12, tzinfo=timezone.utc)
+
+
+def _objective(objective_id, frequency="Weekly", last_logged_at=None):
+    return {
+        "id": objective_id,
+        "description": objective_id,
+        "student_id": "s1",
+        "reporting_frequency": frequency,
+        "student": {"id": "s1", "name": "Ada"},
+        "rollup": {"last_logged_at": last_logged_at} if last_logged_at else None,
+    }
+
+
+def _session(objective_id, created_at):
+    return {"id": f"{objective_id}-{created_at}", "objective_id": objective_id, "created_at": created_at}
+
+
+def _by_id(result):
+    return {row["objective_id"]: row for row in result["objectives"]}
+
+
+def test_reporting_period_defaults_to_weekly():
+    assert reporting_period("Daily") == "day"
+    assert reporting_period("Quarterly progress") == "quarter"
+    assert reporting_period("At Opportunity") == "week"
+    assert reporting_period(None) == "week"
+
+
+def test_current_week_is_neither_expected_nor_missed():
+    # Weeks of Feb 23, Mar 2 and the open week of Mar 9
+    start = datetime(2026, 2, 23, tzinfo=timezone.utc)
+    result = compute_coverage(
+        [_objective("logged"), _objective("quiet")],
+        [
+            _session("logged", "2026-02-24T10:00:00+00:00"),
+            _session("logged", "2026-03-03T10:00:00+00:00"),
+        ],
+        start,
+        NOW,
+        now=NOW,
+    )
+    rows = _by_id(result)
+
+    assert rows["logged"]["expected"] == 2
+    assert rows["logged"]["missed"] == 0
+    assert rows["logged"]["current_period_logged"] is False
+    assert rows["logged"]["consecutive_missed"] == 0
+    assert rows["logged"]["overdue_days"] == 0
+
+    assert rows["quiet"]["expected"] == 2
+    assert rows["quiet"]["missed"] == 2
+    assert [row["objective_id"] for row in result["overdue"]] == ["quiet"]
+
+
+def test_logging_in_the_open_period_is_reported_separately():
+    start = datetime(2026, 3, 2, tzinfo=timezone.utc)
+    result = compute_coverage(
+        [_objective("o1")], [_session("o1", "2026-03-10T09:00:00+00:00")], start, NOW, now=NOW
+    )
+    row = _by_id(result)["o1"]
+    assert row["expected"] == 1
+    assert row["logged"] == 0
+    assert row["current_period_logged"] is True
+    assert row["consecutive_missed"] == 1
+    assert row["overdue_days"] == 1
+
+
+def test_overdue_days_count_from_the_last_log():
+    start = datetime(2026, 1, 5, tzinfo=timezone.utc)
+    result = compute_coverage(
+        [_objective("monthly", "Monthly"), _objective("weekly")],
+        [
+            _session("monthly", "2026-01-20T12:00:00+00:00"),
+            _session("weekly", "2026-02-25T12:00:00+00:00"),
+        ],
+        start,
+        NOW,
+        now=NOW,
+    )
+    rows = _by_id(result)
+
+    # February was missed; January 20 was 50 days ago
+    assert rows["monthly"]["consecutive_missed"] == 1
+    assert rows["monthly"]["overdue_days"] == 50
+    # The week of Mar 2 was missed; Feb 25 was 14 days ago
+    assert rows["weekly"]["consecutive_missed"] == 1
+    assert rows["weekly"]["overdue_days"] == 14
+    assert [row["objective_id"] for row in result["overdue"]] == ["monthly", "weekly"]
+
+
+def test_overdue_days_use_the_rollup_for_logs_before_the_range():
+    start = datetime(2026, 3, 2, tzinfo=timezone.utc)
+    result = compute_coverage(
+        [
+            _objective("before", last_logged_at="2026-02-01T12:00:00+00:00"),
+            _objective("never"),
+        ],
+        [],
+        start,
+        NOW,
+        now=NOW,
+    )
+    rows = _by_id(result)
+    assert rows["before"]["overdue_days"] == 38
+    # Never logged: nothing is known before the range start
+    assert rows["never"]["overdue_days"] == 9
+
+
+def test_daily_objectives_skip_weekends_and_today():
+    # Thursday Mar 5 through today (Wednesday Mar 11): Thu, Fri, Mon, Tue have ended
+    start = datetime(2026, 3, 5, tzinfo=timezone.utc)
+    result = compute_coverage(
+        [_objective("o1", "Daily")],
+        [
+            _session("o1", "2026-03-05T09:00:00+00:00"),
+            _session("o1", "2026-03-07T09:00:00+00:00"),
+            _session("o1", "2026-03-10T09:00:00+00:00"),
+        ],
+        start,
+        NOW,
+        now=NOW,
+    )
+    row = _by_id(result)["o1"]
+    assert row["expected"] == 4
+    assert row["logged"] == 2
+    assert row["sessions_logged"] == 3
+    assert row["consecutive_missed"] == 0
+    assert row["current_period_logged"] is False
+
+
+def test_a_range_that_ended_counts_every_period():
+    start = datetime(2026, 2, 2, tzinfo=timezone.utc)
+    end = datetime(2026, 2, 16, tzinfo=timezone.utc)
+    result = compute_coverage(
+        [_objective("o1")], [_session("o1", "2026-02-03T09:00:00+00:00")], start, end, now=NOW
+    )
+    row = _by_id(result)["o1"]
+    assert row["expected"] == 2
+    assert row["current_period_logged"] is None
+    # Measured to the end of the range, not to now
+    assert row["overdue_days"] == 12
+    assert result["as_of"] == "2026-02-15"
+
+
+def test_no_objectives():
+    start = datetime(2026, 3, 2, tzinfo=timezone.utc)
+    result = compute_coverage([], [], start, NOW, now=NOW)
+    assert result["objectives_total"] == 0
+    assert result["coverage_percent"] == 0
@@ -0,0 +1,25 @@
+from app.routes import dashboard
+from tests.conftest import TEACHER_ID
+from tests.fake_supabase import FakeSupabase
+
+
+def test_week_rollover_is_not_served_as_304(api, monkeypatch):
+    weeks = iter([
+        ("2026-10-12T00:00:00+00:00", "2026-10-19T00:00:00+00:00"),
+        ("2026-10-19T00:00:00+00:00", "2026-10-26T00:00:00+00:00"),
+    ])
+    monkeypatch.setattr(dashboard, "get_week_range", lambda week: next(weeks))
+    db = FakeSupabase({
+        "students": [{"id": "st1", "teacher_id": TEACHER_ID, "name": "A"}],
+        "objectives": [{"id": "o1", "teacher_id": TEACHER_ID, "student_id": "st1", "description": "Read"}],
+        "sessions": [{"id": "s1", "teacher_id": TEACHER_ID, "objective_id": "o1", "created_at": "2026-10-14T09:00:00+00:00"}],
+    })
+    client = api(dashboard.router, "/dashboard", db)
+
+    first = client.get("/dashboard")
+    assert first.status_code == 200
+
+    # Same URL, no writes, but "this week" now means the following week
+    second = client.get("/dashboard", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200
+    assert second.json()["weekly_summary"] != first.json()["weekly_summary"]
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from app.utils.downsample import lttb
+
+
+def _reference_lttb(x, y, threshold):
+    """Straightforward LTTB over plain lists, bucketed the same way."""
+    n = len(x)
+    edges = [int(e) for e in np.linspace(1, n - 1, threshold - 1).astype(np.int64)]
+    selected, a = [0], 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = sum(x[end:next_end]) / (next_end - end)
+        avg_y = sum(y[end:next_end]) / (next_end - end)
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    return selected + [n - 1]
+
+
+def test_short_series_is_returned_whole():
+    x = np.arange(5, dtype=float)
+    assert lttb(x, x, 5).tolist() == [0, 1, 2, 3, 4]
+    assert lttb(x, x, 50).tolist() == [0, 1, 2, 3, 4]
+    assert lttb(np.array([]), np.array([]), 10).tolist() == []
+
+
+@pytest.mark.parametrize("threshold", [0, 1, 2])
+def test_threshold_below_three_keeps_everything(threshold):
+    x = np.arange(10, dtype=float)
+    assert len(lttb(x, x, threshold)) == 10
+
+
+def test_keeps_ends_and_returns_sorted_unique_indices():
+    rng = np.random.default_rng(3)
+    x = np.cumsum(rng.random(1000))
+    y = rng.normal(size=1000)
+    keep = lttb(x, y, 100)
+
+    assert len(keep) == 100
+    assert keep[0] == 0 and keep[-1] == 999
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_matches_reference_implementation():
+    rng = np.random.default_rng(11)
+    x = np.sort(rng.random(257)) * 100
+    y = np.sin(x / 7) + rng.normal(scale=0.2, size=257)
+    assert lttb(x, y, 40).tolist() == _reference_lttb(x.tolist(), y.tolist(), 40)
+
+
+def test_spike_survives_downsampling():
+    x = np.arange(500, dtype=float)
+    y = np.zeros(500)
+    y[317] = 10.0
+    assert 317 in lttb(x, y, 20).tolist()
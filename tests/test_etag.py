@@ -0,0 +1,88 @@
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.services import data_version
+from app.utils.etag import conditional_json
+from tests.fake_supabase import FakeSupabase
+
+
+def _client(supabase, teacher_id, calls):
+    app = FastAPI()
+
+    @app.get("/students")
+    def students(request: Request):
+        def compute():
+            calls.append(1)
+            return [row["name"] for row in supabase.tables["students"]]
+        return conditional_json(request, supabase, teacher_id, data_version.CASELOAD, compute)
+
+    return TestClient(app)
+
+
+def _setup():
+    # A fresh teacher id per test keeps the process-wide version counters apart
+    teacher_id = str(uuid.uuid4())
+    supabase = FakeSupabase({"students": [
+        {"id": "s1", "teacher_id": teacher_id, "name": "A", "updated_at": "2026-10-01T00:00:00+00:00"},
+    ]})
+    calls = []
+    return teacher_id, supabase, calls, _client(supabase, teacher_id, calls)
+
+
+def test_matching_etag_is_answered_without_computing():
+    _, _, calls, client = _setup()
+    first = client.get("/students")
+    assert first.status_code == 200 and first.json() == ["A"]
+
+    second = client.get("/students", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 304
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert calls == [1]
+
+
+def test_write_through_the_api_invalidates():
+    teacher_id, supabase, calls, client = _setup()
+    etag = client.get("/students").headers["ETag"]
+
+    supabase.tables["students"][0]["name"] = "B"
+    data_version.bump(teacher_id, data_version.STUDENTS)
+
+    response = client.get("/students", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.json() == ["B"]
+
+
+def test_write_made_elsewhere_invalidates_via_database_marker():
+    _, supabase, calls, client = _setup()
+    etag = client.get("/students").headers["ETag"]
+
+    # Another worker (or a script) updated the row; this process never bumped
+    supabase.tables["students"][0].update({"name": "C", "updated_at": "2026-10-02T00:00:00+00:00"})
+
+    response = client.get("/students", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.json() == ["C"]
+
+
+def test_delete_made_elsewhere_invalidates_via_tombstone():
+    teacher_id, supabase, calls, client = _setup()
+    etag = client.get("/students").headers["ETag"]
+
+    supabase.tables["students"].clear()
+    supabase.tables["tombstones"] = [{
+        "id": 1, "teacher_id": teacher_id, "table_name": "students",
+        "row_id": "s1", "deleted_at": "2026-10-02T00:00:00+00:00",
+    }]
+
+    response = client.get("/students", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.json() == []
+
+
+def test_unchanged_body_after_a_write_is_still_304():
+    teacher_id, _, calls, client = _setup()
+    etag = client.get("/students").headers["ETag"]
+    data_version.bump(teacher_id, data_version.STUDENTS)
+
+    response = client.get("/students", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert len(calls) == 2
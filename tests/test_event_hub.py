@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+from cachetools import LRUCache
+
+from app.services import event_hub
+
+TEACHER = "teacher-events"
+
+
+@pytest.fixture(autouse=True)
+def fresh_hub(monkeypatch):
+    monkeypatch.setattr(event_hub, "_history", LRUCache(maxsize=2))
+    monkeypatch.setattr(event_hub, "_subscribers", {})
+
+
+def _connect(last_event_id=None, teacher_id=TEACHER):
+    """Subscribe, drain whatever was queued on connect, and unsubscribe."""
+    async def run():
+        subscription = event_hub.subscribe(teacher_id, last_event_id)
+        queued = []
+        while not subscription.queue.empty():
+            queued.append(subscription.queue.get_nowait())
+        event_hub.unsubscribe(subscription)
+        return queued
+    return asyncio.run(run())
+
+
+def _publish(n, teacher_id=TEACHER):
+    for i in range(n):
+        event_hub.publish(teacher_id, event_hub.PROGRESS, {"i": i})
+    return list(event_hub._history[teacher_id].events)
+
+
+def test_reconnect_replays_the_events_after_last_event_id():
+    events = _publish(3)
+    replayed = _connect(events[0]["id"])
+    assert [event["data"]["i"] for event in replayed] == [1, 2]
+    assert _connect(events[-1]["id"]) == []
+
+
+def test_ids_carry_the_epoch():
+    events = _publish(2)
+    epoch = event_hub._history[TEACHER].epoch
+    assert [event["id"] for event in events] == [f"{epoch}-1", f"{epoch}-2"]
+    assert event_hub.parse_event_id(events[1]["id"]) == (epoch, 2)
+
+
+def test_id_from_an_evicted_history_gets_a_resync():
+    events = _publish(3)
+    # Two other teachers push this one's history out of the LRU
+    _publish(1, "teacher-b")
+    _publish(1, "teacher-c")
+    _publish(3)
+
+    # Same sequence number, but a different epoch
+    queued = _connect(events[0]["id"])
+    assert [event["type"] for event in queued] == [event_hub.RESYNC]
+    assert queued[0]["id"] == event_hub._history[TEACHER].latest_id()
+
+
+@pytest.mark.parametrize("last_event_id", ["7", "", "not-an-id", "0123456789ab-1"])
+def test_ids_from_a_restart_or_garbage_get_a_resync(last_event_id):
+    _publish(2)
+    queued = _connect(last_event_id)
+    assert [event["type"] for event in queued] == [event_hub.RESYNC]
+
+
+def test_ids_ahead_of_the_history_get_a_resync():
+    events = _publish(2)
+    epoch = event_hub._history[TEACHER].epoch
+    assert [event["type"] for event in _connect(f"{epoch}-5")] == [event_hub.RESYNC]
+    assert _connect(events[-1]["id"]) == []
+
+
+def test_falling_out_of_the_replay_buffer_gets_a_resync(monkeypatch):
+    monkeypatch.setattr(event_hub, "EVENT_REPLAY_SIZE", 2)
+    monkeypatch.setattr(event_hub, "_history", LRUCache(maxsize=2))
+    events = _publish(4)
+    epoch = event_hub._history[TEACHER].epoch
+
+    assert [event["type"] for event in _connect(f"{epoch}-1")] == [event_hub.RESYNC]
+    assert [event["data"]["i"] for event in _connect(f"{epoch}-2")] == [2, 3]
+
+
+def test_slow_subscriber_gets_a_resync_instead_of_a_backlog(monkeypatch):
+    monkeypatch.setattr(event_hub, "EVENT_QUEUE_SIZE", 2)
+
+    async def run():
+        subscription = event_hub.subscribe(TEACHER)
+        _publish(3)
+        # Deliveries are scheduled on the loop; let them run
+        await asyncio.sleep(0)
+        queued = []
+        while not subscription.queue.empty():
+            queued.append(subscription.queue.get_nowait())
+        event_hub.unsubscribe(subscription)
+        return queued
+
+    queued = asyncio.run(run())
+    assert [event["type"] for event in queued] == [event_hub.RESYNC]
+    assert queued[0]["id"] == event_hub._history[TEACHER].latest_id()
+
+
+def test_subscribers_are_capped_per_teacher(monkeypatch):
+    monkeypatch.setattr(event_hub, "MAX_SUBSCRIBERS_PER_TEACHER", 1)
+
+    async def run():
+        first = event_hub.subscribe(TEACHER)
+        try:
+            with pytest.raises(event_hub.TooManySubscribers):
+                event_hub.subscribe(TEACHER)
+        finally:
+            event_hub.unsubscribe(first)
+        event_hub.unsubscribe(event_hub.subscribe(TEACHER))
+
+    asyncio.run(run())
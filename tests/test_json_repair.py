@@ -0,0 +1,42 @@
+import pytest
+
+from app.utils.json_repair import parse_json_lenient
+
+
+def test_plain_json_is_untouched():
+    assert parse_json_lenient('{"a": [1, 2]}') == {"a": [1, 2]}
+
+
+def test_code_fence_and_prose_are_stripped():
+    raw = 'Here you go:\n```json\n{"summary": "ok"}\n```\nLet me know!'
+    assert parse_json_lenient(raw) == {"summary": "ok"}
+
+
+def test_trailing_commas_are_removed_outside_strings():
+    assert parse_json_lenient('{"a": [1, 2,], "b": "x,}",}') == {"a": [1, 2], "b": "x,}"}
+
+
+def test_smart_quote_delimiters_are_repaired():
+    assert parse_json_lenient("{“summary”: “ok”}") == {"summary": "ok"}
+
+
+def test_smart_quotes_inside_strings_are_kept():
+    # Another repair is needed (trailing comma), so the smart quote pass runs too
+    raw = '{"summary": "She said “done” today",}'
+    assert parse_json_lenient(raw) == {"summary": "She said “done” today"}
+
+
+def test_smart_quotes_nested_in_smart_quoted_value():
+    raw = "{“summary”: “She said “done” today”}"
+    assert parse_json_lenient(raw) == {"summary": "She said “done” today"}
+
+
+def test_straight_quote_inside_smart_quoted_value_is_escaped():
+    raw = '{“summary”: “the "goal" sheet”}'
+    assert parse_json_lenient(raw) == {"summary": 'the "goal" sheet'}
+
+
+@pytest.mark.parametrize("raw", [None, "", "   ", "no json here"])
+def test_unparseable_input_raises_value_error(raw):
+    with pytest.raises(ValueError):
+        parse_json_lenient(raw)
@@ -0,0 +1,76 @@
+import pytest
+
+from app.routes import objectives
+from tests.conftest import OTHER_TEACHER_ID, TEACHER_ID
+from tests.fake_supabase import FakeSupabase
+
+GOAL_ID = "00000000-0000-0000-0000-0000000000c1"
+SUBJECT_AREA_ID = "00000000-0000-0000-0000-0000000000a1"
+
+OBJECTIVE = {
+    "student_id": "st1",
+    "goal_id": GOAL_ID,
+    "subject_area_id": SUBJECT_AREA_ID,
+    "description": "Add fractions",
+    "objective_type": "trial",
+    "target_accuracy": 0.8,
+    "target_consistency_trials": 5,
+    "target_consistency_successes": 3,
+}
+
+
+@pytest.fixture
+def refreshed(monkeypatch):
+    calls = []
+    monkeypatch.setattr(objectives, "refresh_rollups", lambda supabase, user_id, ids: calls.append(sorted(ids)))
+    monkeypatch.setattr(objectives, "schedule_student_summary", lambda *args: None)
+    return calls
+
+
+@pytest.fixture
+def client(api):
+    db = FakeSupabase({"objectives": [
+        {"id": "o1", "teacher_id": TEACHER_ID, **OBJECTIVE},
+        {"id": "o2", "teacher_id": TEACHER_ID, **OBJECTIVE},
+        {"id": "o3", "teacher_id": OTHER_TEACHER_ID, **OBJECTIVE},
+    ]})
+    return api(objectives.router, "/objectives", db)
+
+
+def test_update_without_target_changes_keeps_the_rollup(client, refreshed):
+    response = client.put("/objectives/objective/o1", json={**OBJECTIVE, "description": "Add and subtract fractions"})
+    assert response.status_code == 200
+    assert refreshed == []
+
+
+@pytest.mark.parametrize("change", [
+    {"target_accuracy": 0.9},
+    {"target_consistency_trials": 6},
+    {"target_consistency_successes": 4},
+])
+def test_update_with_target_changes_refreshes_the_rollup(client, refreshed, change):
+    response = client.put("/objectives/objective/o1", json={**OBJECTIVE, **change})
+    assert response.status_code == 200
+    assert refreshed == [["o1"]]
+
+
+def test_update_of_another_teachers_objective_is_404(client, refreshed):
+    assert client.put("/objectives/objective/o3", json=OBJECTIVE).status_code == 404
+
+
+def test_batch_edit_refreshes_only_changed_targets(client, refreshed):
+    response = client.post("/objectives/batch/edit", json=[
+        {"id": "o1", "description": "Same targets", "target_consistency_trials": 5},
+        {"id": "o2", "target_accuracy": 0.7},
+    ])
+    assert response.status_code == 200
+    assert refreshed == [["o2"]]
+
+
+def test_batch_delete_relies_on_the_cascade(api, refreshed):
+    db = FakeSupabase({"objectives": [{"id": "o1", "teacher_id": TEACHER_ID, **OBJECTIVE}]})
+    response = api(objectives.router, "/objectives", db).post("/objectives/batch/delete", json={"ids": ["o1"]})
+
+    assert response.status_code == 200
+    assert db.tables["objectives"] == []
+    assert ("objective_progress", "delete") not in db.calls
@@ -0,0 +1,71 @@
+import base64
+import json
+
+import pytest
+
+from app.routes import sessions
+from app.utils.pagination import apply_keyset, decode_cursor, encode_cursor, split_page
+from tests.conftest import TEACHER_ID
+from tests.fake_supabase import FakeSupabase
+
+
+def _uuid(n):
+    return f"00000000-0000-0000-0000-{n:012d}"
+
+
+def _raw_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode("utf-8")).decode("ascii")
+
+
+def _rows():
+    # Three rows share a timestamp so the id tiebreak matters
+    return [
+        {"id": _uuid(i), "teacher_id": TEACHER_ID, "created_at": f"2026-10-{1 + i // 3:02d}T09:00:00+00:00"}
+        for i in range(10)
+    ]
+
+
+def test_cursor_round_trip():
+    row = {"id": _uuid(7), "created_at": "2026-10-01T09:00:00.123456+00:00"}
+    assert decode_cursor(encode_cursor(row)) == ("2026-10-01T09:00:00.123456+00:00", _uuid(7))
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64 !!",
+    _raw_cursor({"a": 1}),
+    _raw_cursor(["2026-10-01T09:00:00+00:00"]),
+    _raw_cursor([1, _uuid(1)]),
+    _raw_cursor(["yesterday", _uuid(1)]),
+    _raw_cursor(["2026-10-01T09:00:00+00:00", "not-a-uuid"]),
+    # Would otherwise break out of the quoted or_ filter
+    _raw_cursor(['2026-10-01T09:00:00+00:00",id.neq."x', _uuid(1)]),
+    _raw_cursor(["2026-10-01T09:00:00+00:00", _uuid(1) + '")']),
+])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_keyset_pages_cover_every_row_once():
+    supabase = FakeSupabase({"sessions": _rows()})
+    seen, cursor = [], None
+    while True:
+        query = supabase.table("sessions").select("*").eq("teacher_id", TEACHER_ID)
+        page, cursor = split_page(apply_keyset(query, cursor, 4).execute().data, 4)
+        seen.extend(row["id"] for row in page)
+        if not cursor:
+            break
+
+    expected = [row["id"] for row in sorted(_rows(), key=lambda r: (r["created_at"], r["id"]), reverse=True)]
+    assert seen == expected
+
+
+def test_split_page_without_more_rows_has_no_cursor():
+    rows = _rows()[:3]
+    assert split_page(rows, 3) == (rows, None)
+
+
+def test_invalid_cursor_is_a_400(api):
+    client = api(sessions.router, "/sessions", FakeSupabase({"sessions": _rows()}))
+    response = client.get("/sessions/sessions", params={"cursor": _raw_cursor(["x", "y"])})
+    assert response.status_code == 400
@@ -0,0 +1,130 @@
+import random
+
+import pytest
+
+from app.services.progress_engine import accuracy_series, compute_progress, normalize_target
+
+
+def _objective(objective_id, **fields):
+    return {"id": objective_id, "student_id": "st1", "description": objective_id, **fields}
+
+
+def _session(objective_id, day, completed, total, hour=9):
+    return {
+        "id": f"{objective_id}-{day}-{hour}",
+        "objective_id": objective_id,
+        "created_at": f"2026-09-{day:02d}T{hour:02d}:00:00+00:00",
+        "objective_progress": {"trials_completed": completed, "trials_total": total},
+    }
+
+
+@pytest.mark.parametrize("value, expected", [(None, 1.0), (0.8, 0.8), (80, 0.8), (1, 1.0)])
+def test_normalize_target(value, expected):
+    assert normalize_target(value) == pytest.approx(expected)
+
+
+def test_no_objectives():
+    assert compute_progress([], [_session("a", 1, 1, 1)]) == []
+
+
+def test_objective_without_sessions_is_not_started():
+    [result] = compute_progress([_objective("a")], [])
+    assert result["status"] == "not_started"
+    assert result["sessions_logged"] == 0
+    assert result["accuracy"] is None and result["trend"] is None and result["last_logged_at"] is None
+
+
+def test_sessions_without_progress_or_for_other_objectives_are_ignored():
+    sessions = [
+        _session("a", 1, 5, 10),
+        {**_session("a", 2, 0, 0), "objective_progress": None},
+        _session("other", 3, 10, 10),
+    ]
+    [result] = compute_progress([_objective("a", target_accuracy=0.5)], sessions)
+    assert result["sessions_logged"] == 1
+    assert result["trials_completed"] == 5 and result["trials_total"] == 10
+
+
+def test_mastery_needs_enough_window_sessions_at_target():
+    objective = _objective("a", target_accuracy=80, target_consistency_trials=3, target_consistency_successes=2)
+    # Oldest session misses; the last three (the window) hit twice
+    sessions = [_session("a", 1, 1, 10), _session("a", 2, 9, 10), _session("a", 3, 5, 10), _session("a", 4, 8, 10)]
+    [result] = compute_progress([objective], sessions)
+
+    assert result["target_accuracy"] == pytest.approx(0.8)
+    assert result["consistency"] == {"window": 3, "required": 2, "sessions": 3, "at_target": 2}
+    assert result["mastered"] and result["status"] == "mastered"
+    assert result["recent_accuracy"] == pytest.approx(22 / 30, abs=1e-4)
+    assert result["accuracy"] == pytest.approx(23 / 40, abs=1e-4)
+    assert result["last_logged_at"] == "2026-09-04T09:00:00+00:00"
+
+
+def test_too_few_sessions_is_never_mastered():
+    objective = _objective("a", target_accuracy=0.5, target_consistency_trials=5, target_consistency_successes=1)
+    [result] = compute_progress([objective], [_session("a", 1, 10, 10)])
+    assert not result["mastered"] and result["status"] == "on_track"
+
+
+def test_trend_direction_and_minimum_points():
+    objective = _objective("a", target_accuracy=1.0)
+    rising = [_session("a", day, day, 10) for day in range(1, 5)]
+    [result] = compute_progress([objective], rising)
+    assert result["trend"] == pytest.approx(0.1)
+    assert result["trend_direction"] == "improving"
+    assert result["status"] == "needs_support"
+
+    [result] = compute_progress([objective], rising[:2])
+    assert result["trend"] is None and result["trend_direction"] is None
+
+
+def test_matches_a_per_objective_reference():
+    rng = random.Random(7)
+    objectives = [
+        _objective(f"o{i}", target_accuracy=rng.choice([0.6, 80, None]), target_consistency_trials=rng.choice([None, 3, 5]))
+        for i in range(20)
+    ]
+    sessions = []
+    for objective in objectives:
+        for day in rng.sample(range(1, 29), rng.randint(0, 12)):
+            total = rng.randint(0, 10)
+            sessions.append(_session(objective["id"], day, rng.randint(0, total), total))
+    rng.shuffle(sessions)
+
+    for objective, result in zip(objectives, compute_progress(objectives, sessions)):
+        history = sorted((s for s in sessions if s["objective_id"] == objective["id"]), key=lambda s: s["created_at"])
+        window = history[-(objective.get("target_consistency_trials") or 10):]
+        target = normalize_target(objective.get("target_accuracy"))
+        at_target = sum(
+            1 for s in window
+            if s["objective_progress"]["trials_total"]
+            and s["objective_progress"]["trials_completed"] / s["objective_progress"]["trials_total"] >= target - 1e-9
+        )
+        assert result["sessions_logged"] == len(history)
+        assert result["trials_completed"] == sum(s["objective_progress"]["trials_completed"] for s in history)
+        assert result["consistency"]["at_target"] == at_target
+
+
+def test_weekly_series_buckets_start_on_monday():
+    # 2026-09-06 is a Sunday, 2026-09-07 a Monday
+    sessions = [_session("a", 6, 2, 4), _session("a", 7, 3, 4), _session("a", 8, 1, 4), _session("a", 9, 0, 0)]
+    series = accuracy_series(sessions, "week")
+
+    assert series["t"] == ["2026-08-31", "2026-09-07"]
+    assert series["sessions"] == [1, 2]
+    assert series["accuracy"] == [0.5, 0.5]
+    assert series["min"] == [0.5, 0.25] and series["max"] == [0.5, 0.75]
+    assert not series["downsampled"]
+
+
+def test_series_is_downsampled_to_the_point_budget():
+    sessions = [_session("a", day, day % 5, 5, hour) for day in range(1, 29) for hour in (8, 12)]
+    series = accuracy_series(sessions, "session", points=10)
+
+    assert series["total_points"] == 56
+    assert series["downsampled"] and len(series["t"]) == 10
+    assert series["t"][0] == "2026-09-01T08:00:00" and series["t"][-1] == "2026-09-28T12:00:00"
+
+
+def test_unknown_bucket():
+    with pytest.raises(ValueError):
+        accuracy_series([], "year")
@@ -0,0 +1,133 @@
+import random
+
+from app.services import data_version
+from app.services.progress_rollups import apply_session_changes, rebuild_rollups, session_entry
+from tests.conftest import TEACHER_ID
+from tests.fake_supabase import FakeSupabase
+
+
+def _db(objectives=("o1",), window=3):
+    return FakeSupabase({
+        "objectives": [
+            {"id": objective_id, "teacher_id": TEACHER_ID, "student_id": "st1", "description": objective_id,
+             "target_accuracy": 0.8, "target_consistency_trials": window, "target_consistency_successes": 2}
+            for objective_id in objectives
+        ],
+        "sessions": [],
+        "objective_progress": [],
+        "objective_rollups": [],
+    })
+
+
+def _log(db, session_id, objective_id, day, completed=5, total=10, with_progress=True):
+    """Write a session like the create route does and return its rollup entry."""
+    progress = None
+    if with_progress:
+        progress = {"id": f"p-{session_id}", "teacher_id": TEACHER_ID, "trials_completed": completed, "trials_total": total}
+        db.tables["objective_progress"].append(progress)
+    session = {
+        "id": session_id, "teacher_id": TEACHER_ID, "student_id": "st1", "objective_id": objective_id,
+        "objective_progress_id": progress["id"] if progress else None,
+        "created_at": f"2026-09-{day:02d}T09:00:00+00:00",
+    }
+    db.tables["sessions"].append(session)
+    return session_entry(session, progress)
+
+
+def _delete(db, session_id):
+    session = next(s for s in db.tables["sessions"] if s["id"] == session_id)
+    db.tables["sessions"].remove(session)
+    progress = next((p for p in db.tables["objective_progress"] if p["id"] == session["objective_progress_id"]), None)
+    if progress:
+        db.tables["objective_progress"].remove(progress)
+    return session_entry(session, progress)
+
+
+def _rollup(db, objective_id="o1"):
+    return next(r for r in db.tables["objective_rollups"] if r["objective_id"] == objective_id)
+
+
+def test_first_change_builds_from_history():
+    db = _db()
+    _log(db, "s1", "o1", 1)
+    apply_session_changes(db, TEACHER_ID, [_log(db, "s2", "o1", 2)], [])
+    assert _rollup(db)["sessions_logged"] == 2
+    assert rebuild_rollups(db, TEACHER_ID, fix=False) == []
+
+
+def test_rollup_writes_bump_progress_not_sessions():
+    db = _db()
+    sessions = data_version.current(TEACHER_ID, data_version.SESSIONS)
+    progress = data_version.current(TEACHER_ID, data_version.PROGRESS)
+
+    apply_session_changes(db, TEACHER_ID, [_log(db, "s1", "o1", 1)], [])
+
+    assert data_version.current(TEACHER_ID, data_version.SESSIONS) == sessions
+    assert data_version.current(TEACHER_ID, data_version.PROGRESS) != progress
+
+
+def test_added_session_already_in_window_is_not_counted_twice():
+    db = _db()
+    entry = _log(db, "s1", "o1", 1)
+    apply_session_changes(db, TEACHER_ID, [entry], [])
+    # The same add delivered again (e.g. the rollup was rebuilt after the write)
+    apply_session_changes(db, TEACHER_ID, [entry], [])
+    apply_session_changes(db, TEACHER_ID, [entry, entry], [])
+
+    rollup = _rollup(db)
+    assert rollup["sessions_logged"] == 1 and rollup["trials_total"] == 10
+    assert [e["session_id"] for e in rollup["recent"]] == ["s1"]
+
+
+def test_deleting_a_session_without_progress_keeps_the_count():
+    db = _db()
+    apply_session_changes(db, TEACHER_ID, [_log(db, "s1", "o1", 1), _log(db, "s2", "o1", 2)], [])
+    _log(db, "bare", "o1", 3, with_progress=False)
+
+    apply_session_changes(db, TEACHER_ID, [], [_delete(db, "bare")])
+
+    assert _rollup(db)["sessions_logged"] == 2
+    assert rebuild_rollups(db, TEACHER_ID, fix=False) == []
+
+
+def test_all_null_progress_record_is_not_counted():
+    entry = session_entry(
+        {"id": "s1", "objective_id": "o1", "created_at": "2026-09-01T09:00:00+00:00"},
+        {"id": None, "trials_completed": None, "trials_total": None},
+    )
+    assert not entry["counted"]
+
+
+def test_edit_inside_the_window_swaps_the_entry():
+    db = _db()
+    apply_session_changes(db, TEACHER_ID, [_log(db, f"s{i}", "o1", i) for i in range(1, 5)], [])
+
+    before = _delete(db, "s4")
+    after = _log(db, "s4", "o1", 4, completed=9)
+    apply_session_changes(db, TEACHER_ID, [after], [before])
+
+    rollup = _rollup(db)
+    assert rollup["sessions_logged"] == 4
+    assert rollup["trials_completed"] == 5 * 3 + 9
+    assert rebuild_rollups(db, TEACHER_ID, fix=False) == []
+
+
+def test_random_writes_match_a_full_rebuild():
+    rng = random.Random(5)
+    db = _db(objectives=("o1", "o2"), window=4)
+    live, counter = [], 0
+    for _ in range(60):
+        if live and rng.random() < 0.35:
+            victim = live.pop(rng.randrange(len(live)))
+            removed = _delete(db, victim)
+            apply_session_changes(db, TEACHER_ID, [], [removed])
+        else:
+            counter += 1
+            session_id = f"s{counter:03d}"
+            entry = _log(db, session_id, rng.choice(("o1", "o2")), rng.randint(1, 28),
+                         completed=rng.randint(0, 10), with_progress=rng.random() > 0.1)
+            live.append(session_id)
+            # Occasionally the same add arrives twice
+            apply_session_changes(db, TEACHER_ID, [entry] * rng.choice((1, 1, 2)), [])
+
+    assert rebuild_rollups(db, TEACHER_ID, fix=False) == []
@@ -0,0 +1,105 @@
+import json
+
+import pytest
+
+from app.routes import reports
+from app.services import report_generator
+from app.utils.checkpoint import acquire_lease, lease_held, save_checkpoint
+from tests.conftest import TEACHER_ID
+from tests.fake_supabase import FakeSupabase
+
+PERIOD = {"start": "2026-09-01T00:00:00+00:00", "end": "2026-10-01T00:00:00+00:00"}
+
+
+@pytest.fixture
+def db():
+    return FakeSupabase({
+        "students": [{"id": "st1", "teacher_id": TEACHER_ID, "name": "A"}],
+        "objectives": [
+            {"id": f"o{i}", "teacher_id": TEACHER_ID, "student_id": "st1", "description": f"Objective {i}", "target_accuracy": 0.8}
+            for i in (1, 2)
+        ],
+        "sessions": [
+            {"id": "s1", "teacher_id": TEACHER_ID, "student_id": "st1", "objective_id": "o1",
+             "objective_progress_id": "p1", "memo": "Good", "created_at": "2026-09-10T09:00:00+00:00"},
+            # Outside the period
+            {"id": "s2", "teacher_id": TEACHER_ID, "student_id": "st1", "objective_id": "o2",
+             "objective_progress_id": "p2", "memo": "Old", "created_at": "2026-08-10T09:00:00+00:00"},
+        ],
+        "objective_progress": [
+            {"id": "p1", "trials_completed": 8, "trials_total": 10},
+            {"id": "p2", "trials_completed": 2, "trials_total": 10},
+        ],
+    })
+
+
+@pytest.fixture
+def narrated(monkeypatch):
+    calls = []
+
+    def fake_narrate(objective, stats, memos, start, end):
+        calls.append(objective["id"])
+        return f"Narrative for {objective['id']}"
+
+    monkeypatch.setattr(report_generator, "_narrate", fake_narrate)
+    return calls
+
+
+def _lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_objectives_without_sessions_skip_the_model(api, db, narrated, checkpoint_dir):
+    client = api(reports.router, "/reports", db)
+    response = client.post("/reports/generate", json=PERIOD)
+
+    lines = _lines(response)
+    assert [line["type"] for line in lines] == ["start", "student", "done"]
+    narratives = {o["objective_id"]: o["narrative"] for o in lines[1]["section"]["objectives"]}
+    assert narratives == {"o1": "Narrative for o1", "o2": report_generator.NO_SESSIONS_NARRATIVE}
+    assert narrated == ["o1"]
+    assert lines[-1]["narratives_generated"] == 1
+
+
+def test_lease_is_released_when_the_stream_ends(api, db, narrated, checkpoint_dir):
+    client = api(reports.router, "/reports", db)
+    report_id = client.post("/reports/generate", json=PERIOD).headers["X-Report-Id"]
+
+    assert not lease_held(report_generator.CHECKPOINT_KIND, report_id)
+    assert client.get(f"/reports/{report_id}").json()["status"] == "completed"
+
+
+def _stale_running_report(report_id):
+    report = report_generator.new_report(TEACHER_ID, PERIOD["start"], PERIOD["end"], None, 2)
+    report["status"] = "running"
+    save_checkpoint(report_generator.CHECKPOINT_KIND, report_id, report)
+
+
+def test_report_left_running_by_a_crash_can_be_resumed(api, db, narrated, checkpoint_dir):
+    _stale_running_report("r1")
+    client = api(reports.router, "/reports", db)
+
+    assert client.get("/reports/r1").json()["status"] == "interrupted"
+    response = client.post("/reports/generate", json={"report_id": "r1"})
+    assert response.status_code == 200
+    assert _lines(response)[-1]["status"] == "completed"
+
+
+def test_resume_of_a_leased_report_is_rejected(api, db, narrated, checkpoint_dir):
+    _stale_running_report("r1")
+    assert acquire_lease(report_generator.CHECKPOINT_KIND, "r1")
+    client = api(reports.router, "/reports", db)
+
+    assert client.post("/reports/generate", json={"report_id": "r1"}).status_code == 409
+    assert client.get("/reports/r1").json()["status"] == "running"
+
+
+def test_resume_only_narrates_what_changed(api, db, narrated, checkpoint_dir):
+    client = api(reports.router, "/reports", db)
+    report_id = client.post("/reports/generate", json=PERIOD).headers["X-Report-Id"]
+    client.post("/reports/generate", json={"report_id": report_id})
+    assert narrated == ["o1"]
+
+    db.tables["objective_progress"][0]["trials_completed"] = 9
+    client.post("/reports/generate", json={"report_id": report_id})
+    assert narrated == ["o1", "o1"]
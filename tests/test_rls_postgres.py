@@ -0,0 +1,69 @@
+"""Row-level security on the tables the migrations add: teachers only see their own rows."""
+import uuid
+
+import psycopg
+import pytest
+
+
+@pytest.fixture
+def as_teacher(pg):
+    """Run statements as an authenticated API client for a given teacher."""
+    def run(teacher_id, sql, params=()):
+        with pg.transaction():
+            pg.execute("set local role authenticated")
+            pg.execute("select set_config('request.jwt.claim.sub', %s, true)", (str(teacher_id),))
+            return pg.execute(sql, params).fetchall()
+    return run
+
+
+def _grant(pg, table):
+    pg.execute(f"grant select, insert, update, delete on public.{table} to authenticated")
+
+
+def _seed_rollup(pg, teacher_id):
+    student = pg.execute("insert into students (teacher_id) values (%s) returning id", (teacher_id,)).fetchone()["id"]
+    objective = pg.execute(
+        "insert into objectives (teacher_id, student_id) values (%s, %s) returning id", (teacher_id, student)
+    ).fetchone()["id"]
+    pg.execute(
+        "insert into objective_rollups (objective_id, teacher_id, student_id) values (%s, %s, %s)",
+        (objective, teacher_id, student),
+    )
+    return objective, student
+
+
+def test_objective_rollups_are_visible_only_to_their_teacher(pg, as_teacher):
+    _grant(pg, "objective_rollups")
+    owner, other = uuid.uuid4(), uuid.uuid4()
+    objective, student = _seed_rollup(pg, owner)
+
+    assert [r["objective_id"] for r in as_teacher(owner, "select objective_id from objective_rollups")] == [objective]
+    assert as_teacher(other, "select objective_id from objective_rollups") == []
+    assert as_teacher(other, "update objective_rollups set sessions_logged = 99 returning objective_id") == []
+
+
+def test_objective_rollups_reject_rows_for_another_teacher(pg, as_teacher):
+    _grant(pg, "objective_rollups")
+    owner, other = uuid.uuid4(), uuid.uuid4()
+    objective, student = _seed_rollup(pg, owner)
+    pg.execute("delete from objective_rollups where objective_id = %s", (objective,))
+
+    with pytest.raises(psycopg.errors.InsufficientPrivilege):
+        as_teacher(other, "insert into objective_rollups (objective_id, teacher_id, student_id) values (%s, %s, %s)",
+                   (objective, owner, student))
+
+
+def test_tombstones_are_visible_only_to_their_teacher(pg, as_teacher):
+    _grant(pg, "students")
+    _grant(pg, "tombstones")
+    owner, other = uuid.uuid4(), uuid.uuid4()
+    student = pg.execute("insert into students (teacher_id) values (%s) returning id", (owner,)).fetchone()["id"]
+
+    # The delete trigger writes the tombstone even though clients can't insert
+    as_teacher(owner, "delete from students where id = %s returning id", (student,))
+
+    assert [r["row_id"] for r in as_teacher(owner, "select row_id from tombstones")] == [student]
+    assert as_teacher(other, "select row_id from tombstones") == []
+    with pytest.raises(psycopg.errors.InsufficientPrivilege):
+        as_teacher(other, "insert into tombstones (teacher_id, table_name, row_id) values (%s, 'students', %s)",
+                   (owner, student))
@@ -0,0 +1,143 @@
+import pytest
+
+from app.routes import sessions
+from tests.conftest import OTHER_TEACHER_ID, TEACHER_ID
+from tests.fake_supabase import FakeSupabase
+
+
+def _session(session_id, teacher_id=TEACHER_ID, student_id="st1", memo="before"):
+    return {
+        "id": session_id, "teacher_id": teacher_id, "student_id": student_id, "objective_id": "o1",
+        "objective_progress_id": f"p-{session_id}", "memo": memo, "created_at": "2026-10-01T09:00:00+00:00",
+    }
+
+
+def _progress(session_id, teacher_id=TEACHER_ID):
+    return {"id": f"p-{session_id}", "teacher_id": teacher_id, "trials_completed": 3, "trials_total": 10}
+
+
+def fake_edit_sessions(db, params):
+    """Same contract as edit_sessions_with_progress: all rows or none, scoped to the teacher."""
+    rows = {row["id"]: row for row in db.tables["sessions"] if row["teacher_id"] == params["p_teacher_id"]}
+    missing = [edit["id"] for edit in params["p_edits"] if edit["id"] not in rows]
+    if missing:
+        return {"missing": missing}
+    progress = {row["id"]: row for row in db.tables["objective_progress"]}
+    results = []
+    for edit in params["p_edits"]:
+        session = rows[edit["id"]]
+        previous_session, previous_progress = dict(session), dict(progress[session["objective_progress_id"]])
+        session.update({k: v for k, v in edit.items() if k not in ("id", "objective_progress")})
+        progress[session["objective_progress_id"]].update(edit.get("objective_progress") or {})
+        results.append({
+            "session": dict(session), "progress": dict(progress[session["objective_progress_id"]]),
+            "previous_session": previous_session, "previous_progress": previous_progress,
+        })
+    return {"results": results}
+
+
+def fake_delete_sessions(db, params):
+    rows = {row["id"]: row for row in db.tables["sessions"] if row["teacher_id"] == params["p_teacher_id"]}
+    missing = [session_id for session_id in params["p_session_ids"] if session_id not in rows]
+    if missing:
+        return {"missing": missing}
+    deleted = []
+    for session_id in params["p_session_ids"]:
+        row = rows[session_id]
+        db.tables["sessions"].remove(row)
+        progress = next(p for p in db.tables["objective_progress"] if p["id"] == row["objective_progress_id"])
+        db.tables["objective_progress"].remove(progress)
+        deleted.append({**row, "objective_progress": progress})
+    return {"deleted": deleted}
+
+
+@pytest.fixture
+def side_effects(monkeypatch):
+    calls = {"rollups": [], "summaries": []}
+    monkeypatch.setattr(sessions, "update_rollups", lambda supabase, user_id, added, removed: calls["rollups"].append((added, removed)))
+    monkeypatch.setattr(sessions, "schedule_student_summary", lambda supabase, student_id, user_id: calls["summaries"].append(student_id))
+    return calls
+
+
+@pytest.fixture
+def db():
+    supabase = FakeSupabase({
+        "sessions": [_session("s1"), _session("s2"), _session("s3", teacher_id=OTHER_TEACHER_ID)],
+        "objective_progress": [_progress("s1"), _progress("s2"), _progress("s3", teacher_id=OTHER_TEACHER_ID)],
+    })
+    supabase.rpcs["edit_sessions_with_progress"] = fake_edit_sessions
+    supabase.rpcs["delete_sessions_with_progress"] = fake_delete_sessions
+    return supabase
+
+
+def test_batch_edit_sends_only_the_fields_given(api, db, side_effects):
+    client = api(sessions.router, "/sessions", db)
+    response = client.post("/sessions/batch/edit", json=[
+        {"id": "s1", "memo": "edited"},
+        {"id": "s2", "student_id": "st2", "objective_progress": {"trials_completed": 9, "trials_total": 10}},
+    ])
+
+    assert response.status_code == 200
+    assert [s["memo"] for s in response.json()["sessions"]] == ["edited", "before"]
+    # No read-then-write: the edit is one RPC carrying just the changed fields
+    assert db.calls == [("edit_sessions_with_progress", "rpc")]
+    assert side_effects["summaries"] and set(side_effects["summaries"]) == {"st1", "st2"}
+    added, removed = side_effects["rollups"][0]
+    assert [e["trials_completed"] for e in removed] == [3, 3]
+    assert [e["trials_completed"] for e in added] == [3, 9]
+
+
+def test_batch_edit_rejects_explicit_null_student(api, db, side_effects):
+    client = api(sessions.router, "/sessions", db)
+    response = client.post("/sessions/batch/edit", json=[{"id": "s1", "student_id": None}])
+
+    assert response.status_code == 422
+    assert db.calls == []
+
+
+def test_batch_edit_allows_clearing_the_memo(api, db, side_effects):
+    client = api(sessions.router, "/sessions", db)
+    response = client.post("/sessions/batch/edit", json=[{"id": "s1", "memo": None}])
+    assert response.status_code == 200
+    assert response.json()["sessions"][0]["memo"] is None
+
+
+def test_batch_edit_with_another_teachers_session_is_404_and_changes_nothing(api, db, side_effects):
+    client = api(sessions.router, "/sessions", db)
+    response = client.post("/sessions/batch/edit", json=[{"id": "s1", "memo": "edited"}, {"id": "s3", "memo": "hijacked"}])
+
+    assert response.status_code == 404
+    assert "s3" in response.json()["detail"]
+    assert [row["memo"] for row in db.tables["sessions"]] == ["before", "before", "before"]
+    assert side_effects == {"rollups": [], "summaries": []}
+
+
+def test_batch_edit_that_fails_midway_schedules_nothing(api, db, side_effects):
+    def fail(db, params):
+        # The transaction rolled back; PostgREST reports the error
+        raise RuntimeError("connection reset")
+    db.rpcs["edit_sessions_with_progress"] = fail
+    client = api(sessions.router, "/sessions", db)
+
+    with pytest.raises(RuntimeError):
+        client.post("/sessions/batch/edit", json=[{"id": "s1", "memo": "edited"}, {"id": "s2", "memo": "edited"}])
+    assert side_effects == {"rollups": [], "summaries": []}
+
+
+def test_batch_delete_with_another_teachers_session_is_404_and_deletes_nothing(api, db, side_effects):
+    client = api(sessions.router, "/sessions", db)
+    response = client.post("/sessions/batch/delete", json={"ids": ["s1", "s3"]})
+
+    assert response.status_code == 404
+    assert len(db.tables["sessions"]) == 3
+    assert side_effects == {"rollups": [], "summaries": []}
+
+
+def test_batch_delete_reports_what_was_deleted(api, db, side_effects):
+    client = api(sessions.router, "/sessions", db)
+    response = client.post("/sessions/batch/delete", json={"ids": ["s1", "s2", "s1"]})
+
+    assert response.json()["deleted"] == 2
+    assert [row["id"] for row in db.tables["sessions"]] == ["s3"]
+    added, removed = side_effects["rollups"][0]
+    assert added == [] and sorted(e["session_id"] for e in removed) == ["s1", "s2"]
@@ -0,0 +1,130 @@
+import csv
+import io
+from datetime import datetime, timezone
+
+import pyarrow.parquet as pq
+import pytest
+
+from app.routes import sessions
+from app.services import caseload, session_export
+from app.services.session_export import EXPORT_COLUMNS, EXPORT_SCHEMA, iter_session_rows, stream_parquet
+from app.utils.versioned_cache import VersionedCache
+from tests.conftest import OTHER_TEACHER_ID, TEACHER_ID
+from tests.fake_supabase import FakeSupabase
+
+N_SESSIONS = 23
+
+
+def _uuid(prefix, n):
+    return f"{prefix:08x}-0000-0000-0000-{n:012x}"
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(caseload, "_cache", VersionedCache(maxsize=10))
+    monkeypatch.setattr(session_export, "EXPORT_PAGE_SIZE", 5)
+    tables = {
+        "students": [
+            {"id": "st1", "teacher_id": TEACHER_ID, "name": "Ada"},
+            {"id": "st2", "teacher_id": TEACHER_ID, "name": "Grace"},
+        ],
+        "subject_areas": [{"id": "sa1", "teacher_id": TEACHER_ID, "name": "Math"}],
+        "goals": [{"id": "g1", "teacher_id": TEACHER_ID, "title": "Fractions"}],
+        "objectives": [{
+            "id": "o1", "teacher_id": TEACHER_ID, "student_id": "st1", "goal_id": "g1", "subject_area_id": "sa1",
+            "description": "Add fractions", "objective_type": "trial", "target_accuracy": 80,
+        }],
+        "sessions": [],
+        "objective_progress": [],
+    }
+    for n in range(N_SESSIONS):
+        progress_id = _uuid(2, n)
+        tables["objective_progress"].append({"id": progress_id, "trials_completed": n % 5, "trials_total": 4})
+        tables["sessions"].append({
+            "id": _uuid(1, n),
+            "teacher_id": TEACHER_ID,
+            "student_id": "st1" if n % 2 else "st2",
+            "objective_id": "o1",
+            "objective_progress_id": progress_id,
+            # Pairs of sessions share a timestamp, so pages break inside ties
+            "created_at": f"2026-10-{1 + n // 2:02d}T09:00:00+00:00",
+            "memo": f"memo {n}, with a comma",
+        })
+    tables["sessions"].append({
+        "id": _uuid(1, 999), "teacher_id": OTHER_TEACHER_ID, "student_id": "st9", "objective_id": "o9",
+        "created_at": "2026-10-01T09:00:00+00:00", "memo": "not mine",
+    })
+    return FakeSupabase(tables)
+
+
+def test_pages_cover_every_session_once_newest_first(db):
+    pages = list(iter_session_rows(db, TEACHER_ID, {}, None, None))
+
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    rows = [row for page in pages for row in page]
+    assert sorted(row["session_id"] for row in rows) == sorted(_uuid(1, n) for n in range(N_SESSIONS))
+    assert [(row["created_at"], row["session_id"]) for row in rows] == \
+        sorted(((row["created_at"], row["session_id"]) for row in rows), reverse=True)
+
+    row = next(row for row in rows if row["session_id"] == _uuid(1, 3))
+    assert set(row) == set(EXPORT_COLUMNS)
+    assert row["student_name"] == "Ada"
+    assert row["goal_title"] == "Fractions"
+    assert row["subject_area_name"] == "Math"
+    assert row["target_accuracy"] == 0.8
+    assert (row["trials_completed"], row["trials_total"], row["accuracy"]) == (3, 4, 0.75)
+
+
+def test_filters_and_range(db):
+    start = datetime(2026, 10, 3, tzinfo=timezone.utc)
+    end = datetime(2026, 10, 6, tzinfo=timezone.utc)
+    rows = [row for page in iter_session_rows(db, TEACHER_ID, {"student_id": "st1"}, start, end) for row in page]
+    assert sorted(row["session_id"] for row in rows) == [_uuid(1, n) for n in (5, 7, 9)]
+
+
+def test_csv_export(api, db):
+    response = api(sessions.router, "/sessions", db).get("/sessions/export", params={"format": "csv"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    reader = csv.DictReader(io.StringIO(response.text))
+    assert reader.fieldnames == EXPORT_COLUMNS
+    rows = list(reader)
+    assert len(rows) == N_SESSIONS
+    assert {row["memo"] for row in rows} == {f"memo {n}, with a comma" for n in range(N_SESSIONS)}
+
+
+def test_parquet_export_round_trips(api, db, monkeypatch):
+    monkeypatch.setattr(session_export, "EXPORT_ROW_GROUP_SIZE", 10)
+    response = api(sessions.router, "/sessions", db).get("/sessions/export", params={"format": "parquet"})
+
+    assert response.status_code == 200
+    parquet = pq.ParquetFile(io.BytesIO(response.content))
+    assert parquet.schema_arrow == EXPORT_SCHEMA
+    # Row groups close at the first page boundary at or past EXPORT_ROW_GROUP_SIZE
+    assert [parquet.metadata.row_group(i).num_rows for i in range(parquet.num_row_groups)] == [10, 10, 3]
+
+    rows = parquet.read().to_pylist()
+    assert len(rows) == N_SESSIONS
+    row = next(row for row in rows if row["session_id"] == _uuid(1, 3))
+    assert row["created_at"] == datetime(2026, 10, 2, 9, tzinfo=timezone.utc)
+    assert row["accuracy"] == 0.75
+    assert row["student_name"] == "Ada"
+
+
+def test_parquet_streams_each_row_group_as_it_is_written(db, monkeypatch):
+    monkeypatch.setattr(session_export, "EXPORT_ROW_GROUP_SIZE", 5)
+    chunks = list(stream_parquet(iter_session_rows(db, TEACHER_ID, {}, None, None)))
+
+    assert len(chunks) > 1
+    assert pq.read_table(io.BytesIO(b"".join(chunks))).num_rows == N_SESSIONS
+
+
+def test_empty_export(db):
+    pages = iter_session_rows(db, TEACHER_ID, {"student_id": "nobody"}, None, None)
+    table = pq.read_table(io.BytesIO(b"".join(stream_parquet(pages))))
+    assert table.num_rows == 0
+    assert table.schema == EXPORT_SCHEMA
+
+    pages = iter_session_rows(db, TEACHER_ID, {"student_id": "nobody"}, None, None)
+    assert b"".join(session_export.stream_csv(pages)).decode().splitlines() == [",".join(EXPORT_COLUMNS)]
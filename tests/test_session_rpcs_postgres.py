@@ -0,0 +1,224 @@
+"""
+The session write RPCs against real Postgres: each call is one transaction
+and only touches the calling teacher's rows.
+"""
+import uuid
+
+import psycopg
+import pytest
+
+EDIT = "select public.edit_session_with_progress(%s, %s, %s, %s, %s, %s, %s, %s) as result"
+DELETE = "select public.delete_session_with_progress(%s, %s) as result"
+
+
+def _seed(pg, teacher_id):
+    student = pg.execute(
+        "insert into students (teacher_id, name) values (%s, 'A') returning id", (teacher_id,)
+    ).fetchone()["id"]
+    objective = pg.execute(
+        "insert into objectives (teacher_id, student_id, description) values (%s, %s, 'Read') returning id",
+        (teacher_id, student),
+    ).fetchone()["id"]
+    progress = pg.execute(
+        "insert into objective_progress (teacher_id, student_id, objective_id, trials_completed, trials_total) "
+        "values (%s, %s, %s, 3, 10) returning id",
+        (teacher_id, student, objective),
+    ).fetchone()["id"]
+    session = pg.execute(
+        "insert into sessions (teacher_id, student_id, objective_id, objective_progress_id, memo) "
+        "values (%s, %s, %s, %s, 'before') returning id",
+        (teacher_id, student, objective, progress),
+    ).fetchone()["id"]
+    return {"student": student, "objective": objective, "progress": progress, "session": session}
+
+
+def _session(pg, session_id):
+    return pg.execute("select * from sessions where id = %s", (session_id,)).fetchone()
+
+
+def _progress(pg, progress_id):
+    return pg.execute("select * from objective_progress where id = %s", (progress_id,)).fetchone()
+
+
+def test_edit_updates_session_and_progress_and_returns_previous_rows(pg):
+    teacher = uuid.uuid4()
+    rows = _seed(pg, teacher)
+
+    result = pg.execute(
+        EDIT, (teacher, rows["session"], rows["student"], rows["objective"], "after", None, 7, 10)
+    ).fetchone()["result"]
+
+    assert result["session"]["memo"] == "after"
+    assert result["progress"]["trials_completed"] == 7
+    assert result["previous_session"]["memo"] == "before"
+    assert result["previous_progress"]["trials_completed"] == 3
+    assert _session(pg, rows["session"])["memo"] == "after"
+    assert _progress(pg, rows["progress"])["trials_completed"] == 7
+
+
+def test_edit_rolls_back_the_session_when_the_progress_update_fails(pg):
+    teacher = uuid.uuid4()
+    rows = _seed(pg, teacher)
+
+    # trials_completed is not null, so the second update fails after the first succeeded
+    with pytest.raises(psycopg.errors.NotNullViolation):
+        pg.execute(EDIT, (teacher, rows["session"], rows["student"], rows["objective"], "after", None, None, 10))
+
+    assert _session(pg, rows["session"])["memo"] == "before"
+    assert _progress(pg, rows["progress"])["trials_completed"] == 3
+
+
+def test_edit_of_another_teachers_session_changes_nothing(pg):
+    owner, intruder = uuid.uuid4(), uuid.uuid4()
+    rows = _seed(pg, owner)
+
+    result = pg.execute(
+        EDIT, (intruder, rows["session"], rows["student"], rows["objective"], "hijacked", None, 0, 1)
+    ).fetchone()["result"]
+
+    assert result is None
+    assert _session(pg, rows["session"])["memo"] == "before"
+    assert _progress(pg, rows["progress"])["trials_total"] == 10
+
+
+def test_delete_removes_session_and_progress_and_leaves_a_tombstone(pg):
+    teacher = uuid.uuid4()
+    rows = _seed(pg, teacher)
+
+    result = pg.execute(DELETE, (teacher, rows["session"])).fetchone()["result"]
+
+    assert result["id"] == str(rows["session"])
+    assert result["objective_progress"]["trials_completed"] == 3
+    assert _session(pg, rows["session"]) is None
+    assert _progress(pg, rows["progress"]) is None
+    tombstone = pg.execute(
+        "select * from tombstones where row_id = %s", (rows["session"],)
+    ).fetchone()
+    assert tombstone["teacher_id"] == teacher and tombstone["table_name"] == "sessions"
+
+
+def test_delete_rolls_back_when_the_progress_delete_fails(pg):
+    teacher = uuid.uuid4()
+    rows = _seed(pg, teacher)
+    # A second session sharing the progress row makes deleting it violate the foreign key
+    pg.execute(
+        "insert into sessions (teacher_id, student_id, objective_id, objective_progress_id) values (%s, %s, %s, %s)",
+        (teacher, rows["student"], rows["objective"], rows["progress"]),
+    )
+
+    with pytest.raises(psycopg.errors.ForeignKeyViolation):
+        pg.execute(DELETE, (teacher, rows["session"]))
+
+    assert _session(pg, rows["session"]) is not None
+    assert pg.execute("select count(*) from tombstones where row_id = %s", (rows["session"],)).fetchone()["count"] == 0
+
+
+def test_delete_of_another_teachers_session_changes_nothing(pg):
+    owner, intruder = uuid.uuid4(), uuid.uuid4()
+    rows = _seed(pg, owner)
+
+    assert pg.execute(DELETE, (intruder, rows["session"])).fetchone()["result"] is None
+    assert _session(pg, rows["session"]) is not None
+    assert _progress(pg, rows["progress"]) is not None
+
+
+def test_data_markers_move_on_update_and_delete(pg):
+    teacher = uuid.uuid4()
+    rows = _seed(pg, teacher)
+    marker = lambda: pg.execute("select public.data_markers(%s) as m", (teacher,)).fetchone()["m"]
+
+    before = marker()
+    pg.execute("update students set name = 'B' where id = %s", (rows["student"],))
+    after_update = marker()
+    assert after_update["students"] > before["students"]
+    assert after_update["sessions"] == before["sessions"]
+
+    pg.execute(DELETE, (teacher, rows["session"]))
+    assert marker()["sessions"] > after_update["sessions"]
+
+
+def test_rollup_writes_move_only_the_progress_marker(pg):
+    teacher = uuid.uuid4()
+    rows = _seed(pg, teacher)
+    marker = lambda: pg.execute("select public.data_markers(%s) as m", (teacher,)).fetchone()["m"]
+    pg.execute(
+        "insert into objective_rollups (objective_id, teacher_id, student_id) values (%s, %s, %s)",
+        (rows["objective"], teacher, rows["student"]),
+    )
+
+    before = marker()
+    pg.execute("update objective_rollups set sessions_logged = 1 where objective_id = %s", (rows["objective"],))
+    after = marker()
+    assert after["progress"] > before["progress"]
+    assert after["sessions"] == before["sessions"]
+
+
+BATCH_EDIT = "select public.edit_sessions_with_progress(%s, %s) as result"
+BATCH_DELETE = "select public.delete_sessions_with_progress(%s, %s) as result"
+
+
+def test_batch_edit_changes_only_the_fields_sent(pg):
+    teacher = uuid.uuid4()
+    first, second = _seed(pg, teacher), _seed(pg, teacher)
+
+    result = pg.execute(BATCH_EDIT, (teacher, psycopg.types.json.Jsonb([
+        {"id": str(first["session"]), "memo": "edited"},
+        {"id": str(second["session"]), "objective_progress": {"trials_completed": 9, "trials_total": 10}},
+    ]))).fetchone()["result"]
+
+    assert [r["previous_session"]["memo"] for r in result["results"]] == ["before", "before"]
+    assert _session(pg, first["session"])["memo"] == "edited"
+    assert _progress(pg, first["progress"])["trials_completed"] == 3
+    assert _session(pg, second["session"])["memo"] == "before"
+    assert _progress(pg, second["progress"])["trials_completed"] == 9
+
+
+def test_batch_edit_with_another_teachers_session_changes_nothing(pg):
+    owner, other = uuid.uuid4(), uuid.uuid4()
+    mine, theirs = _seed(pg, owner), _seed(pg, other)
+
+    result = pg.execute(BATCH_EDIT, (owner, psycopg.types.json.Jsonb([
+        {"id": str(mine["session"]), "memo": "edited"},
+        {"id": str(theirs["session"]), "memo": "hijacked"},
+    ]))).fetchone()["result"]
+
+    assert result == {"missing": [str(theirs["session"])]}
+    assert _session(pg, mine["session"])["memo"] == "before"
+    assert _session(pg, theirs["session"])["memo"] == "before"
+
+
+def test_batch_edit_failing_midway_rolls_back_earlier_rows(pg):
+    teacher = uuid.uuid4()
+    first, second = _seed(pg, teacher), _seed(pg, teacher)
+
+    # The second row's student doesn't exist, after the first row was already updated
+    with pytest.raises(psycopg.errors.ForeignKeyViolation):
+        pg.execute(BATCH_EDIT, (teacher, psycopg.types.json.Jsonb([
+            {"id": str(first["session"]), "memo": "edited"},
+            {"id": str(second["session"]), "student_id": str(uuid.uuid4())},
+        ])))
+
+    assert _session(pg, first["session"])["memo"] == "before"
+    assert _session(pg, second["session"])["student_id"] == second["student"]
+
+
+def test_batch_delete_removes_sessions_with_their_progress(pg):
+    teacher = uuid.uuid4()
+    first, second = _seed(pg, teacher), _seed(pg, teacher)
+
+    result = pg.execute(BATCH_DELETE, (teacher, [first["session"], second["session"]])).fetchone()["result"]
+
+    assert sorted(row["id"] for row in result["deleted"]) == sorted([str(first["session"]), str(second["session"])])
+    assert all(row["objective_progress"]["trials_total"] == 10 for row in result["deleted"])
+    assert _session(pg, first["session"]) is None and _progress(pg, second["progress"]) is None
+
+
+def test_batch_delete_with_another_teachers_session_deletes_nothing(pg):
+    owner, other = uuid.uuid4(), uuid.uuid4()
+    mine, theirs = _seed(pg, owner), _seed(pg, other)
+
+    result = pg.execute(BATCH_DELETE, (owner, [mine["session"], theirs["session"]])).fetchone()["result"]
+
+    assert result == {"missing": [str(theirs["session"])]}
+    assert _session(pg, mine["session"]) is not None
+    assert _session(pg, theirs["session"]) is not None
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+from app.utils.single_flight import SingleFlight, hash_key
+
+
+def _run_concurrently(n, target):
+    threads = [threading.Thread(target=target) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def test_hash_key_is_stable_and_order_sensitive():
+    assert hash_key("a", {"x": 1, "y": 2}) == hash_key("a", {"y": 2, "x": 1})
+    assert hash_key("a", "b") != hash_key("b", "a")
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    threads = _run_concurrently(5, lambda: results.append(flight.do("k", fn)))
+    # Give followers time to join the in-flight call before it finishes
+    threading.Event().wait(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == [1]
+    assert results == ["value"] * 5
+
+
+def test_followers_receive_the_leaders_exception():
+    flight = SingleFlight()
+    release = threading.Event()
+    errors = []
+
+    def fn():
+        release.wait(5)
+        raise RuntimeError("boom")
+
+    def call():
+        try:
+            flight.do("k", fn)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = _run_concurrently(3, call)
+    threading.Event().wait(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(errors) == 3
+    assert len({id(e) for e in errors}) == 1
+
+
+def test_results_are_not_cached_after_completion():
+    flight = SingleFlight()
+    counter = iter(range(10))
+    assert flight.do("k", lambda: next(counter)) == 0
+    assert flight.do("k", lambda: next(counter)) == 1
+    assert flight._calls == {}
+
+
+def test_different_keys_run_independently():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    with pytest.raises(ValueError):
+        flight.do("c", lambda: (_ for _ in ()).throw(ValueError("bad")))
+    assert flight._calls == {}
@@ -0,0 +1,91 @@
+from cachetools import LRUCache
+
+from app.services import caseload, data_version, student_summarizer
+from app.utils.versioned_cache import VersionedCache
+from tests.fake_supabase import FakeSupabase
+
+TEACHER = "teacher-1"
+
+
+def _session(i):
+    return {
+        "id": f"s{i}",
+        "created_at": f"2026-10-{i:02d}T10:00:00+00:00",
+        "memo": f"memo {i}",
+        "objectives": {"description": "Read", "goals": {"title": "Reading"}, "subject_areas": {"name": "ELA"}},
+    }
+
+
+def _student(student_id, summary=None):
+    return {"id": student_id, "disability_type": "SLD", "grade_level": 3, "summary": summary}
+
+
+def _summarize(monkeypatch, prompts, student, sessions):
+    def fake_llm(prompt):
+        prompts.append(prompt)
+        return f"summary {len(prompts)}"
+
+    monkeypatch.setattr(student_summarizer, "call_llm_student_summary", fake_llm)
+    supabase = FakeSupabase({"students": [dict(student, teacher_id=TEACHER)]})
+    return student_summarizer.summarize_student(supabase, student, sessions, [], TEACHER)
+
+
+def test_unchanged_inputs_skip_the_llm(monkeypatch):
+    monkeypatch.setattr(student_summarizer, "_fingerprints", LRUCache(maxsize=10))
+    prompts = []
+    sessions = [_session(2), _session(1)]
+
+    first = _summarize(monkeypatch, prompts, _student("a"), sessions)
+    second = _summarize(monkeypatch, prompts, _student("a", first), sessions)
+
+    assert second == first
+    assert len(prompts) == 1
+
+
+def test_new_session_is_summarized_incrementally(monkeypatch):
+    monkeypatch.setattr(student_summarizer, "_fingerprints", LRUCache(maxsize=10))
+    prompts = []
+
+    first = _summarize(monkeypatch, prompts, _student("a"), [_session(1)])
+    _summarize(monkeypatch, prompts, _student("a", first), [_session(2), _session(1)])
+
+    assert "New Sessions since the current summary" in prompts[1]
+    assert "memo 2" in prompts[1] and "memo 1" not in prompts[1]
+
+
+def test_fingerprints_are_bounded(monkeypatch):
+    monkeypatch.setattr(student_summarizer, "_fingerprints", LRUCache(maxsize=1))
+    prompts = []
+    sessions = [_session(1)]
+
+    summary_a = _summarize(monkeypatch, prompts, _student("a"), sessions)
+    _summarize(monkeypatch, prompts, _student("b"), sessions)
+    assert len(student_summarizer._fingerprints) == 1
+
+    # "a" was evicted, so its unchanged inputs are regenerated in full
+    _summarize(monkeypatch, prompts, _student("a", summary_a), sessions)
+    assert len(prompts) == 3
+    assert "Previous Summary" in prompts[2]
+
+
+def test_storing_a_summary_keeps_the_caseload_snapshot(monkeypatch):
+    monkeypatch.setattr(student_summarizer, "_fingerprints", LRUCache(maxsize=10))
+    monkeypatch.setattr(caseload, "_cache", VersionedCache(maxsize=10))
+    monkeypatch.setattr(student_summarizer, "call_llm_student_summary", lambda prompt: "fresh summary")
+    teacher = "teacher-summary-scope"
+    supabase = FakeSupabase({"students": [dict(_student("a"), teacher_id=teacher)]})
+
+    snapshot = caseload.get_caseload(supabase, teacher)
+    old_row = snapshot.students_by_id["a"]
+    caseload_version = data_version.current(teacher, *data_version.CASELOAD)
+    summaries_version = data_version.current(teacher, data_version.SUMMARIES)
+
+    student_summarizer.summarize_student(supabase, _student("a"), [_session(1)], [], teacher)
+
+    assert data_version.current(teacher, *data_version.CASELOAD) == caseload_version
+    assert data_version.current(teacher, data_version.SUMMARIES) != summaries_version
+    # Served from the same snapshot, with the row replaced rather than mutated
+    assert caseload.get_caseload(supabase, teacher) is snapshot
+    assert snapshot.students_by_id["a"]["summary"] == "fresh summary"
+    assert snapshot.students == [snapshot.students_by_id["a"]]
+    assert old_row["summary"] is None
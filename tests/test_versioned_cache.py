@@ -0,0 +1,94 @@
+import pytest
+
+from app.utils.versioned_cache import VersionedCache
+
+
+def _counter():
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    return compute, calls
+
+
+def test_serves_the_entry_while_its_version_is_current():
+    cache = VersionedCache(maxsize=4)
+    compute, calls = _counter()
+
+    assert cache.get_or_compute("k", 1, compute) == 1
+    assert cache.get_or_compute("k", 1, compute) == 1
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_a_new_version_recomputes():
+    cache = VersionedCache(maxsize=4)
+    compute, calls = _counter()
+
+    cache.get_or_compute("k", 1, compute)
+    assert cache.get_or_compute("k", 2, compute) == 2
+    assert cache.get_or_compute("k", 2, compute) == 2
+    assert len(calls) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_a_write_during_compute_leaves_a_stale_entry():
+    cache = VersionedCache(maxsize=4)
+    version = {"now": 1}
+
+    def compute():
+        # A write lands after the reader read version 1
+        version["now"] = 2
+        return "old"
+
+    assert cache.get_or_compute("k", version["now"], compute) == "old"
+    assert cache.get_or_compute("k", version["now"], lambda: "new") == "new"
+
+
+def test_least_recently_used_key_is_evicted():
+    cache = VersionedCache(maxsize=2)
+    compute, calls = _counter()
+
+    cache.get_or_compute("a", 1, compute)
+    cache.get_or_compute("b", 1, compute)
+    cache.get_or_compute("a", 1, compute)
+    cache.get_or_compute("c", 1, compute)
+
+    assert len(calls) == 3
+    cache.get_or_compute("a", 1, compute)
+    assert len(calls) == 3
+    cache.get_or_compute("b", 1, compute)
+    assert len(calls) == 4
+
+
+def test_failed_compute_is_not_cached():
+    cache = VersionedCache(maxsize=2)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("k", 1, fail)
+    assert cache.get_or_compute("k", 1, lambda: "ok") == "ok"
+
+
+def test_clear_drops_every_entry():
+    cache = VersionedCache(maxsize=2)
+    compute, calls = _counter()
+    cache.get_or_compute("k", 1, compute)
+    cache.clear()
+    cache.get_or_compute("k", 1, compute)
+    assert len(calls) == 2
+
+
+def test_modify_applies_to_the_entry_whatever_its_version():
+    cache = VersionedCache(maxsize=2)
+    seen = []
+    cache.modify("k", seen.append)
+    assert seen == []
+
+    cache.get_or_compute("k", 1, lambda: {"a": 1})
+    cache.modify("k", lambda value: value.update(a=2))
+    assert cache.get_or_compute("k", 1, lambda: None) == {"a": 2}